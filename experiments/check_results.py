@@ -2,6 +2,7 @@
 """Check experiment results."""
 
 import json
+from operator import itemgetter
 from pathlib import Path
 
 results_dir = Path("experiment_results")
@@ -35,9 +36,9 @@ if all_results:
     print("🏆 RANKING BY SCORE")
     print("="*60)
     
-    sorted_results = sorted(all_results, key=lambda x: x["score"], reverse=True)
+    all_results.sort(key=itemgetter("score"), reverse=True)
     
-    for i, result in enumerate(sorted_results, 1):
+    for i, result in enumerate(all_results, 1):
         medal = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
         print(f"{medal} {result['name']}")
         print(f"   Score: {result['score']}")
@@ -45,6 +46,6 @@ if all_results:
         print()
     
     print("="*60)
-    print(f"🏆 WINNER: {sorted_results[0]['name']}")
-    print(f"🎯 Score: {sorted_results[0]['score']}")
-    print(f"📸 Image URL: {sorted_results[0]['url']}")
\ No newline at end of file
+    print(f"🏆 WINNER: {all_results[0]['name']}")
+    print(f"🎯 Score: {all_results[0]['score']}")
+    print(f"📸 Image URL: {all_results[0]['url']}")
\ No newline at end of file
@@ -4,9 +4,13 @@ Execute the complete ImageFox pipeline for all 20 experiments.
 This will run actual Google Images searches and analyze real images.
 """
 
+import io
 import os
+import re
+import sys
 import json
 import time
+import base64
 import asyncio
 import aiohttp
 from typing import Dict, List, Any, Optional
@@ -14,6 +18,11 @@ from datetime import datetime
 from pathlib import Path
 import hashlib
 from dotenv import load_dotenv
+from PIL import Image
+
+# The shared rate limiter lives in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from rate_limiter import TokenBucket
 
 # Load environment variables
 load_dotenv()
@@ -26,11 +35,23 @@ IMAGEBB_API_KEY = os.getenv("IMAGEBB_API_KEY")
 # Apify actor for Google Images
 APIFY_ACTOR_ID = "hooli~google-images-scraper"
 APIFY_BASE_URL = "https://api.apify.com/v2"
+APIFY_WAIT_FOR_FINISH = 60  # Server-side long-poll limit in seconds
 
 # OpenRouter configuration
 OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 VISION_MODEL = "google/gemini-2.0-flash-lite-001"
 
+# Images are downscaled before upload to cut bandwidth and vision tokens
+VISION_MAX_EDGE = 1024
+VISION_JPEG_QUALITY = 85
+
+# Request rates (requests per second) allowed by the token buckets below
+APIFY_MAX_RATE = 3
+OPENROUTER_MAX_RATE = 10
+
+# Matches the outermost JSON object in model output wrapped in fences or prose
+_JSON_RE = re.compile(r"\{.*\}", re.DOTALL)
+
 # The easyJet article
 EASYJET_ARTICLE = """
 easyJet pilot suspended in Cape Verde after public drunkenness incident
@@ -179,6 +200,9 @@ class ImageFoxPipeline:
         self.results_dir = Path("experiment_results")
         self.results_dir.mkdir(exist_ok=True)
         self.session = None
+        self._image_data_urls: Dict[str, str] = {}
+        self.apify_limiter = TokenBucket(APIFY_MAX_RATE, period=1.0)
+        self.openrouter_limiter = TokenBucket(OPENROUTER_MAX_RATE, period=1.0)
         
     async def __aenter__(self):
         """Async context manager entry."""
@@ -201,13 +225,35 @@ class ImageFoxPipeline:
         Returns:
             List of image results
         """
+        results = await self.run_apify_batch_search([query], max_results)
+        return results[query]
+    
+    async def run_apify_batch_search(
+        self, queries: List[str], max_results: int = 10
+    ) -> Dict[str, List[Dict]]:
+        """
+        Run several Google Images searches in a single Apify actor run.
+        
+        The actor accepts a list of queries, so batching avoids paying the
+        per-run start-up latency once per query. Dataset items are
+        partitioned back by their ``query`` field.
+        
+        Args:
+            queries: Search queries (duplicates are searched once)
+            max_results: Maximum number of results per query
+            
+        Returns:
+            Mapping of query to its list of image results
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        
         if not APIFY_API_KEY:
-            print(f"⚠️  No Apify API key found. Using mock data for: {query}")
-            return self._get_mock_images(query)
+            print(f"⚠️  No Apify API key found. Using mock data for: {', '.join(unique_queries)}")
+            return self._get_mock_batch(unique_queries)
         
         # Prepare the actor input
         actor_input = {
-            "queries": [query],
+            "queries": unique_queries,
             "maxResults": max_results,
             "outputFormat": "json",
             "safeSearch": "moderate"
@@ -217,38 +263,87 @@ class ImageFoxPipeline:
         url = f"{APIFY_BASE_URL}/acts/{APIFY_ACTOR_ID}/runs?token={APIFY_API_KEY}"
         
         try:
+            await self.apify_limiter.acquire()
             async with self.session.post(url, json=actor_input) as response:
                 if response.status != 201:
                     print(f"❌ Apify error: {response.status}")
-                    return self._get_mock_images(query)
+                    return self._get_mock_batch(unique_queries)
                 
                 run_data = await response.json()
                 run_id = run_data["data"]["id"]
                 
-            # Wait for the run to complete
-            dataset_id = await self._wait_for_run(run_id)
+            # Wait for the run to complete; larger batches take longer
+            dataset_id = await self._wait_for_run(
+                run_id, max_wait=max(60, 15 * len(unique_queries))
+            )
             if not dataset_id:
-                return self._get_mock_images(query)
+                return self._get_mock_batch(unique_queries)
             
             # Get the results
             results_url = f"{APIFY_BASE_URL}/datasets/{dataset_id}/items?token={APIFY_API_KEY}"
             async with self.session.get(results_url) as response:
                 if response.status == 200:
                     data = await response.json()
-                    return data if isinstance(data, list) else []
+                    return self._partition_by_query(
+                        data if isinstance(data, list) else [], unique_queries
+                    )
                     
         except Exception as e:
             print(f"❌ Error running Apify search: {e}")
             
-        return self._get_mock_images(query)
+        return self._get_mock_batch(unique_queries)
     
-    async def _wait_for_run(self, run_id: str, max_wait: int = 60) -> Optional[str]:
-        """Wait for Apify run to complete."""
-        url = f"{APIFY_BASE_URL}/actor-runs/{run_id}?token={APIFY_API_KEY}"
+    def _partition_by_query(self, items: List[Dict], queries: List[str]) -> Dict[str, List[Dict]]:
+        """
+        Group dataset items by the query that produced them.
         
-        for _ in range(max_wait // 2):
-            await asyncio.sleep(2)
+        Queries left without any items fall back to mock images, like a
+        failed search.
+        """
+        partitioned: Dict[str, List[Dict]] = {query: [] for query in queries}
+        
+        if len(queries) == 1:
+            partitioned[queries[0]] = items
+        else:
+            unmatched = 0
+            for item in items:
+                query = item.get("query", item.get("searchQuery"))
+                if query in partitioned:
+                    partitioned[query].append(item)
+                else:
+                    unmatched += 1
             
+            if unmatched:
+                print(f"⚠️  {unmatched} Apify item(s) matched none of the batch queries and were skipped")
+        
+        empty = [query for query, query_items in partitioned.items() if not query_items]
+        if empty:
+            print(f"⚠️  No Apify results for: {', '.join(empty)}. Using mock data")
+            partitioned.update(self._get_mock_batch(empty))
+        
+        return partitioned
+    
+    async def _wait_for_run(self, run_id: str, max_wait: int = 60) -> Optional[str]:
+        """
+        Wait for Apify run to complete.
+
+        Uses Apify's waitForFinish long-poll so the server holds the request
+        until the run finishes (or the wait window elapses) instead of
+        polling every couple of seconds.
+        """
+        deadline = time.monotonic() + max_wait
+
+        while True:
+            remaining = int(deadline - time.monotonic())
+            if remaining <= 0:
+                break
+
+            wait_for_finish = min(remaining, APIFY_WAIT_FOR_FINISH)
+            url = (
+                f"{APIFY_BASE_URL}/actor-runs/{run_id}"
+                f"?token={APIFY_API_KEY}&waitForFinish={wait_for_finish}"
+            )
+
             async with self.session.get(url) as response:
                 if response.status == 200:
                     data = await response.json()
@@ -259,10 +354,52 @@ class ImageFoxPipeline:
                     elif status in ["FAILED", "ABORTED", "TIMED-OUT"]:
                         print(f"❌ Run failed with status: {status}")
                         return None
-                        
+                    continue
+
+            # Non-200 responses return immediately; back off before retrying
+            await asyncio.sleep(2)
+
         print("⏱️  Run timed out")
         return None
     
+    async def _fetch_and_prep(self, image_url: str) -> str:
+        """
+        Download an image, downscale it and encode it as a JPEG data URL.
+        
+        The encoded result is cached by URL hash so an image shared between
+        experiments is only downloaded and encoded once.
+        
+        Args:
+            image_url: URL of the image to prepare
+            
+        Returns:
+            ``data:image/jpeg;base64,...`` URL for the vision model
+        """
+        cache_key = hashlib.sha256(image_url.encode()).hexdigest()
+        cached = self._image_data_urls.get(cache_key)
+        if cached:
+            return cached
+        
+        async with self.session.get(image_url) as response:
+            response.raise_for_status()
+            data = await response.read()
+        
+        with Image.open(io.BytesIO(data)) as img:
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            img.thumbnail((VISION_MAX_EDGE, VISION_MAX_EDGE), Image.Resampling.LANCZOS)
+            buffer = io.BytesIO()
+            img.save(buffer, format="JPEG", quality=VISION_JPEG_QUALITY, optimize=True)
+        
+        encoded = base64.b64encode(buffer.getvalue()).decode("ascii")
+        data_url = f"data:image/jpeg;base64,{encoded}"
+        self._image_data_urls[cache_key] = data_url
+        return data_url
+    
+    def _get_mock_batch(self, queries: List[str]) -> Dict[str, List[Dict]]:
+        """Get mock images for each query in a batch."""
+        return {query: self._get_mock_images(query) for query in queries}
+    
     def _get_mock_images(self, query: str) -> List[Dict]:
         """Get mock images for testing without API."""
         # Generate deterministic mock data based on query
@@ -317,6 +454,8 @@ class ImageFoxPipeline:
         """
         
         try:
+            image_data_url = await self._fetch_and_prep(image_url)
+            
             headers = {
                 "Authorization": f"Bearer {OPENROUTER_API_KEY}",
                 "Content-Type": "application/json"
@@ -329,13 +468,14 @@ class ImageFoxPipeline:
                         "role": "user",
                         "content": [
                             {"type": "text", "text": prompt},
-                            {"type": "image_url", "image_url": {"url": image_url}}
+                            {"type": "image_url", "image_url": {"url": image_data_url}}
                         ]
                     }
                 ],
                 "response_format": {"type": "json_object"}
             }
             
+            await self.openrouter_limiter.acquire()
             async with self.session.post(
                 f"{OPENROUTER_BASE_URL}/chat/completions",
                 headers=headers,
@@ -343,14 +483,36 @@ class ImageFoxPipeline:
             ) as response:
                 if response.status == 200:
                     data = await response.json()
-                    result = json.loads(data["choices"][0]["message"]["content"])
-                    return result
+                    content = data["choices"][0]["message"]["content"]
+                    return self._parse_analysis_json(content)
                     
         except Exception as e:
             print(f"❌ Error analyzing image: {e}")
             
         return self._get_mock_analysis(experiment)
     
+    @staticmethod
+    def _parse_analysis_json(content: str) -> Dict:
+        """
+        Parse the model's JSON reply, tolerating Markdown fences or stray prose.
+        
+        Args:
+            content: Raw message content returned by the model
+            
+        Returns:
+            Parsed analysis dictionary
+            
+        Raises:
+            json.JSONDecodeError: If no JSON object can be recovered
+        """
+        try:
+            return json.loads(content)
+        except json.JSONDecodeError:
+            match = _JSON_RE.search(content)
+            if not match:
+                raise
+            return json.loads(match.group(0))
+    
     def _get_mock_analysis(self, experiment: Dict) -> Dict:
         """Get mock analysis for testing."""
         # Generate scores based on experiment ID
@@ -388,12 +550,15 @@ class ImageFoxPipeline:
         scores["total_score"] = round(weighted_total, 2)
         return scores
     
-    async def run_experiment(self, experiment: Dict) -> Dict:
+    async def run_experiment(
+        self, experiment: Dict, images: Optional[List[Dict]] = None
+    ) -> Dict:
         """
         Run a single experiment.
         
         Args:
             experiment: Experiment configuration
+            images: Pre-fetched search results; searched on demand if omitted
             
         Returns:
             Experiment results
@@ -403,8 +568,9 @@ class ImageFoxPipeline:
         print(f"📝 Query: {experiment['query']}")
         
         # Search for images
-        print("🔍 Searching Google Images...")
-        images = await self.run_apify_search(experiment['query'])
+        if images is None:
+            print("🔍 Searching Google Images...")
+            images = await self.run_apify_search(experiment['query'])
         print(f"✅ Found {len(images)} images")
         
         # Analyze top images
@@ -462,14 +628,19 @@ class ImageFoxPipeline:
         print(f"📊 Total experiments: {len(EXPERIMENTS)}")
         print(f"📄 Article: easyJet pilot incident")
         
+        # Issue every query in one actor run instead of one run per experiment
+        print("🔍 Searching Google Images for all experiments...")
+        search_results = await self.run_apify_batch_search(
+            [experiment["query"] for experiment in EXPERIMENTS]
+        )
+        
         results = []
         
         for experiment in EXPERIMENTS:
-            result = await self.run_experiment(experiment)
+            result = await self.run_experiment(
+                experiment, images=search_results[experiment["query"]]
+            )
             results.append(result)
-            
-            # Small delay between experiments
-            await asyncio.sleep(2)
         
         # Save consolidated results
         final_results = {
@@ -6,19 +6,171 @@ This tool analyzes all images selected by different experimental approaches and
 rates them across 10 parameters to identify the top leader and 2 contenders.
 """
 
+import os
+import sys
 import logging
 import json
 import asyncio
-from typing import List, Dict, Any, Tuple
-from dataclasses import dataclass, asdict
+import heapq
+import hashlib
+from operator import attrgetter
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Optional
+from dataclasses import dataclass
+import httpx
+import numpy as np
+import orjson
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential_jitter
 from dotenv import load_dotenv
 from imagefox import SearchRequest, ImageFox
-from openrouter_client import OpenRouterClient
+from openrouter_client import OpenRouterClient, RateLimitError
 
 load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-@dataclass
+# Maximum number of experiments analyzed at the same time
+MAX_CONCURRENT_EXPERIMENTS = 8
+
+# Upper bound on concurrent OpenRouter vision calls, and attempts per call
+MAX_VISION_IN_FLIGHT = int(os.getenv('ANALYSIS_MAX_IN_FLIGHT', '8'))
+VISION_MAX_ATTEMPTS = 3
+
+# Vision models for the 10-parameter analysis: a small, cheap model scores
+# every candidate, then only the top candidates are re-scored precisely
+MODEL_FAST = os.getenv('ANALYSIS_FAST_MODEL', 'meta-llama/llama-3.2-11b-vision-instruct')
+MODEL_PRECISE = os.getenv('ANALYSIS_PRECISE_MODEL', 'google/gemini-2.0-flash-lite-001')
+RESCORE_TOP_K = 3
+# Extra first-pass ranks re-scored alongside the top K, so the fast model's
+# cut-off doesn't decide which candidates can still win
+RESCORE_MARGIN = 2
+
+# Scoring parameters and their weights, in a fixed order for vectorized scoring
+_WEIGHT_KEYS = (
+    'relevance_to_article',   # Most important - matches source content
+    'concept_clarity',        # Critical for communication
+    'professional_appeal',    # Important for business context
+    'visual_quality',         # Technical quality matters
+    'contextual_fit',         # Matches analytical approach
+    'brand_appropriateness',  # Standard weight
+    'emotional_impact',       # Standard weight
+    'informational_value',    # Slightly less critical
+    'uniqueness',             # Nice to have
+    'scalability',            # Least critical
+)
+_WEIGHTS = np.array([1.5, 1.3, 1.2, 1.1, 1.1, 1.0, 1.0, 0.9, 0.8, 0.6])
+_WEIGHT_SUM = float(_WEIGHTS.sum())
+
+# Prompt for the 10-parameter analysis, filled per image with str.format_map
+_ANALYSIS_PROMPT_TMPL = """
+        Analyze this image comprehensively across 10 parameters for the ImageFox experiment "{experiment_name}".
+        
+        CONTEXT:
+        - Source Article: easyJet pilot incident analysis (professional misconduct, corporate response, industry implications)
+        - Search Query Used: "{search_query}"
+        - Analytical Approach: {experiment_name}
+        - Image Title: "{title}"
+        
+        Rate the image on each parameter (1-10 scale, where 10 is excellent):
+        
+        1. RELEVANCE_TO_ARTICLE: How well does this image relate to the easyJet pilot incident and corporate response themes?
+        2. VISUAL_QUALITY: Technical quality - resolution, clarity, composition, professional photography
+        3. PROFESSIONAL_APPEAL: Suitable for business/corporate context, professional appearance
+        4. CONCEPT_CLARITY: How clearly does the image communicate its intended concept/message?
+        5. BRAND_APPROPRIATENESS: Suitable for corporate communications, appropriate tone
+        6. EMOTIONAL_IMPACT: Visual engagement, emotional resonance, memorability
+        7. INFORMATIONAL_VALUE: Educational content, data visualization, informative elements
+        8. UNIQUENESS: Distinctive from typical stock photos, creative or unique perspective
+        9. SCALABILITY: Works well at different sizes (thumbnail to full size display)
+        10. CONTEXTUAL_FIT: How well does it match the specific analytical approach ({experiment_name})?
+        
+        Respond in JSON format:
+        {{
+            "relevance_to_article": 7.5,
+            "visual_quality": 8.0,
+            "professional_appeal": 9.0,
+            "concept_clarity": 7.0,
+            "brand_appropriateness": 8.5,
+            "emotional_impact": 6.5,
+            "informational_value": 7.5,
+            "uniqueness": 6.0,
+            "scalability": 8.0,
+            "contextual_fit": 8.5,
+            "reasoning": "Brief explanation of the overall assessment and key strengths/weaknesses."
+        }}
+        """
+
+# Parameter breakdown printed for the leader and each contender
+_BREAKDOWN_KEYS = (
+    'relevance_to_article', 'visual_quality', 'professional_appeal',
+    'concept_clarity', 'brand_appropriateness', 'emotional_impact',
+    'informational_value', 'uniqueness', 'scalability', 'contextual_fit',
+)
+_PARAMETER_BREAKDOWN_TMPL = """
+📊 PARAMETER BREAKDOWN:
+   • Relevance to Article: {:.1f}/10
+   • Visual Quality: {:.1f}/10
+   • Professional Appeal: {:.1f}/10
+   • Concept Clarity: {:.1f}/10
+   • Brand Appropriateness: {:.1f}/10
+   • Emotional Impact: {:.1f}/10
+   • Informational Value: {:.1f}/10
+   • Uniqueness: {:.1f}/10
+   • Scalability: {:.1f}/10
+   • Contextual Fit: {:.1f}/10"""
+
+# Persistent cache of parsed analyses, so re-runs skip repeated vision calls
+ANALYSIS_CACHE_DIR = ".image_analysis_cache"
+ANALYSIS_CACHE_MAX_ENTRIES = 1000
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Retry on OpenRouter 429s, 5xx responses and transport errors/timeouts."""
+    if isinstance(exc, (RateLimitError, httpx.TransportError)):
+        return True
+    return isinstance(exc, httpx.HTTPStatusError) and exc.response.status_code >= 500
+
+
+def _extract_json(text: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract the first balanced JSON object from model output.
+    
+    Scans forward once, tracking brace depth and string/escape state, so
+    Markdown fences or trailing prose around the object are ignored.
+    
+    Returns:
+        Parsed object, or None if no balanced object is found
+    
+    Raises:
+        json.JSONDecodeError: If the balanced span is not valid JSON
+    """
+    start = text.find('{')
+    if start == -1:
+        return None
+    
+    depth = 0
+    in_string = False
+    escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == '{':
+            depth += 1
+        elif char == '}':
+            depth -= 1
+            if depth == 0:
+                return json.loads(text[start:index + 1])
+    
+    return None
+
+
+@dataclass(slots=True)
 class ImageRating:
     """Comprehensive image rating across 10 parameters."""
     image_url: str
@@ -42,142 +194,158 @@ class ImageRating:
     
     def calculate_total_score(self):
         """Calculate weighted total score across all parameters."""
-        # Weighted scoring system
-        weights = {
-            'relevance_to_article': 1.5,      # Most important - matches source content
-            'concept_clarity': 1.3,           # Critical for communication
-            'professional_appeal': 1.2,       # Important for business context
-            'visual_quality': 1.1,            # Technical quality matters
-            'contextual_fit': 1.1,            # Matches analytical approach
-            'brand_appropriateness': 1.0,     # Standard weight
-            'emotional_impact': 1.0,          # Standard weight
-            'informational_value': 0.9,       # Slightly less critical
-            'uniqueness': 0.8,                # Nice to have
-            'scalability': 0.6,               # Least critical
-        }
+        scores = np.fromiter(
+            (getattr(self, key) for key in _WEIGHT_KEYS),
+            dtype=np.float64,
+            count=len(_WEIGHT_KEYS)
+        )
+        # Normalize to 10-point scale
+        self.total_score = float(scores @ _WEIGHTS) / _WEIGHT_SUM * 10
+
+
+class AnalysisCache:
+    """On-disk LRU cache of parsed analyses, stored as one JSON file per key."""
+    
+    def __init__(self, cache_dir: str = ANALYSIS_CACHE_DIR,
+                 max_entries: int = ANALYSIS_CACHE_MAX_ENTRIES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(exist_ok=True)
+        self.max_entries = max_entries
         
-        self.total_score = (
-            self.relevance_to_article * weights['relevance_to_article'] +
-            self.concept_clarity * weights['concept_clarity'] +
-            self.professional_appeal * weights['professional_appeal'] +
-            self.visual_quality * weights['visual_quality'] +
-            self.contextual_fit * weights['contextual_fit'] +
-            self.brand_appropriateness * weights['brand_appropriateness'] +
-            self.emotional_impact * weights['emotional_impact'] +
-            self.informational_value * weights['informational_value'] +
-            self.uniqueness * weights['uniqueness'] +
-            self.scalability * weights['scalability']
-        ) / sum(weights.values()) * 10  # Normalize to 10-point scale
+        # Tracked in memory so set() only scans the directory when evicting
+        self._entry_count = sum(1 for _ in self.cache_dir.glob("*.json"))
+    
+    @staticmethod
+    def make_key(image_url: str, prompt: str, model: str) -> str:
+        """Build a cache key from the image URL, prompt and model."""
+        digest = hashlib.sha256()
+        for part in (image_url, prompt, model):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached analysis for a key, or None on a miss."""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        
+        # Refresh mtime so eviction treats this entry as recently used
+        os.utime(path)
+        return data
+    
+    def set(self, key: str, data: Dict[str, Any]):
+        """Store an analysis and evict the least recently used entries."""
+        path = self.cache_dir / f"{key}.json"
+        is_new = not path.exists()
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+        
+        if is_new:
+            self._entry_count += 1
+            if self._entry_count > self.max_entries:
+                self._evict()
+    
+    def _evict(self):
+        """
+        Drop the oldest entries once the cache exceeds max_entries.
+        
+        Evicts down to 90% of max_entries, so the directory scan runs once
+        per batch of new entries rather than on every insert of a full cache.
+        """
+        entries = list(self.cache_dir.glob("*.json"))
+        excess = len(entries) - (self.max_entries - self.max_entries // 10)
+        if excess > 0:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:excess]:
+                entry.unlink(missing_ok=True)
+        
+        self._entry_count = len(entries) - max(0, excess)
 
 
 class ImageAnalyzer:
     """Comprehensive image analysis and ranking system."""
     
+    _article_content: Optional[str] = None
+    
     def __init__(self):
         self.openrouter_client = OpenRouterClient()
         self.imagefox = ImageFox()
         self.article_content = self._load_article()
+        self.analysis_cache = AnalysisCache()
         
-    def _load_article(self) -> str:
-        """Load the easyJet article content for relevance analysis."""
-        try:
-            with open('easyjet_article.txt', 'r') as f:
-                return f.read()
-        except FileNotFoundError:
-            return "easyJet pilot incident analysis article"  # fallback
+        # One connection pool for image downloads and OpenRouter requests,
+        # so concurrent experiments reuse TCP/TLS connections
+        self.http = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=60,
+            follow_redirects=True
+        )
+        
+        # Cap in-flight vision calls so retries don't stampede OpenRouter
+        self.vision_semaphore = asyncio.Semaphore(MAX_VISION_IN_FLIGHT)
+        
+        # image_url -> task producing its base64 data URL
+        self._image_data_urls: Dict[str, asyncio.Task] = {}
+    
+    async def aclose(self):
+        """Close the shared HTTP connection pool."""
+        await self.http.aclose()
+        
+    @classmethod
+    def _load_article(cls) -> str:
+        """Load the easyJet article content for relevance analysis (read once)."""
+        if cls._article_content is None:
+            try:
+                with open('easyjet_article.txt', 'r') as f:
+                    cls._article_content = f.read()
+            except FileNotFoundError:
+                cls._article_content = "easyJet pilot incident analysis article"  # fallback
+        return cls._article_content
     
     async def analyze_image_comprehensive(self, image_url: str, experiment_name: str, 
-                                        search_query: str, title: str) -> ImageRating:
+                                        search_query: str, title: str,
+                                        model: str = MODEL_FAST) -> ImageRating:
         """Perform comprehensive 10-parameter analysis of an image."""
         
         # Create analysis prompt for the 10 parameters
-        analysis_prompt = f"""
-        Analyze this image comprehensively across 10 parameters for the ImageFox experiment "{experiment_name}".
-        
-        CONTEXT:
-        - Source Article: easyJet pilot incident analysis (professional misconduct, corporate response, industry implications)
-        - Search Query Used: "{search_query}"
-        - Analytical Approach: {experiment_name}
-        - Image Title: "{title}"
+        analysis_prompt = _ANALYSIS_PROMPT_TMPL.format_map({
+            'experiment_name': experiment_name,
+            'search_query': search_query,
+            'title': title,
+        })
         
-        Rate the image on each parameter (1-10 scale, where 10 is excellent):
-        
-        1. RELEVANCE_TO_ARTICLE: How well does this image relate to the easyJet pilot incident and corporate response themes?
-        2. VISUAL_QUALITY: Technical quality - resolution, clarity, composition, professional photography
-        3. PROFESSIONAL_APPEAL: Suitable for business/corporate context, professional appearance
-        4. CONCEPT_CLARITY: How clearly does the image communicate its intended concept/message?
-        5. BRAND_APPROPRIATENESS: Suitable for corporate communications, appropriate tone
-        6. EMOTIONAL_IMPACT: Visual engagement, emotional resonance, memorability
-        7. INFORMATIONAL_VALUE: Educational content, data visualization, informative elements
-        8. UNIQUENESS: Distinctive from typical stock photos, creative or unique perspective
-        9. SCALABILITY: Works well at different sizes (thumbnail to full size display)
-        10. CONTEXTUAL_FIT: How well does it match the specific analytical approach ({experiment_name})?
-        
-        Respond in JSON format:
-        {{
-            "relevance_to_article": 7.5,
-            "visual_quality": 8.0,
-            "professional_appeal": 9.0,
-            "concept_clarity": 7.0,
-            "brand_appropriateness": 8.5,
-            "emotional_impact": 6.5,
-            "informational_value": 7.5,
-            "uniqueness": 6.0,
-            "scalability": 8.0,
-            "contextual_fit": 8.5,
-            "reasoning": "Brief explanation of the overall assessment and key strengths/weaknesses."
-        }}
-        """
+        cache_key = self.analysis_cache.make_key(image_url, analysis_prompt, model)
+        cached_analysis = self.analysis_cache.get(cache_key)
+        if cached_analysis is not None:
+            logging.info(f"Using cached analysis for {image_url}")
+            return self._build_rating(cached_analysis, image_url, experiment_name, search_query, title)
         
         try:
-            # Download image temporarily for analysis
-            success, file_path, error = await self.imagefox.image_processor.download_image(image_url)
-            
-            if not success:
-                logging.warning(f"Failed to download image {image_url}: {error}")
+            # Download and encode once per URL, shared across experiments and rescoring
+            try:
+                image_data_url = await self._get_image_data_url(image_url)
+            except httpx.HTTPError as e:
+                logging.warning(f"Failed to download image {image_url}: {e}")
                 return self._create_default_rating(image_url, experiment_name, search_query, title)
             
-            # Analyze with vision model
-            result = self.openrouter_client.analyze_image_with_prompt(
-                file_path, 
-                analysis_prompt,
-                model="google/gemini-2.0-flash-lite-001"
-            )
-            
-            # Clean up downloaded file
-            import os
-            if file_path and os.path.exists(file_path):
-                os.unlink(file_path)
+            # Analyze with vision model on the same pool
+            content = await self._analyze_with_retry(image_data_url, analysis_prompt, model)
             
             # Parse the analysis result
             try:
-                if hasattr(result, 'raw_content') and result.raw_content:
-                    # Try to extract JSON from the response
-                    content = result.raw_content
-                    # Look for JSON in the response
-                    import re
-                    json_match = re.search(r'\{.*\}', content, re.DOTALL)
-                    if json_match:
-                        analysis_data = json.loads(json_match.group())
-                        
-                        rating = ImageRating(
-                            image_url=image_url,
-                            experiment_name=experiment_name,
-                            search_query=search_query,
-                            title=title,
-                            relevance_to_article=float(analysis_data.get('relevance_to_article', 5.0)),
-                            visual_quality=float(analysis_data.get('visual_quality', 5.0)),
-                            professional_appeal=float(analysis_data.get('professional_appeal', 5.0)),
-                            concept_clarity=float(analysis_data.get('concept_clarity', 5.0)),
-                            brand_appropriateness=float(analysis_data.get('brand_appropriateness', 5.0)),
-                            emotional_impact=float(analysis_data.get('emotional_impact', 5.0)),
-                            informational_value=float(analysis_data.get('informational_value', 5.0)),
-                            uniqueness=float(analysis_data.get('uniqueness', 5.0)),
-                            scalability=float(analysis_data.get('scalability', 5.0)),
-                            contextual_fit=float(analysis_data.get('contextual_fit', 5.0))
-                        )
-                        rating.calculate_total_score()
-                        return rating
+                analysis_data = _extract_json(content) if content else None
+                if analysis_data is not None:
+                    rating = self._build_rating(
+                        analysis_data, image_url, experiment_name, search_query, title
+                    )
+                    self.analysis_cache.set(cache_key, analysis_data)
+                    return rating
                         
             except (json.JSONDecodeError, KeyError, ValueError) as e:
                 logging.warning(f"Failed to parse analysis result: {e}")
@@ -188,6 +356,80 @@ class ImageAnalyzer:
         # Return default rating if analysis fails
         return self._create_default_rating(image_url, experiment_name, search_query, title)
     
+    @retry(
+        stop=stop_after_attempt(VISION_MAX_ATTEMPTS),
+        wait=wait_exponential_jitter(initial=1, max=10),
+        retry=retry_if_exception(_is_retryable),
+        reraise=True
+    )
+    async def _analyze_with_retry(self, image_data_url: str, prompt: str, model: str) -> str:
+        """Run one vision call, retrying transient OpenRouter failures with backoff."""
+        async with self.vision_semaphore:
+            return await self.openrouter_client.analyze_image_with_prompt_async(
+                self.http,
+                image_data_url,
+                prompt,
+                model=model
+            )
+    
+    async def _get_image_data_url(self, image_url: str) -> str:
+        """Return the image as a data URL, downloading and encoding it at most once."""
+        task = self._image_data_urls.get(image_url)
+        if task is None:
+            task = asyncio.ensure_future(self._download_and_encode(image_url))
+            self._image_data_urls[image_url] = task
+        try:
+            return await task
+        except httpx.HTTPError:
+            # Don't pin failed downloads; a later caller may try again
+            self._image_data_urls.pop(image_url, None)
+            raise
+    
+    async def _download_and_encode(self, image_url: str) -> str:
+        """Download an image into memory and base64-encode it as a data URL."""
+        image_bytes, mime_type = await self._fetch_bytes(image_url)
+        # Base64 of a multi-megabyte image is CPU work; keep it off the loop
+        return await asyncio.to_thread(
+            self.openrouter_client.encode_image_bytes, image_bytes, mime_type
+        )
+    
+    async def _fetch_bytes(self, image_url: str) -> Tuple[bytes, str]:
+        """
+        Download an image into memory.
+        
+        Returns:
+            Tuple of (image bytes, MIME type)
+        
+        Raises:
+            httpx.HTTPError: If the request fails or returns an error status
+        """
+        response = await self.http.get(image_url)
+        response.raise_for_status()
+        mime_type = response.headers.get('content-type', 'image/jpeg').split(';')[0]
+        return response.content, mime_type
+    
+    def _build_rating(self, analysis_data: Dict[str, Any], image_url: str,
+                      experiment_name: str, search_query: str, title: str) -> ImageRating:
+        """Build a scored rating from parsed analysis data."""
+        rating = ImageRating(
+            image_url=image_url,
+            experiment_name=experiment_name,
+            search_query=search_query,
+            title=title,
+            relevance_to_article=float(analysis_data.get('relevance_to_article', 5.0)),
+            visual_quality=float(analysis_data.get('visual_quality', 5.0)),
+            professional_appeal=float(analysis_data.get('professional_appeal', 5.0)),
+            concept_clarity=float(analysis_data.get('concept_clarity', 5.0)),
+            brand_appropriateness=float(analysis_data.get('brand_appropriateness', 5.0)),
+            emotional_impact=float(analysis_data.get('emotional_impact', 5.0)),
+            informational_value=float(analysis_data.get('informational_value', 5.0)),
+            uniqueness=float(analysis_data.get('uniqueness', 5.0)),
+            scalability=float(analysis_data.get('scalability', 5.0)),
+            contextual_fit=float(analysis_data.get('contextual_fit', 5.0))
+        )
+        rating.calculate_total_score()
+        return rating
+    
     def _create_default_rating(self, image_url: str, experiment_name: str, 
                              search_query: str, title: str) -> ImageRating:
         """Create a default rating when analysis fails."""
@@ -231,15 +473,18 @@ class ImageAnalyzer:
         result = await self.imagefox.search_and_select(request)
         
         if result.selected_images:
-            selected_image = result.selected_images[0]
-            
-            # Analyze the selected image
-            rating = await self.analyze_image_comprehensive(
-                selected_image.image_url,
-                experiment_name,
-                search_query,
-                selected_image.title
-            )
+            # Analyze every selected candidate concurrently so their
+            # downloads and vision calls overlap
+            ratings = await asyncio.gather(*(
+                self.analyze_image_comprehensive(
+                    selected_image.image_url,
+                    experiment_name,
+                    search_query,
+                    selected_image.title
+                )
+                for selected_image in result.selected_images
+            ))
+            rating = max(ratings, key=lambda r: r.total_score)
             
             logging.info(f"{experiment_name} completed - Total Score: {rating.total_score:.2f}")
             return rating
@@ -247,77 +492,96 @@ class ImageAnalyzer:
             logging.warning(f"{experiment_name} - No images selected")
             return self._create_default_rating("", experiment_name, search_query, "No image selected")
     
+    async def rescore_top_ratings(self, ratings: List[ImageRating],
+                                  top_k: int = RESCORE_TOP_K,
+                                  margin: int = RESCORE_MARGIN) -> List[ImageRating]:
+        """
+        Re-score the first-pass finalists with the precise model.
+        
+        The top top_k + margin MODEL_FAST ratings are sent to MODEL_PRECISE.
+        The two models are calibrated differently, so the returned ratings
+        must only be ranked against each other, never mixed with first-pass
+        scores.
+        
+        Returns:
+            Precise ratings of the finalists
+        """
+        finalists = heapq.nlargest(
+            top_k + margin,
+            (rating for rating in ratings if rating.image_url),
+            key=attrgetter('total_score')
+        )
+        
+        return list(await asyncio.gather(*(
+            self.analyze_image_comprehensive(
+                rating.image_url,
+                rating.experiment_name,
+                rating.search_query,
+                rating.title,
+                model=MODEL_PRECISE
+            )
+            for rating in finalists
+        )))
+    
     def rank_images(self, ratings: List[ImageRating]) -> Tuple[ImageRating, List[ImageRating]]:
         """Rank all images and return top leader and 2 contenders."""
-        # Sort by total score (highest first)
-        sorted_ratings = sorted(ratings, key=lambda r: r.total_score, reverse=True)
+        # Only the top 3 are needed, so select them without a full sort
+        top_ratings = heapq.nlargest(3, ratings, key=attrgetter('total_score'))
         
-        leader = sorted_ratings[0] if sorted_ratings else None
-        contenders = sorted_ratings[1:3] if len(sorted_ratings) > 1 else sorted_ratings[1:] if len(sorted_ratings) > 1 else []
+        leader = top_ratings[0] if top_ratings else None
+        contenders = top_ratings[1:3]
         
         return leader, contenders
     
     def print_detailed_results(self, leader: ImageRating, contenders: List[ImageRating], all_ratings: List[ImageRating]):
         """Print comprehensive analysis results."""
-        print("\n" + "="*80)
-        print("🏆 IMAGEFOX COMPREHENSIVE IMAGE ANALYSIS RESULTS 🏆")
-        print("="*80)
+        lines = []
+        add = lines.append
+        
+        add("\n" + "="*80)
+        add("🏆 IMAGEFOX COMPREHENSIVE IMAGE ANALYSIS RESULTS 🏆")
+        add("="*80)
         
-        print(f"\n📊 TOTAL IMAGES ANALYZED: {len(all_ratings)}")
-        print(f"📈 ANALYSIS PARAMETERS: 10 comprehensive criteria")
-        print(f"⚖️  SCORING SYSTEM: Weighted 10-point scale")
+        add(f"\n📊 TOTAL IMAGES ANALYZED: {len(all_ratings)}")
+        add(f"📈 ANALYSIS PARAMETERS: 10 comprehensive criteria")
+        add(f"⚖️  SCORING SYSTEM: Weighted 10-point scale")
         
         # TOP LEADER
         if leader:
-            print(f"\n🥇 TOP LEADER - SCORE: {leader.total_score:.2f}/10")
-            print("-" * 50)
-            print(f"🔬 EXPERIMENT: {leader.experiment_name}")
-            print(f"🔍 SEARCH QUERY: {leader.search_query}")
-            print(f"🖼️  IMAGE TITLE: {leader.title}")
-            print(f"🔗 IMAGE URL: {leader.image_url}")
-            print("\n📊 PARAMETER BREAKDOWN:")
-            print(f"   • Relevance to Article: {leader.relevance_to_article:.1f}/10")
-            print(f"   • Visual Quality: {leader.visual_quality:.1f}/10")
-            print(f"   • Professional Appeal: {leader.professional_appeal:.1f}/10")
-            print(f"   • Concept Clarity: {leader.concept_clarity:.1f}/10")
-            print(f"   • Brand Appropriateness: {leader.brand_appropriateness:.1f}/10")
-            print(f"   • Emotional Impact: {leader.emotional_impact:.1f}/10")
-            print(f"   • Informational Value: {leader.informational_value:.1f}/10")
-            print(f"   • Uniqueness: {leader.uniqueness:.1f}/10")
-            print(f"   • Scalability: {leader.scalability:.1f}/10")
-            print(f"   • Contextual Fit: {leader.contextual_fit:.1f}/10")
+            add(f"\n🥇 TOP LEADER - SCORE: {leader.total_score:.2f}/10")
+            self._append_rating_details(add, leader)
         
         # CONTENDERS
         for i, contender in enumerate(contenders, 1):
             rank_emoji = "🥈" if i == 1 else "🥉"
-            print(f"\n{rank_emoji} CONTENDER #{i} - SCORE: {contender.total_score:.2f}/10")
-            print("-" * 50)
-            print(f"🔬 EXPERIMENT: {contender.experiment_name}")
-            print(f"🔍 SEARCH QUERY: {contender.search_query}")
-            print(f"🖼️  IMAGE TITLE: {contender.title}")
-            print(f"🔗 IMAGE URL: {contender.image_url}")
-            print("\n📊 PARAMETER BREAKDOWN:")
-            print(f"   • Relevance to Article: {contender.relevance_to_article:.1f}/10")
-            print(f"   • Visual Quality: {contender.visual_quality:.1f}/10")
-            print(f"   • Professional Appeal: {contender.professional_appeal:.1f}/10")
-            print(f"   • Concept Clarity: {contender.concept_clarity:.1f}/10")
-            print(f"   • Brand Appropriateness: {contender.brand_appropriateness:.1f}/10")
-            print(f"   • Emotional Impact: {contender.emotional_impact:.1f}/10")
-            print(f"   • Informational Value: {contender.informational_value:.1f}/10")
-            print(f"   • Uniqueness: {contender.uniqueness:.1f}/10")
-            print(f"   • Scalability: {contender.scalability:.1f}/10")
-            print(f"   • Contextual Fit: {contender.contextual_fit:.1f}/10")
+            add(f"\n{rank_emoji} CONTENDER #{i} - SCORE: {contender.total_score:.2f}/10")
+            self._append_rating_details(add, contender)
         
         # FULL RANKINGS
-        print(f"\n📋 COMPLETE RANKINGS:")
-        print("-" * 50)
+        add(f"\n📋 COMPLETE RANKINGS (first pass, {MODEL_FAST}):")
+        add("-" * 50)
         sorted_ratings = sorted(all_ratings, key=lambda r: r.total_score, reverse=True)
         for i, rating in enumerate(sorted_ratings, 1):
-            print(f"{i:2d}. {rating.experiment_name:<35} Score: {rating.total_score:.2f}")
+            add(f"{i:2d}. {rating.experiment_name:<35} Score: {rating.total_score:.2f}")
         
-        print("\n" + "="*80)
-        print("✅ ANALYSIS COMPLETE - ImageFox methodology validated with comprehensive scoring!")
-        print("="*80)
+        add("\n" + "="*80)
+        add("✅ ANALYSIS COMPLETE - ImageFox methodology validated with comprehensive scoring!")
+        add("="*80)
+        
+        # Emit the whole report with a single write
+        sys.stdout.write("\n".join(lines) + "\n")
+    
+    @staticmethod
+    def _append_rating_details(add, rating: ImageRating):
+        """Append the experiment details and parameter breakdown of a rating."""
+        add("-" * 50)
+        add(f"🔬 EXPERIMENT: {rating.experiment_name}")
+        add(f"🔍 SEARCH QUERY: {rating.search_query}")
+        add(f"🖼️  IMAGE TITLE: {rating.title}")
+        add(f"🔗 IMAGE URL: {rating.image_url}")
+        add(_PARAMETER_BREAKDOWN_TMPL.format(
+            *(getattr(rating, key) for key in _BREAKDOWN_KEYS)
+        ))
 
 
 async def main():
@@ -346,7 +610,6 @@ async def main():
     ]
     
     analyzer = ImageAnalyzer()
-    all_ratings = []
     
     print("🚀 STARTING COMPREHENSIVE IMAGE ANALYSIS...")
     print(f"📊 Analyzing {len(experiments)} experiments across 10 parameters each")
@@ -354,30 +617,49 @@ async def main():
     # Run subset for testing (first 5 experiments)
     test_experiments = experiments[:5]  # Start with 5 for testing
     
-    for experiment in test_experiments:
-        try:
-            rating = await analyzer.run_experiment_and_analyze(experiment)
-            all_ratings.append(rating)
-        except Exception as e:
-            logging.error(f"Error in experiment {experiment['name']}: {e}")
-            continue
+    # Run experiments concurrently, bounded to avoid flooding the APIs
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_EXPERIMENTS)
+    
+    async def run_bounded(experiment: Dict) -> ImageRating:
+        async with semaphore:
+            return await analyzer.run_experiment_and_analyze(experiment)
+    
+    try:
+        outcomes = await asyncio.gather(
+            *(run_bounded(experiment) for experiment in test_experiments),
+            return_exceptions=True
+        )
+        
+        all_ratings = []
+        for experiment, outcome in zip(test_experiments, outcomes):
+            if isinstance(outcome, ImageRating):
+                all_ratings.append(outcome)
+            else:
+                logging.error(f"Error in experiment {experiment['name']}: {outcome}")
+        
+        # Confirm the leader and contenders with the precise model; the
+        # finalists are ranked only against each other
+        finalists = await analyzer.rescore_top_ratings(all_ratings)
+    finally:
+        await analyzer.aclose()
     
     if all_ratings:
-        # Rank images
-        leader, contenders = analyzer.rank_images(all_ratings)
+        # Rank the precisely scored finalists
+        leader, contenders = analyzer.rank_images(finalists)
         
         # Print detailed results
         analyzer.print_detailed_results(leader, contenders, all_ratings)
         
-        # Save results to file
+        # Save results to file; orjson serializes the dataclasses natively
         results_data = {
-            "leader": asdict(leader) if leader else None,
-            "contenders": [asdict(c) for c in contenders],
-            "all_ratings": [asdict(r) for r in all_ratings]
+            "leader": leader,
+            "contenders": contenders,
+            "finalists": finalists,
+            "all_ratings": all_ratings
         }
         
-        with open('image_analysis_results.json', 'w') as f:
-            json.dump(results_data, f, indent=2)
+        with open('image_analysis_results.json', 'wb') as f:
+            f.write(orjson.dumps(results_data, option=orjson.OPT_INDENT_2))
         
         print(f"\n💾 Results saved to: image_analysis_results.json")
     else:
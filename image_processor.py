@@ -11,13 +11,22 @@ import os
 import io
 import asyncio
 import aiohttp
+import aiofiles
 import tempfile
 import hashlib
+import secrets
 import logging
+import time
+import functools
+import threading
+import shutil
+import subprocess
 from typing import Dict, List, Optional, Any, Tuple, Union
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+import numpy as np
 import sentry_sdk
 from sentry_sdk import capture_exception
 
@@ -29,6 +38,29 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Color modes with an alpha channel
+_TRANSPARENT_MODES = frozenset({'RGBA', 'LA'})
+
+# EXIF tag IDs that carry a capture/creation timestamp
+_DATETIME_TAG_IDS = frozenset(
+    tag_id for tag_id, name in TAGS.items()
+    if name in ('DateTime', 'DateTimeOriginal', 'DateTimeDigitized')
+)
+
+# Optional libvips backend: shrink-on-load decoding for large images
+try:
+    import pyvips
+    PYVIPS_AVAILABLE = True
+except (ImportError, OSError):
+    PYVIPS_AVAILABLE = False
+
+# Optional libjpeg-turbo encoder for optimized JPEG output
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJPF_GRAY, TJSAMP_420, TJSAMP_GRAY, TJFLAG_PROGRESSIVE
+    TURBOJPEG_AVAILABLE = True
+except ImportError:
+    TURBOJPEG_AVAILABLE = False
+
 # Try to import proxy support
 try:
     from proxy_config import DataImpulseConfig
@@ -39,6 +71,49 @@ except ImportError:
     logger.warning("Proxy support not available. Install proxy_config and proxy_image_processor for proxy support.")
 
 
+def _sha256_file(file_path: str) -> str:
+    """Hex SHA-256 of a file, streamed instead of read into memory whole."""
+    with open(file_path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+            return hashlib.file_digest(f, 'sha256').hexdigest()
+        
+        hasher = hashlib.sha256()
+        buf = bytearray(1024 * 1024)
+        view = memoryview(buf)
+        while n := f.readinto(buf):
+            hasher.update(view[:n])
+        return hasher.hexdigest()
+
+
+def _open_image(file_path: str, data: Optional[bytes] = None) -> Image.Image:
+    """Open an image from already-read bytes when available, else from disk."""
+    return Image.open(io.BytesIO(data) if data is not None else file_path)
+
+
+def _vips_save_resized(source: Union[str, bytes], output_path: Path, width: int, height: int,
+                       **save_kwargs) -> Tuple[int, int, str]:
+    """
+    Shrink an image (path or bytes) into a width x height box with libvips and save it as JPEG.
+    
+    pyvips.Image.thumbnail combines open and resize, so JPEG/WebP/TIFF inputs
+    are decoded at reduced scale, and it auto-orients from EXIF. Transparency
+    is flattened onto white to match the Pillow path.
+    
+    Returns:
+        Tuple of (width, height, PIL-style color mode) of the saved image
+    """
+    if isinstance(source, bytes):
+        image = pyvips.Image.thumbnail_buffer(source, width, height=height, size='down')
+    else:
+        image = pyvips.Image.thumbnail(source, width, height=height, size='down')
+    if image.hasalpha():
+        image = image.flatten(background=[255, 255, 255])
+    if image.interpretation not in ('srgb', 'b-w'):
+        image = image.colourspace('srgb')
+    image.jpegsave(str(output_path), strip=True, **save_kwargs)
+    return image.width, image.height, 'L' if image.bands == 1 else 'RGB'
+
+
 @dataclass
 class ImageMetadata:
     """Metadata extracted from an image."""
@@ -78,11 +153,19 @@ class ImageProcessor:
     MIN_IMAGE_HEIGHT = int(os.getenv('MIN_IMAGE_HEIGHT', '300'))
     IMAGE_QUALITY = int(os.getenv('IMAGE_QUALITY', '85'))
     THUMBNAIL_SIZE = (300, 300)
+    DOWNLOAD_CHUNK_SIZE = 64 * 1024
+    MAX_DIMENSION = 2048  # Longest side of optimized images
+    POSTPROCESS_JPEG = os.getenv('POSTPROCESS_JPEG', '0') == '1'
+    HEAD_PRECHECK = os.getenv('HEAD_PRECHECK', '1') == '1'
     
     # Supported formats
     SUPPORTED_FORMATS = {'JPEG', 'JPG', 'PNG', 'WebP', 'GIF', 'BMP', 'TIFF'}
     
-    def __init__(self, temp_dir: Optional[str] = None, concurrent_downloads: int = 5, use_proxy: bool = False):
+    # Shared TurboJPEG instance (None = not loaded yet, False = unavailable)
+    _turbojpeg = None
+    
+    def __init__(self, temp_dir: Optional[str] = None, concurrent_downloads: int = 5, use_proxy: bool = False,
+                 use_vips: bool = True):
         """
         Initialize Image Processor.
         
@@ -90,6 +173,7 @@ class ImageProcessor:
             temp_dir: Directory for temporary files (uses system temp if None)
             concurrent_downloads: Maximum concurrent downloads
             use_proxy: Whether to use DataImpulse proxy for downloads
+            use_vips: Whether to resize with libvips when pyvips is installed
         """
         self.temp_dir = Path(temp_dir) if temp_dir else Path(tempfile.gettempdir()) / "imagefox"
         self.temp_dir.mkdir(exist_ok=True)
@@ -97,7 +181,15 @@ class ImageProcessor:
         self.concurrent_downloads = concurrent_downloads
         self.session = None
         self.temp_files = []
+        self._hash_cache: Dict[str, str] = {}  # downloaded path -> SHA-256 computed while streaming
+        self._cpu_pool: Optional[ThreadPoolExecutor] = None
+        self._stats_lock = threading.Lock()  # counters are also bumped from _run_cpu workers
+        
+        # Content-addressed reuse: (sha256, optimize, generate_thumb) -> result, url -> sha256
+        self._result_cache: Dict[Tuple[str, bool, bool], ProcessingResult] = {}
+        self._url_cache: Dict[str, str] = {}
         self.use_proxy = use_proxy and PROXY_AVAILABLE
+        self.use_vips = use_vips and PYVIPS_AVAILABLE
         
         # Initialize proxy processor if enabled
         self.proxy_processor = None
@@ -125,16 +217,59 @@ class ImageProcessor:
     
     async def __aenter__(self):
         """Async context manager entry."""
-        self.session = aiohttp.ClientSession(
-            timeout=aiohttp.ClientTimeout(total=30),
-            headers={'User-Agent': 'ImageFox/1.0'}
-        )
+        await self._ensure_session()
         return self
     
+    async def _run_cpu(self, func, *args, **kwargs):
+        """
+        Run decode/resize/encode work on a per-core thread pool.
+        
+        Pillow releases the GIL while decoding, resampling and encoding, so
+        threads give real parallelism here without pickling the processor
+        (and its session/stats) into worker processes.
+        """
+        if self._cpu_pool is None:
+            self._cpu_pool = ThreadPoolExecutor(
+                max_workers=os.cpu_count() or 1,
+                thread_name_prefix='imagefox-cpu'
+            )
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._cpu_pool, functools.partial(func, *args, **kwargs))
+    
+    def _count(self, key: str):
+        """Increment a statistics counter; safe to call from _run_cpu worker threads."""
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """
+        Create the shared session, with a bounded keep-alive connection pool.
+        
+        A session closed by __aexit__ is replaced, so the processor can be
+        re-entered or used for downloads after the context exits.
+        """
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.concurrent_downloads * 2,
+                limit_per_host=self.concurrent_downloads,
+                keepalive_timeout=30,
+                ttl_dns_cache=300  # Cache DNS for 5 minutes
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=30),
+                headers={'User-Agent': 'ImageFox/1.0'}
+            )
+        return self.session
+    
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
         if self.session:
             await self.session.close()
+        if self._cpu_pool:
+            # Wait for in-flight CPU jobs without blocking the event loop
+            pool, self._cpu_pool = self._cpu_pool, None
+            await asyncio.to_thread(pool.shutdown)
         self.cleanup_temp()
     
     async def download_image_with_proxy(self, url: str) -> Tuple[bool, Optional[str], Optional[str]]:
@@ -186,18 +321,19 @@ class ImageProcessor:
         if self.use_proxy:
             logger.debug(f"Downloading with proxy: {url}")
             return await self.download_image_with_proxy(url)
-        start_time = datetime.now()
+        start_time = time.perf_counter_ns()
         self.stats['downloads_attempted'] += 1
         
         try:
-            if not self.session:
-                self.session = aiohttp.ClientSession(
-                    timeout=aiohttp.ClientTimeout(total=30),
-                    headers={'User-Agent': 'ImageFox/1.0'}
-                )
+            await self._ensure_session()
             
             max_size_bytes = (max_size_mb or self.MAX_IMAGE_SIZE_MB) * 1024 * 1024
             
+            if self.HEAD_PRECHECK:
+                head_error = await self._head_precheck(url, max_size_bytes)
+                if head_error:
+                    return False, None, head_error
+            
             async with self.session.get(url) as response:
                 if response.status != 200:
                     return False, None, f"HTTP {response.status}: {response.reason}"
@@ -207,26 +343,29 @@ class ImageProcessor:
                 if content_length and int(content_length) > max_size_bytes:
                     return False, None, f"File too large: {int(content_length)} bytes"
                 
-                # Generate temp file path
-                file_hash = hashlib.md5(url.encode()).hexdigest()[:12]
+                # Generate temp file path (random suffix: only uniqueness matters)
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                temp_path = self.temp_dir / f"image_{timestamp}_{file_hash}"
+                temp_path = self.temp_dir / f"image_{timestamp}_{secrets.token_hex(6)}"
                 
                 # Download with size checking
                 downloaded_size = 0
-                with open(temp_path, 'wb') as f:
-                    async for chunk in response.content.iter_chunked(8192):
+                hasher = hashlib.sha256()
+                # Writes run on aiofiles' thread pool so disk I/O overlaps other downloads
+                async with aiofiles.open(temp_path, 'wb') as f:
+                    async for chunk in response.content.iter_chunked(self.DOWNLOAD_CHUNK_SIZE):
                         downloaded_size += len(chunk)
                         if downloaded_size > max_size_bytes:
                             temp_path.unlink()
                             return False, None, f"File too large during download: {downloaded_size} bytes"
-                        f.write(chunk)
+                        hasher.update(chunk)
+                        await f.write(chunk)
                 
                 self.temp_files.append(str(temp_path))
+                self._hash_cache[str(temp_path)] = hasher.hexdigest()
                 self.stats['downloads_successful'] += 1
                 self.stats['total_bytes_downloaded'] += downloaded_size
                 
-                processing_time = (datetime.now() - start_time).total_seconds()
+                processing_time = (time.perf_counter_ns() - start_time) / 1e9
                 logger.debug(f"Downloaded {url} ({downloaded_size} bytes) in {processing_time:.2f}s")
                 
                 return True, str(temp_path), None
@@ -238,81 +377,122 @@ class ImageProcessor:
             capture_exception(e)
             return False, None, str(e)
     
-    def validate_image(self, file_path: str) -> Tuple[bool, Optional[str]]:
+    async def _head_precheck(self, url: str, max_size_bytes: int) -> Optional[str]:
+        """
+        Reject obviously unusable URLs with a HEAD request before streaming the body.
+        
+        Only a definite answer rejects: a non-image Content-Type or a
+        Content-Length over the limit. Servers that refuse HEAD (405/501),
+        omit the headers or fail the request fall through to the normal GET.
+        
+        Returns:
+            Error message if the URL should be skipped, otherwise None
+        """
+        try:
+            async with self.session.head(url, allow_redirects=True) as response:
+                if response.status != 200:
+                    return None
+                
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+                if content_type and not content_type.startswith('image/') \
+                        and content_type != 'application/octet-stream':
+                    return f"Not an image: {content_type}"
+                
+                content_length = response.headers.get('Content-Length')
+                if content_length and content_length.isdigit() and int(content_length) > max_size_bytes:
+                    return f"File too large: {int(content_length)} bytes"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"HEAD precheck failed for {url}, falling back to GET: {str(e)}")
+        return None
+    
+    def validate_image(self, file_path: str, data: Optional[bytes] = None,
+                       strict_validation: bool = False) -> Tuple[bool, Optional[str]]:
         """
         Validate image format and integrity.
         
+        Format and dimensions come from the parsed header, so no pixels are
+        decoded. Corrupt pixel data surfaces later when the image is decoded
+        for optimization; pass strict_validation to also run Image.verify().
+        
         Args:
             file_path: Path to image file
+            data: Contents of file_path if already read (avoids re-reading the file)
+            strict_validation: Whether to verify file integrity up front
         
         Returns:
             Tuple of (is_valid, error_message)
         """
         try:
-            with Image.open(file_path) as img:
-                # Verify it's a valid image
-                img.verify()
-                
+            with _open_image(file_path, data) as img:
                 # Check format
                 if img.format not in self.SUPPORTED_FORMATS:
                     return False, f"Unsupported format: {img.format}"
                 
-                # Reopen for size checking (verify() closes the image)
-                with Image.open(file_path) as img2:
-                    width, height = img2.size
-                    
-                    # Check minimum dimensions
-                    if width < self.MIN_IMAGE_WIDTH or height < self.MIN_IMAGE_HEIGHT:
-                        return False, f"Image too small: {width}x{height} (min: {self.MIN_IMAGE_WIDTH}x{self.MIN_IMAGE_HEIGHT})"
-                    
-                    # Check aspect ratio (avoid extremely narrow images)
-                    aspect_ratio = max(width, height) / min(width, height)
-                    if aspect_ratio > 10:
-                        return False, f"Extreme aspect ratio: {aspect_ratio:.1f}"
+                width, height = img.size
+                
+                # Check minimum dimensions
+                if width < self.MIN_IMAGE_WIDTH or height < self.MIN_IMAGE_HEIGHT:
+                    return False, f"Image too small: {width}x{height} (min: {self.MIN_IMAGE_WIDTH}x{self.MIN_IMAGE_HEIGHT})"
+                
+                # Check aspect ratio (avoid extremely narrow images)
+                aspect_ratio = max(width, height) / min(width, height)
+                if aspect_ratio > 10:
+                    return False, f"Extreme aspect ratio: {aspect_ratio:.1f}"
+                
+                if strict_validation:
+                    # Verify it's a valid image
+                    img.verify()
                 
                 return True, None
                 
         except Exception as e:
             return False, f"Invalid image file: {str(e)}"
     
-    def extract_metadata(self, file_path: str, url: str) -> ImageMetadata:
+    def extract_metadata(self, file_path: str, url: str, data: Optional[bytes] = None) -> ImageMetadata:
         """
         Extract comprehensive metadata from image.
         
         Args:
             file_path: Path to image file
             url: Original URL of image
+            data: Contents of file_path if already read (avoids re-reading the file)
         
         Returns:
             ImageMetadata object
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter_ns()
         
         try:
-            with Image.open(file_path) as img:
+            with _open_image(file_path, data) as img:
                 # Basic metadata
                 width, height = img.size
-                file_size = os.path.getsize(file_path)
+                file_size = len(data) if data is not None else os.path.getsize(file_path)
                 aspect_ratio = width / height
                 
                 # Color mode and transparency
                 color_mode = img.mode
-                has_transparency = (
-                    'transparency' in img.info or
-                    color_mode in ('RGBA', 'LA') or
-                    (color_mode == 'P' and 'transparency' in img.info)
-                )
+                # Alpha modes first; the info lookup also covers palette transparency
+                has_transparency = color_mode in _TRANSPARENT_MODES or 'transparency' in img.info
                 
                 # File hash
-                with open(file_path, 'rb') as f:
-                    file_hash = hashlib.sha256(f.read()).hexdigest()
+                file_hash = self._hash_cache.get(file_path)
+                if file_hash is None:
+                    file_hash = (hashlib.sha256(data).hexdigest() if data is not None
+                                 else _sha256_file(file_path))
                 
                 # EXIF data
                 exif_data = {}
                 creation_time = None
                 
-                if hasattr(img, '_getexif') and img._getexif():
-                    exif_dict = img._getexif()
+                exif = img.getexif()
+                if exif:
+                    # IFD0 plus the Exif sub-IFD (where DateTimeOriginal lives) and GPS,
+                    # the same flattened view _getexif() used to build
+                    exif_dict = dict(exif)
+                    exif_dict.update(exif.get_ifd(ExifTags.IFD.Exif))
+                    gps_info = exif.get_ifd(ExifTags.IFD.GPSInfo)
+                    if gps_info:
+                        exif_dict[ExifTags.IFD.GPSInfo] = gps_info
                     for tag_id, value in exif_dict.items():
                         tag = TAGS.get(tag_id, tag_id)
                         try:
@@ -322,7 +502,7 @@ class ImageProcessor:
                             exif_data[tag] = value
                             
                             # Extract creation time
-                            if tag in ['DateTime', 'DateTimeOriginal', 'DateTimeDigitized']:
+                            if tag_id in _DATETIME_TAG_IDS:
                                 try:
                                     creation_time = datetime.strptime(str(value), '%Y:%m:%d %H:%M:%S')
                                 except:
@@ -331,7 +511,7 @@ class ImageProcessor:
                             # Skip problematic EXIF data
                             continue
                 
-                processing_time = (datetime.now() - start_time).total_seconds()
+                processing_time = (time.perf_counter_ns() - start_time) / 1e9
                 
                 return ImageMetadata(
                     url=url,
@@ -354,96 +534,211 @@ class ImageProcessor:
             capture_exception(e)
             raise
     
-    def optimize_image(self, file_path: str, quality: Optional[int] = None) -> Optional[str]:
+    def optimize_image(self, file_path: str, quality: Optional[int] = None,
+                       data: Optional[bytes] = None) -> Optional[str]:
         """
         Optimize image size and quality.
         
         Args:
             file_path: Path to original image
             quality: JPEG quality (uses default if None)
+            data: Contents of file_path if already read (avoids re-reading the file)
         
         Returns:
             Path to optimized image or None if optimization failed
         """
-        start_time = datetime.now()
+        result = self._optimize_image(file_path, quality, data)
+        return result[0] if result else None
+    
+    def _optimize_image(self, file_path: str, quality: Optional[int] = None,
+                        data: Optional[bytes] = None) -> Optional[Tuple[str, int, int, str]]:
+        """Optimize an image; returns (path, width, height, color mode) of the output."""
+        start_time = time.perf_counter_ns()
         quality = quality or self.IMAGE_QUALITY
         
         try:
-            with Image.open(file_path) as img:
-                # Convert to RGB if necessary (for JPEG optimization)
-                if img.mode in ('RGBA', 'P', 'LA'):
-                    # Create white background for transparency
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = background
-                elif img.mode not in ('RGB', 'L'):
-                    img = img.convert('RGB')
-                
-                # Auto-orient based on EXIF
-                img = ImageOps.exif_transpose(img)
-                
-                # Calculate optimization - reduce size if too large
-                max_dimension = 2048
-                if max(img.size) > max_dimension:
-                    img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
-                
+            with _open_image(file_path, data) as img:
                 # Generate optimized file path
                 original_path = Path(file_path)
                 optimized_path = original_path.parent / f"{original_path.stem}_optimized{original_path.suffix}"
                 
-                # Save optimized version
-                save_kwargs = {
-                    'format': 'JPEG',
-                    'quality': quality,
-                    'optimize': True,
-                    'progressive': True
-                }
-                
-                img.save(optimized_path, **save_kwargs)
-                
-                self.temp_files.append(str(optimized_path))
-                self.stats['images_optimized'] += 1
-                
-                processing_time = (datetime.now() - start_time).total_seconds()
-                
-                # Check if optimization was effective
-                original_size = os.path.getsize(file_path)
-                optimized_size = os.path.getsize(optimized_path)
-                
-                if optimized_size < original_size * 0.9:  # At least 10% reduction
-                    logger.debug(f"Optimized image: {original_size} -> {optimized_size} bytes "
-                               f"({100 * (1 - optimized_size/original_size):.1f}% reduction) "
-                               f"in {processing_time:.2f}s")
-                    return str(optimized_path)
+                if self.use_vips and max(img.size) > self.MAX_DIMENSION:
+                    # libvips decodes at reduced scale instead of full resolution
+                    width, height, mode = _vips_save_resized(
+                        data if data is not None else file_path, optimized_path,
+                        self.MAX_DIMENSION, self.MAX_DIMENSION,
+                        Q=quality, optimize_coding=True, interlace=True
+                    )
                 else:
-                    # Optimization not effective, remove file
-                    optimized_path.unlink()
-                    self.temp_files.remove(str(optimized_path))
-                    return None
+                    img = self._decode_for_optimize(img)
+                    self._save_optimized(img, optimized_path, quality)
+                    width, height = img.size
+                    mode = img.mode
+                
+                original_size = len(data) if data is not None else os.path.getsize(file_path)
+                if self._keep_optimized(optimized_path, original_size, start_time):
+                    return str(optimized_path), width, height, mode
+                return None
                 
         except Exception as e:
             logger.error(f"Failed to optimize image {file_path}: {str(e)}")
             capture_exception(e)
             return None
     
-    def generate_thumbnail(self, file_path: str, size: Optional[Tuple[int, int]] = None) -> Optional[str]:
+    def _decode_for_optimize(self, img: Image.Image) -> Image.Image:
+        """Decode, flatten and auto-orient an opened image, shrunk to fit MAX_DIMENSION."""
+        max_dimension = self.MAX_DIMENSION
+        
+        # Let libjpeg decode at 1/2, 1/4 or 1/8 scale when that still covers max_dimension
+        if img.format == 'JPEG':
+            scale = max(img.size[0] // max_dimension, img.size[1] // max_dimension, 1)
+            img.draft('RGB', (img.size[0] // scale, img.size[1] // scale))
+        
+        img = self._to_jpeg_mode(img)
+        
+        # Auto-orient based on EXIF
+        img = ImageOps.exif_transpose(img)
+        
+        if max(img.size) > max_dimension:
+            img.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        return img
+    
+    @staticmethod
+    def _to_jpeg_mode(img: Image.Image) -> Image.Image:
+        """Convert to RGB/L for JPEG, flattening transparency onto white."""
+        if img.mode in ('RGBA', 'P', 'LA'):
+            # Blend onto white: rgb * a + 255 * (1 - a), in integer math on the whole array
+            rgba = np.asarray(img.convert('RGBA'), dtype=np.uint16)
+            alpha = rgba[..., 3:4]
+            rgb = (rgba[..., :3] * alpha + 255 * (255 - alpha) + 127) // 255
+            return Image.fromarray(rgb.astype(np.uint8), 'RGB')
+        if img.mode not in ('RGB', 'L'):
+            return img.convert('RGB')
+        return img
+    
+    def _save_optimized(self, img: Image.Image, optimized_path: Path, quality: int):
+        """Encode the optimized JPEG and track it as a temp file."""
+        encoder = self._get_turbojpeg()
+        if encoder is not None:
+            self._save_turbojpeg(encoder, img, optimized_path, quality)
+        else:
+            save_kwargs = {
+                'format': 'JPEG',
+                'quality': quality,
+                'optimize': True,
+                'progressive': True
+            }
+            
+            img.save(optimized_path, **save_kwargs)
+        
+        if self.POSTPROCESS_JPEG:
+            self._jpegoptim(optimized_path, quality)
+        
+        self.temp_files.append(str(optimized_path))
+        self._count('images_optimized')
+    
+    def _keep_optimized(self, optimized_path: Path, original_size: int, start_time: int) -> bool:
+        """Keep the optimized file only if it is at least 10% smaller; otherwise delete it."""
+        processing_time = (time.perf_counter_ns() - start_time) / 1e9
+        optimized_size = os.path.getsize(optimized_path)
+        
+        if optimized_size < original_size * 0.9:  # At least 10% reduction
+            logger.debug(f"Optimized image: {original_size} -> {optimized_size} bytes "
+                       f"({100 * (1 - optimized_size/original_size):.1f}% reduction) "
+                       f"in {processing_time:.2f}s")
+            return True
+        
+        # Optimization not effective, remove file
+        optimized_path.unlink()
+        self.temp_files.remove(str(optimized_path))
+        return False
+    
+    @staticmethod
+    def _jpegoptim(path: Path, quality: int):
+        """Strip metadata and re-optimize a JPEG with jpegoptim, if it is installed."""
+        jpegoptim = shutil.which('jpegoptim')
+        if not jpegoptim:
+            logger.debug("POSTPROCESS_JPEG is set but jpegoptim is not installed")
+            return
+        result = subprocess.run(
+            [jpegoptim, '--strip-all', '--all-progressive', '-q', '-m', str(quality), str(path)],
+            capture_output=True, text=True, check=False
+        )
+        if result.returncode != 0:
+            logger.warning(f"jpegoptim failed for {path}: {result.stderr.strip()}")
+    
+    @classmethod
+    def _get_turbojpeg(cls) -> Optional['TurboJPEG']:
+        """Return the shared TurboJPEG encoder, loading libturbojpeg once per process."""
+        if cls._turbojpeg is None and TURBOJPEG_AVAILABLE:
+            try:
+                cls._turbojpeg = TurboJPEG()
+            except (OSError, RuntimeError) as e:
+                logger.warning(f"libturbojpeg not loadable, using Pillow JPEG encoder: {str(e)}")
+                cls._turbojpeg = False
+        return cls._turbojpeg or None
+    
+    @staticmethod
+    def _save_turbojpeg(encoder: 'TurboJPEG', img: Image.Image, path: Path, quality: int):
+        """Encode an RGB or L image as progressive JPEG with libjpeg-turbo."""
+        if img.mode == 'L':
+            pixel_format, subsample = TJPF_GRAY, TJSAMP_GRAY
+        else:
+            pixel_format, subsample = TJPF_RGB, TJSAMP_420
+        data = encoder.encode(
+            np.ascontiguousarray(np.asarray(img)),
+            quality=quality,
+            pixel_format=pixel_format,
+            jpeg_subsample=subsample,
+            flags=TJFLAG_PROGRESSIVE
+        )
+        with open(path, 'wb') as f:
+            f.write(data)
+    
+    def generate_thumbnail(self, file_path: str, size: Optional[Tuple[int, int]] = None,
+                           data: Optional[bytes] = None) -> Optional[str]:
         """
         Generate thumbnail of image.
         
         Args:
             file_path: Path to original image
             size: Thumbnail size (uses default if None)
+            data: Contents of file_path if already read (avoids re-reading the file)
         
         Returns:
             Path to thumbnail or None if generation failed
         """
-        start_time = datetime.now()
+        result = self._generate_thumbnail(file_path, size, data)
+        return result[0] if result else None
+    
+    def _generate_thumbnail(self, file_path: str, size: Optional[Tuple[int, int]] = None,
+                            data: Optional[bytes] = None) -> Optional[Tuple[str, int, int, str]]:
+        """Generate a thumbnail; returns (path, width, height, color mode) of the output."""
+        start_time = time.perf_counter_ns()
         size = size or self.THUMBNAIL_SIZE
         
         try:
-            with Image.open(file_path) as img:
+            if self.use_vips:
+                # Open, auto-orient and shrink-on-load in a single libvips call
+                original_path = Path(file_path)
+                thumb_path = original_path.parent / f"{original_path.stem}_thumb.jpg"
+                width, height, mode = _vips_save_resized(
+                    data if data is not None else file_path, thumb_path, size[0], size[1],
+                    Q=80, optimize_coding=True
+                )
+                
+                self.temp_files.append(str(thumb_path))
+                self._count('thumbnails_generated')
+                
+                processing_time = (time.perf_counter_ns() - start_time) / 1e9
+                logger.debug(f"Generated thumbnail {size} with libvips in {processing_time:.2f}s")
+                
+                return str(thumb_path), width, height, mode
+            
+            with _open_image(file_path, data) as img:
+                # JPEG shrink-on-load; no-op for other formats
+                img.draft('RGB', size)
+                
                 # Auto-orient based on EXIF
                 img = ImageOps.exif_transpose(img)
                 
@@ -451,35 +746,105 @@ class ImageProcessor:
                 img.thumbnail(size, Image.Resampling.LANCZOS)
                 
                 # Convert to RGB for JPEG
-                if img.mode in ('RGBA', 'P', 'LA'):
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'P':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
-                    img = background
-                elif img.mode not in ('RGB', 'L'):
-                    img = img.convert('RGB')
+                img = self._to_jpeg_mode(img)
                 
                 # Generate thumbnail path
                 original_path = Path(file_path)
                 thumb_path = original_path.parent / f"{original_path.stem}_thumb.jpg"
+                self._save_thumbnail(img, thumb_path)
                 
-                # Save thumbnail
-                img.save(thumb_path, format='JPEG', quality=80, optimize=True)
-                
-                self.temp_files.append(str(thumb_path))
-                self.stats['thumbnails_generated'] += 1
-                
-                processing_time = (datetime.now() - start_time).total_seconds()
+                processing_time = (time.perf_counter_ns() - start_time) / 1e9
                 logger.debug(f"Generated thumbnail {size} in {processing_time:.2f}s")
                 
-                return str(thumb_path)
+                return str(thumb_path), img.width, img.height, img.mode
                 
         except Exception as e:
             logger.error(f"Failed to generate thumbnail for {file_path}: {str(e)}")
             capture_exception(e)
             return None
     
+    def _save_thumbnail(self, img: Image.Image, thumb_path: Path):
+        """Encode a thumbnail JPEG and track it as a temp file."""
+        img.save(thumb_path, format='JPEG', quality=80, optimize=True)
+        self.temp_files.append(str(thumb_path))
+        self._count('thumbnails_generated')
+    
+    def _decode_and_derive(
+        self,
+        file_path: str,
+        data: Optional[bytes] = None,
+        quality: Optional[int] = None,
+        size: Optional[Tuple[int, int]] = None
+    ) -> Tuple[Optional[Tuple[str, int, int, str]], Optional[Tuple[str, int, int, str]]]:
+        """
+        Produce the optimized image and the thumbnail from a single decode.
+        
+        The image is decoded (draft-scaled, flattened and auto-oriented) once
+        into the optimized-size buffer. The optimized JPEG is encoded from it,
+        and the same buffer is then shrunk in place to thumbnail size, instead
+        of re-decoding the optimized file.
+        
+        Returns:
+            Tuple of (optimized, thumbnail) results, each (path, width, height,
+            color mode) or None if that output was not produced
+        """
+        start_time = time.perf_counter_ns()
+        quality = quality or self.IMAGE_QUALITY
+        size = size or self.THUMBNAIL_SIZE
+        original_path = Path(file_path)
+        optimized = None
+        
+        try:
+            with _open_image(file_path, data) as img:
+                img = self._decode_for_optimize(img)
+                
+                optimized_path = original_path.parent / f"{original_path.stem}_optimized{original_path.suffix}"
+                self._save_optimized(img, optimized_path, quality)
+                original_size = len(data) if data is not None else os.path.getsize(file_path)
+                if self._keep_optimized(optimized_path, original_size, start_time):
+                    optimized = (str(optimized_path), img.width, img.height, img.mode)
+                
+                # The optimized file is written, so the buffer can be shrunk in place
+                img.thumbnail(size, Image.Resampling.LANCZOS)
+                thumb_path = original_path.parent / f"{original_path.stem}_thumb.jpg"
+                self._save_thumbnail(img, thumb_path)
+                
+                processing_time = (time.perf_counter_ns() - start_time) / 1e9
+                logger.debug(f"Derived optimized image and thumbnail {size} in {processing_time:.2f}s")
+                
+                return optimized, (str(thumb_path), img.width, img.height, img.mode)
+                
+        except Exception as e:
+            logger.error(f"Failed to derive optimized image and thumbnail for {file_path}: {str(e)}")
+            capture_exception(e)
+            return optimized, None
+    
+    def _local_metadata(self, file_path: str, url: str, width: int, height: int,
+                        color_mode: str) -> ImageMetadata:
+        """
+        Build metadata for a JPEG this processor wrote itself.
+        
+        Dimensions and mode are already known and EXIF was not copied over,
+        so only the file size and hash need to be read.
+        """
+        start_time = time.perf_counter_ns()
+        file_hash = _sha256_file(file_path)
+        return ImageMetadata(
+            url=url,
+            file_path=file_path,
+            format='JPEG',
+            width=width,
+            height=height,
+            file_size=os.path.getsize(file_path),
+            aspect_ratio=width / height,
+            color_mode=color_mode,
+            has_transparency=False,
+            exif_data={},
+            creation_time=None,
+            file_hash=file_hash,
+            processing_time=(time.perf_counter_ns() - start_time) / 1e9
+        )
+    
     async def process_image(
         self,
         url: str,
@@ -497,7 +862,12 @@ class ImageProcessor:
         Returns:
             ProcessingResult with all metadata and file paths
         """
-        start_time = datetime.now()
+        start_time = time.perf_counter_ns()
+        
+        # Same URL already processed with the same options: skip the download
+        cached = self._cached_result(self._url_cache.get(url), url, optimize, generate_thumb)
+        if cached:
+            return cached
         
         try:
             # Download image
@@ -513,8 +883,23 @@ class ImageProcessor:
                     total_processing_time=0.0
                 )
             
+            # Read the download once; every stage below works from these bytes
+            data = await self._run_cpu(Path(file_path).read_bytes)
+            
+            # Different URL, identical bytes: reuse the earlier result
+            file_hash = self._hash_cache.get(file_path)
+            if file_hash is None:
+                file_hash = hashlib.sha256(data).hexdigest()
+                self._hash_cache[file_path] = file_hash
+            self._url_cache[url] = file_hash
+            cached = self._cached_result(file_hash, url, optimize, generate_thumb)
+            if cached:
+                self._discard_temp_file(file_path)
+                logger.debug(f"Reusing processed result for duplicate image {url}")
+                return cached
+            
             # Validate image
-            is_valid, validation_error = self.validate_image(file_path)
+            is_valid, validation_error = await self._run_cpu(self.validate_image, file_path, data=data)
             if not is_valid:
                 return ProcessingResult(
                     success=False,
@@ -527,31 +912,45 @@ class ImageProcessor:
                 )
             
             # Extract metadata
-            original_metadata = self.extract_metadata(file_path, url)
+            original_metadata = await self._run_cpu(self.extract_metadata, file_path, url, data=data)
             optimized_metadata = None
             thumbnail_metadata = None
             
-            # Optimize if requested
-            optimized_path = None
-            if optimize:
-                optimized_path = self.optimize_image(file_path)
-                if optimized_path:
-                    optimized_metadata = self.extract_metadata(optimized_path, url)
+            # Optimize and/or generate thumbnail if requested
+            optimized = thumbnail = None
+            if optimize and generate_thumb and not self.use_vips:
+                # Both outputs from one decode of the original
+                optimized, thumbnail = await self._run_cpu(self._decode_and_derive, file_path, data=data)
+            else:
+                if optimize:
+                    optimized = await self._run_cpu(self._optimize_image, file_path, data=data)
+                
+                # Generate thumbnail if requested
+                if generate_thumb:
+                    if optimized:
+                        thumbnail = await self._run_cpu(self._generate_thumbnail, optimized[0])
+                    else:
+                        thumbnail = await self._run_cpu(self._generate_thumbnail, file_path, data=data)
+            
+            # Outputs are JPEGs we just wrote, so their metadata comes from
+            # what the encoder produced instead of re-parsing the files
+            if optimized:
+                optimized_path, width, height, mode = optimized
+                optimized_metadata = await self._run_cpu(
+                    self._local_metadata, optimized_path, url, width, height, mode
+                )
             
-            # Generate thumbnail if requested
-            thumbnail_path = None
-            if generate_thumb:
-                thumbnail_path = self.generate_thumbnail(
-                    optimized_path if optimized_path else file_path
+            if thumbnail:
+                thumbnail_path, width, height, mode = thumbnail
+                thumbnail_metadata = await self._run_cpu(
+                    self._local_metadata, thumbnail_path, url, width, height, mode
                 )
-                if thumbnail_path:
-                    thumbnail_metadata = self.extract_metadata(thumbnail_path, url)
             
             self.stats['images_processed'] += 1
-            total_processing_time = (datetime.now() - start_time).total_seconds()
+            total_processing_time = (time.perf_counter_ns() - start_time) / 1e9
             self.stats['total_processing_time'] += total_processing_time
             
-            return ProcessingResult(
+            result = ProcessingResult(
                 success=True,
                 original_metadata=original_metadata,
                 optimized_metadata=optimized_metadata,
@@ -560,11 +959,13 @@ class ImageProcessor:
                 temp_files=self.temp_files.copy(),
                 total_processing_time=total_processing_time
             )
+            self._result_cache[(file_hash, optimize, generate_thumb)] = result
+            return result
             
         except Exception as e:
             logger.error(f"Failed to process image {url}: {str(e)}")
             capture_exception(e)
-            total_processing_time = (datetime.now() - start_time).total_seconds()
+            total_processing_time = (time.perf_counter_ns() - start_time) / 1e9
             
             return ProcessingResult(
                 success=False,
@@ -576,6 +977,33 @@ class ImageProcessor:
                 total_processing_time=total_processing_time
             )
     
+    def _cached_result(self, file_hash: Optional[str], url: str, optimize: bool,
+                       generate_thumb: bool) -> Optional[ProcessingResult]:
+        """Return a copy of a cached result for this content, re-labelled with url."""
+        if file_hash is None:
+            return None
+        cached = self._result_cache.get((file_hash, optimize, generate_thumb))
+        if cached is None:
+            return None
+        
+        def relabel(metadata: Optional[ImageMetadata]) -> Optional[ImageMetadata]:
+            return replace(metadata, url=url) if metadata else None
+        
+        return replace(
+            cached,
+            original_metadata=relabel(cached.original_metadata),
+            optimized_metadata=relabel(cached.optimized_metadata),
+            thumbnail_metadata=relabel(cached.thumbnail_metadata),
+            total_processing_time=0.0
+        )
+    
+    def _discard_temp_file(self, file_path: str):
+        """Delete a temp file this processor created and stop tracking it."""
+        Path(file_path).unlink(missing_ok=True)
+        if file_path in self.temp_files:
+            self.temp_files.remove(file_path)
+        self._hash_cache.pop(file_path, None)
+    
     async def process_images_batch(
         self,
         urls: List[str],
@@ -593,14 +1021,20 @@ class ImageProcessor:
         Returns:
             List of ProcessingResults
         """
+        if not self.use_proxy:
+            await self._ensure_session()
         semaphore = asyncio.Semaphore(self.concurrent_downloads)
         
         async def process_single(url: str) -> ProcessingResult:
             async with semaphore:
                 return await self.process_image(url, optimize, generate_thumb)
         
-        tasks = [process_single(url) for url in urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Process each distinct URL once and fan results back out in input order
+        unique_urls = list(dict.fromkeys(urls))
+        tasks = [process_single(url) for url in unique_urls]
+        unique_results = await asyncio.gather(*tasks, return_exceptions=True)
+        results_by_url = dict(zip(unique_urls, unique_results))
+        results = [results_by_url[url] for url in urls]
         
         # Convert exceptions to error results
         processed_results = []
@@ -634,6 +1068,11 @@ class ImageProcessor:
             logger.debug(f"Cleaned up {cleaned} temporary files")
         
         self.temp_files.clear()
+        self._hash_cache.clear()
+        
+        # Cached results point at the files just removed
+        self._result_cache.clear()
+        self._url_cache.clear()
     
     def get_stats(self) -> Dict[str, Any]:
         """Get processing statistics."""
@@ -8,12 +8,17 @@ to choose the best images from analysis results based on multiple criteria.
 
 import os
 import json
+import heapq
+import hashlib
 import logging
-import statistics
+from collections import OrderedDict
+from operator import itemgetter
 from typing import Dict, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from enum import Enum
+from functools import cached_property
+import numpy as np
 import sentry_sdk
 from sentry_sdk import capture_exception
 
@@ -31,7 +36,7 @@ class SelectionStrategy(Enum):
     COST_OPTIMIZED = "cost_optimized"
 
 
-@dataclass
+@dataclass(slots=True)
 class SelectionCriteria:
     """Configuration for image selection criteria."""
     quality_weight: float = 0.4
@@ -49,16 +54,48 @@ class SelectionCriteria:
 
 @dataclass
 class ImageCandidate:
-    """Image candidate with analysis results."""
+    """
+    Image candidate with analysis results.
+    
+    Not slotted: the lowercased views below are cached in the instance dict.
+    """
     image_url: str
     source_url: str
     title: str
     analysis: ComprehensiveAnalysis
     metadata: Dict[str, Any]
     search_query: str
+    
+    # Lowercased views of the analysis, computed once per candidate and reused
+    # by context bonus and diversity penalty calculations.
+    @cached_property
+    def _objects_lc(self) -> Tuple[str, ...]:
+        return tuple(obj.lower() for obj in self.analysis.objects)
+    
+    @cached_property
+    def _objects_text(self) -> str:
+        # Query words never contain whitespace, so a match in this joined
+        # string always lies within a single object
+        return "\n".join(self._objects_lc)
+    
+    @cached_property
+    def _object_set(self) -> frozenset:
+        return frozenset(self._objects_lc)
+    
+    @cached_property
+    def _color_set(self) -> frozenset:
+        return frozenset(color.lower() for color in self.analysis.colors)
+    
+    @cached_property
+    def _desc_lc(self) -> str:
+        return self.analysis.description.lower()
+    
+    @cached_property
+    def _title_lc(self) -> str:
+        return self.title.lower()
 
 
-@dataclass
+@dataclass(slots=True)
 class SelectionResult:
     """Result from image selection process."""
     selected_images: List[ImageCandidate]
@@ -72,9 +109,10 @@ class SelectionResult:
     ai_selection_explanation: Optional[str] = None  # Claude's detailed explanation
     selection_model: Optional[str] = None  # Model used for AI selection
     raw_model_responses: Optional[List[Dict[str, Any]]] = None  # Store all vision model responses
+    score_breakdowns: Optional[Dict[str, Dict[str, float]]] = None  # Per-URL score components
 
 
-@dataclass
+@dataclass(slots=True)
 class SelectionExplanation:
     """Detailed explanation for a selection decision."""
     candidate: ImageCandidate
@@ -105,8 +143,9 @@ class ImageSelector:
         self.diversity_threshold = float(os.getenv('DIVERSITY_THRESHOLD', '0.7'))
         self.max_processing_time = float(os.getenv('MAX_SELECTION_TIME', '30.0'))
         
-        # Caching
-        self.selection_cache = {}
+        # Caching (LRU, bounded to cap memory in long-running processes)
+        self.selection_cache: "OrderedDict[str, SelectionResult]" = OrderedDict()
+        self._cache_max = int(os.getenv('SELECTION_CACHE_MAX', '256'))
         
         logger.info(f"ImageSelector initialized with strategy weights: "
                    f"quality={self.criteria.quality_weight}, "
@@ -147,11 +186,14 @@ class ImageSelector:
             count = len(candidates)
         
         try:
-            # Generate cache key
-            cache_key = self._get_cache_key(candidates, count, strategy, search_query)
-            if cached := self.selection_cache.get(cache_key):
-                logger.info("Using cached selection result")
-                return cached
+            # Generate cache key only when a lookup can hit
+            cache_key = None
+            if self.selection_cache:
+                cache_key = self._get_cache_key(candidates, count, strategy, search_query)
+                if cached := self.selection_cache.get(cache_key):
+                    self.selection_cache.move_to_end(cache_key)
+                    logger.info("Using cached selection result")
+                    return cached
             
             # Apply initial filters
             filtered_candidates = self._apply_filters(candidates, search_query)
@@ -169,9 +211,15 @@ class ImageSelector:
                     strategy_used=strategy
                 )
             
-            # Calculate scores for all candidates
-            scored_candidates = self._calculate_scores(
-                filtered_candidates, strategy, search_query
+            # Calculate scores for all candidates. Diversity-aware selection
+            # may pick any of them, so it ranks the whole pool; single
+            # selection only needs the top (count + 5) for the alternatives
+            score_breakdowns: Dict[str, Dict[str, float]] = {}
+            candidate_scores = self._score_candidates(
+                filtered_candidates, strategy, search_query, score_breakdowns
+            )
+            scored_candidates = self._rank_scores(
+                candidate_scores, count + 5 if count == 1 else None
             )
             
             # Perform selection based on strategy
@@ -187,31 +235,40 @@ class ImageSelector:
             
             # Generate explanations
             reasoning = self._generate_reasoning(
-                selected, scored_candidates, strategy, search_query
+                selected, candidate_scores, strategy, search_query, diversity_metrics
             )
             
-            # Get alternatives
+            # Get alternatives (the next best unselected candidates)
+            selected_ids = {id(candidate) for candidate in selected}
             alternatives = [
-                candidate for candidate, _ in scored_candidates 
-                if candidate not in selected
-            ][:min(5, len(scored_candidates) - len(selected))]
+                candidate for candidate, _ in scored_candidates[:len(selected) + 5]
+                if id(candidate) not in selected_ids
+            ][:5]
             
             # Build result
             selection_time = (datetime.now() - start_time).total_seconds()
             
             result = SelectionResult(
                 selected_images=selected,
-                scores={c.image_url: score for c, score in scored_candidates},
+                scores={c.image_url: score for c, score in candidate_scores},
                 reasoning=reasoning,
                 alternatives=alternatives,
                 diversity_metrics=diversity_metrics,
                 total_candidates=len(candidates),
                 selection_time=selection_time,
-                strategy_used=strategy
+                strategy_used=strategy,
+                score_breakdowns=score_breakdowns
             )
             
-            # Cache result
-            self.selection_cache[cache_key] = result
+            # Cache result, evicting the least recently used entry when full
+            if self._cache_max > 0:
+                if cache_key is None:
+                    cache_key = self._get_cache_key(
+                        candidates, count, strategy, search_query
+                    )
+                self.selection_cache[cache_key] = result
+                if len(self.selection_cache) > self._cache_max:
+                    self.selection_cache.popitem(last=False)
             
             logger.info(f"Selected {len(selected)} images from {len(candidates)} "
                        f"candidates in {selection_time:.2f}s using {strategy.value}")
@@ -228,29 +285,31 @@ class ImageSelector:
         candidates: List[ImageCandidate], 
         search_query: Optional[str]
     ) -> List[ImageCandidate]:
-        """Apply initial filtering based on minimum criteria."""
-        filtered = []
+        """
+        Apply initial filtering based on minimum criteria.
         
-        for candidate in candidates:
-            analysis = candidate.analysis
-            
-            # Quality filter
-            if analysis.quality_metrics.overall_score < self.criteria.min_quality_score:
-                continue
-            
-            # Relevance filter
-            if analysis.relevance_score < self.criteria.min_relevance_score:
-                continue
-            
-            # Cost filter
-            if analysis.cost_estimate > self.criteria.max_cost_per_image:
-                continue
-            
-            # Scene type filter
-            if analysis.scene_type.lower() in [s.lower() for s in self.criteria.exclude_scene_types]:
-                continue
-            
-            filtered.append(candidate)
+        Scores are in [0, 1], so non-positive minimums, an infinite cost cap
+        and no excluded scene types disable filtering entirely.
+        """
+        min_quality = self.criteria.min_quality_score
+        min_relevance = self.criteria.min_relevance_score
+        max_cost = self.criteria.max_cost_per_image
+        
+        # Checked per call (criteria may be mutated after __init__)
+        if (min_quality <= 0 and min_relevance <= 0 and max_cost == float('inf')
+                and not self.criteria.exclude_scene_types):
+            return list(candidates)
+        
+        excluded_scenes = frozenset(s.lower() for s in self.criteria.exclude_scene_types)
+        
+        # Quality, relevance, cost and scene type filters
+        filtered = [
+            candidate for candidate in candidates
+            if (analysis := candidate.analysis).quality_metrics.overall_score >= min_quality
+            and analysis.relevance_score >= min_relevance
+            and analysis.cost_estimate <= max_cost
+            and analysis.scene_type.lower() not in excluded_scenes
+        ]
         
         logger.debug(f"Filtered {len(candidates)} candidates to {len(filtered)}")
         return filtered
@@ -259,19 +318,114 @@ class ImageSelector:
         self,
         candidates: List[ImageCandidate],
         strategy: SelectionStrategy,
-        search_query: Optional[str]
+        search_query: Optional[str],
+        top_k: Optional[int] = None
+    ) -> List[Tuple[ImageCandidate, float]]:
+        """Calculate selection scores and return the top_k highest (all if None)."""
+        return self._rank_scores(
+            self._score_candidates(candidates, strategy, search_query), top_k
+        )
+    
+    def _score_candidates(
+        self,
+        candidates: List[ImageCandidate],
+        strategy: SelectionStrategy,
+        search_query: Optional[str],
+        breakdowns: Optional[Dict[str, Dict[str, float]]] = None
     ) -> List[Tuple[ImageCandidate, float]]:
-        """Calculate selection scores for all candidates."""
-        scored = []
+        """
+        Calculate selection scores for all candidates, in input order.
         
-        for candidate in candidates:
-            score = self._calculate_candidate_score(candidate, strategy, search_query)
-            scored.append((candidate, score))
+        The per-candidate fields are gathered into float64 arrays once and
+        scored in a single NumPy expression.
+        If breakdowns is given, it is filled with each candidate's score
+        components keyed by image URL (the explain_selection breakdown).
+        """
+        if not candidates:
+            return []
+        
+        n = len(candidates)
+        overall = np.empty(n)
+        composition = np.empty(n)
+        technical = np.empty(n)
+        clarity = np.empty(n)
+        relevance = np.empty(n)
+        confidence = np.empty(n)
+        cost = np.empty(n)
+        
+        for i, candidate in enumerate(candidates):
+            analysis = candidate.analysis
+            metrics = analysis.quality_metrics
+            overall[i] = metrics.overall_score
+            composition[i] = metrics.composition_score
+            technical[i] = metrics.technical_quality
+            clarity[i] = metrics.clarity_score
+            relevance[i] = analysis.relevance_score
+            confidence[i] = analysis.confidence_score
+            cost[i] = analysis.cost_estimate
+        
+        # Strategy weights and cost cap are constant for the whole call
+        weights = self._get_strategy_weights(strategy)
+        w_quality = weights['quality']
+        w_relevance = weights['relevance']
+        w_diversity = weights['diversity']
+        w_cost = weights['cost']
+        max_cost = self.criteria.max_cost_per_image
+        
+        quality = overall * 0.4 + composition * 0.25 + technical * 0.2 + clarity * 0.15
+        cost_score = 1.0 - np.minimum(1.0, cost / max_cost)
+        diversity_score = 1.0  # Will be adjusted during batch selection
+        
+        # Record components before the arrays are reused in place below
+        if breakdowns is not None:
+            for candidate, q, r, conf, c in zip(
+                candidates, quality.tolist(), relevance.tolist(),
+                confidence.tolist(), cost_score.tolist()
+            ):
+                breakdowns[candidate.image_url] = {
+                    'quality': q,
+                    'relevance': r,
+                    'confidence': conf,
+                    'cost_efficiency': c
+                }
+        
+        # Accumulate in place, so no temporary is allocated per term
+        final = quality
+        final *= w_quality
+        relevance *= w_relevance
+        final += relevance
+        final += diversity_score * w_diversity
+        cost_score *= w_cost
+        final += cost_score
+        final *= confidence
+        
+        if search_query:
+            query_words = tuple(search_query.lower().split())
+            context_bonus = np.fromiter(
+                (self._calculate_context_bonus(c, query_words) for c in candidates),
+                dtype=np.float64,
+                count=n
+            )
+            final *= 1.0 + context_bonus
+        
+        np.clip(final, 0.0, 1.0, out=final)
         
-        # Sort by score (highest first)
-        scored.sort(key=lambda x: x[1], reverse=True)
+        return list(zip(candidates, final.tolist()))
+    
+    @staticmethod
+    def _rank_scores(
+        scored: List[Tuple[ImageCandidate, float]],
+        top_k: Optional[int] = None
+    ) -> List[Tuple[ImageCandidate, float]]:
+        """Return the top_k scored candidates, highest first (ties keep input order)."""
+        if top_k is None or top_k >= len(scored):
+            return sorted(scored, key=itemgetter(1), reverse=True)
+        
+        if top_k == 1:
+            return [max(scored, key=itemgetter(1))]
         
-        return scored
+        # Bounded heap: O(N log K) instead of sorting the whole pool
+        return heapq.nlargest(top_k, scored, key=itemgetter(1))
     
     def _calculate_candidate_score(
         self,
@@ -280,33 +434,7 @@ class ImageSelector:
         search_query: Optional[str]
     ) -> float:
         """Calculate selection score for a single candidate."""
-        analysis = candidate.analysis
-        
-        # Base component scores
-        quality_score = self._calculate_quality_score(analysis.quality_metrics)
-        relevance_score = analysis.relevance_score
-        diversity_score = 1.0  # Will be adjusted during batch selection
-        cost_score = 1.0 - min(1.0, analysis.cost_estimate / self.criteria.max_cost_per_image)
-        
-        # Apply strategy-specific weighting
-        weights = self._get_strategy_weights(strategy)
-        
-        final_score = (
-            quality_score * weights['quality'] +
-            relevance_score * weights['relevance'] +
-            diversity_score * weights['diversity'] +
-            cost_score * weights['cost']
-        )
-        
-        # Apply confidence multiplier
-        final_score *= analysis.confidence_score
-        
-        # Bonus for matching search context
-        if search_query:
-            context_bonus = self._calculate_context_bonus(candidate, search_query)
-            final_score *= (1.0 + context_bonus)
-        
-        return min(1.0, max(0.0, final_score))
+        return self._score_candidates([candidate], strategy, search_query)[0][1]
     
     def _calculate_quality_score(self, quality_metrics: QualityMetrics) -> float:
         """Calculate composite quality score."""
@@ -338,31 +466,32 @@ class ImageSelector:
     def _calculate_context_bonus(
         self, 
         candidate: ImageCandidate, 
-        search_query: str
+        search_query: Union[str, Tuple[str, ...]]
     ) -> float:
-        """Calculate bonus score based on search context."""
-        query_words = search_query.lower().split()
-        
-        # Check objects for query matches
-        object_matches = sum(
-            1 for obj in candidate.analysis.objects
-            for word in query_words
-            if word in obj.lower()
-        )
-        
-        # Check description for query matches
-        description_matches = sum(
-            1 for word in query_words
-            if word in candidate.analysis.description.lower()
-        )
+        """
+        Calculate bonus score based on search context.
         
-        # Check title for query matches
-        title_matches = sum(
-            1 for word in query_words
-            if word in candidate.title.lower()
-        )
+        search_query may be the raw query or its lowercased words, so callers
+        scoring many candidates can tokenize the query once.
+        """
+        if isinstance(search_query, str):
+            query_words = search_query.lower().split()
+        else:
+            query_words = search_query
+        objects = candidate._objects_lc
+        objects_text = candidate._objects_text
+        description = candidate._desc_lc
+        title = candidate._title_lc
+        
+        # Check objects, description and title for query matches (substring
+        # containment, so "mountain" also matches "mountains"). One scan of the
+        # joined objects rules out most words before counting per object.
+        total_matches = 0
+        for word in query_words:
+            if word in objects_text:
+                total_matches += sum(1 for obj in objects if word in obj)
+            total_matches += (word in description) + (word in title)
         
-        total_matches = object_matches + description_matches + title_matches
         max_possible = len(query_words) * 3  # Each word could match in all three places
         
         return min(0.2, total_matches / max_possible) if max_possible > 0 else 0.0
@@ -385,39 +514,47 @@ class ImageSelector:
         count: int,
         strategy: SelectionStrategy
     ) -> List[ImageCandidate]:
-        """Select multiple candidates with diversity consideration."""
+        """
+        Select multiple candidates with diversity consideration.
+        
+        Greedy selection with a lazy max-heap: a candidate's penalty can only
+        grow as images are selected, so a stale adjusted score is an upper
+        bound. Only the heap top is re-scored (against newly selected images)
+        until a fresh entry surfaces, which is the exact greedy choice.
+        """
         if count >= len(scored_candidates):
             return [candidate for candidate, _ in scored_candidates]
         
-        selected = []
-        remaining = list(scored_candidates)
-        
         # Always select the top candidate first
-        selected.append(remaining[0][0])
-        remaining = remaining[1:]
+        selected = [scored_candidates[0][0]]
+        diversity_weight = self.criteria.diversity_weight
         
-        # For remaining selections, consider diversity
-        for _ in range(count - 1):
-            if not remaining:
-                break
-            
-            best_candidate = None
-            best_score = -1
+        signatures = self._diversity_signatures([c for c, _ in scored_candidates])
+        selected_signatures = [signatures[0]]
+        
+        # Heap entries: (-adjusted_score, rank, penalty, selected_count_checked)
+        heap = [
+            (-base_score, i, 0.0, 0)
+            for i, (_, base_score) in enumerate(scored_candidates[1:], 1)
+        ]
+        heapq.heapify(heap)
+        
+        while heap and len(selected) < count:
+            neg_score, i, penalty, checked = heapq.heappop(heap)
             
-            for i, (candidate, base_score) in enumerate(remaining):
-                # Calculate diversity penalty
-                diversity_penalty = self._calculate_diversity_penalty(candidate, selected)
-                
-                # Adjust score based on diversity
-                adjusted_score = base_score * (1.0 - diversity_penalty * self.criteria.diversity_weight)
-                
-                if adjusted_score > best_score:
-                    best_score = adjusted_score
-                    best_candidate = i
+            if checked == len(selected):
+                selected.append(scored_candidates[i][0])
+                selected_signatures.append(signatures[i])
+                continue
             
-            if best_candidate is not None:
-                selected.append(remaining[best_candidate][0])
-                remaining.pop(best_candidate)
+            # Penalty is a max over selected images; fold in only the new ones
+            base_score = scored_candidates[i][1]
+            penalty = max(
+                penalty,
+                self._signature_penalty(signatures[i], selected_signatures[checked:])
+            )
+            adjusted_score = base_score * (1.0 - penalty * diversity_weight)
+            heapq.heappush(heap, (-adjusted_score, i, penalty, len(selected)))
         
         return selected
     
@@ -430,65 +567,98 @@ class ImageSelector:
         if not selected:
             return 0.0
         
-        penalties = []
+        signatures = self._diversity_signatures([candidate, *selected])
+        return self._signature_penalty(signatures[0], signatures[1:])
+    
+    @staticmethod
+    def _diversity_signatures(
+        candidates: List[ImageCandidate]
+    ) -> List[Tuple[str, int, int, int, int]]:
+        """
+        Encode candidates as (scene_type, object_bits, n_objects, color_bits, n_colors).
+        
+        Objects and colors are interned to bit positions for this batch only,
+        so set overlap becomes a popcount of an integer AND.
+        """
+        object_ids: Dict[str, int] = {}
+        color_ids: Dict[str, int] = {}
+        signatures = []
+        
+        for candidate in candidates:
+            object_bits = 0
+            for obj in candidate._object_set:
+                object_bits |= 1 << object_ids.setdefault(obj, len(object_ids))
+            color_bits = 0
+            for color in candidate._color_set:
+                color_bits |= 1 << color_ids.setdefault(color, len(color_ids))
+            signatures.append((
+                candidate.analysis.scene_type,
+                object_bits, len(candidate._object_set),
+                color_bits, len(candidate._color_set)
+            ))
         
-        for selected_img in selected:
+        return signatures
+    
+    @staticmethod
+    def _signature_penalty(
+        signature: Tuple[str, int, int, int, int],
+        selected_signatures: List[Tuple[str, int, int, int, int]]
+    ) -> float:
+        """Maximum diversity penalty of one signature against selected signatures."""
+        scene_type, objects, n_objects, colors, n_colors = signature
+        max_penalty = 0.0
+        
+        for sel_scene, sel_objects, sel_n_objects, sel_colors, sel_n_colors in selected_signatures:
             penalty = 0.0
             
             # Scene type similarity
-            if candidate.analysis.scene_type == selected_img.analysis.scene_type:
+            if scene_type == sel_scene:
                 penalty += 0.3
             
-            # Object overlap
-            candidate_objects = set(obj.lower() for obj in candidate.analysis.objects)
-            selected_objects = set(obj.lower() for obj in selected_img.analysis.objects)
-            object_overlap = len(candidate_objects.intersection(selected_objects))
-            if candidate_objects or selected_objects:
-                object_similarity = object_overlap / len(candidate_objects.union(selected_objects))
-                penalty += object_similarity * 0.4
+            # Object overlap (Jaccard; union size by inclusion-exclusion)
+            if objects or sel_objects:
+                overlap = (objects & sel_objects).bit_count()
+                penalty += overlap / (n_objects + sel_n_objects - overlap) * 0.4
             
             # Color similarity
-            candidate_colors = set(color.lower() for color in candidate.analysis.colors)
-            selected_colors = set(color.lower() for color in selected_img.analysis.colors)
-            color_overlap = len(candidate_colors.intersection(selected_colors))
-            if candidate_colors or selected_colors:
-                color_similarity = color_overlap / len(candidate_colors.union(selected_colors))
-                penalty += color_similarity * 0.3
+            if colors or sel_colors:
+                overlap = (colors & sel_colors).bit_count()
+                penalty += overlap / (n_colors + sel_n_colors - overlap) * 0.3
             
-            penalties.append(min(1.0, penalty))
+            # Keep the maximum penalty (most similar image); 1.0 is the cap
+            if penalty >= 1.0:
+                return 1.0
+            if penalty > max_penalty:
+                max_penalty = penalty
         
-        # Return maximum penalty (most similar image)
-        return max(penalties) if penalties else 0.0
+        return max_penalty
     
     def _calculate_diversity_metrics(self, selected: List[ImageCandidate]) -> Dict[str, Any]:
         """Calculate diversity metrics for selected images."""
         if not selected:
             return {}
         
-        # Scene type diversity
-        scene_types = [img.analysis.scene_type for img in selected]
-        unique_scenes = len(set(scene_types))
-        
-        # Object diversity
-        all_objects = []
+        # Scene type, object and color diversity plus quality scores in one pass
+        scene_types = set()
+        objects = set()
+        colors = set()
+        quality_scores = []
         for img in selected:
-            all_objects.extend(img.analysis.objects)
-        unique_objects = len(set(obj.lower() for obj in all_objects))
-        
-        # Color diversity
-        all_colors = []
-        for img in selected:
-            all_colors.extend(img.analysis.colors)
-        unique_colors = len(set(color.lower() for color in all_colors))
+            analysis = img.analysis
+            scene_types.add(analysis.scene_type)
+            objects |= img._object_set
+            colors |= img._color_set
+            quality_scores.append(analysis.quality_metrics.overall_score)
         
         # Quality variance
-        quality_scores = [img.analysis.quality_metrics.overall_score for img in selected]
-        quality_variance = statistics.variance(quality_scores) if len(quality_scores) > 1 else 0.0
+        quality_variance = (
+            float(np.var(quality_scores, ddof=1)) if len(quality_scores) > 1 else 0.0
+        )
         
         return {
-            'scene_type_diversity': unique_scenes / len(selected),
-            'unique_objects': unique_objects,
-            'unique_colors': unique_colors,
+            'scene_type_diversity': len(scene_types) / len(selected),
+            'unique_objects': len(objects),
+            'unique_colors': len(colors),
             'quality_variance': quality_variance,
             'selection_count': len(selected)
         }
@@ -498,7 +668,8 @@ class ImageSelector:
         selected: List[ImageCandidate],
         scored_candidates: List[Tuple[ImageCandidate, float]],
         strategy: SelectionStrategy,
-        search_query: Optional[str]
+        search_query: Optional[str],
+        diversity_metrics: Optional[Dict[str, Any]] = None
     ) -> str:
         """Generate human-readable reasoning for selection decisions."""
         if not selected:
@@ -534,7 +705,8 @@ class ImageSelector:
         
         # Diversity considerations
         if len(selected) > 1:
-            diversity_metrics = self._calculate_diversity_metrics(selected)
+            if diversity_metrics is None:
+                diversity_metrics = self._calculate_diversity_metrics(selected)
             scene_diversity = diversity_metrics.get('scene_type_diversity', 0)
             reasoning_parts.append(
                 f"Diversity maintained with {scene_diversity:.1%} scene type variety."
@@ -549,14 +721,18 @@ class ImageSelector:
         for i, candidate in enumerate(result.selected_images):
             score = result.scores.get(candidate.image_url, 0.0)
             
-            # Score breakdown
+            # Score breakdown (reuse the components recorded during scoring)
             analysis = candidate.analysis
-            breakdown = {
-                'quality': self._calculate_quality_score(analysis.quality_metrics),
-                'relevance': analysis.relevance_score,
-                'confidence': analysis.confidence_score,
-                'cost_efficiency': 1.0 - min(1.0, analysis.cost_estimate / self.criteria.max_cost_per_image)
-            }
+            breakdown = (result.score_breakdowns or {}).get(candidate.image_url)
+            if breakdown is not None:
+                breakdown = dict(breakdown)
+            else:
+                breakdown = {
+                    'quality': self._calculate_quality_score(analysis.quality_metrics),
+                    'relevance': analysis.relevance_score,
+                    'confidence': analysis.confidence_score,
+                    'cost_efficiency': 1.0 - min(1.0, analysis.cost_estimate / self.criteria.max_cost_per_image)
+                }
             
             # Selection reasons
             reasons = []
@@ -588,12 +764,14 @@ class ImageSelector:
         search_query: Optional[str]
     ) -> str:
         """Generate cache key for selection results."""
-        import hashlib
-        
-        # Create hash of inputs
-        candidate_urls = [c.image_url for c in candidates]
-        content = f"{sorted(candidate_urls)}{count}{strategy.value}{search_query}"
-        return hashlib.sha256(content.encode()).hexdigest()[:16]
+        # Stream the inputs into a short BLAKE2b digest instead of building one
+        # large string; NUL separators keep adjacent fields from running together
+        h = hashlib.blake2b(digest_size=8)
+        for url in sorted(c.image_url for c in candidates):
+            h.update(url.encode())
+            h.update(b'\0')
+        h.update(f"{count}\0{strategy.value}\0{search_query}".encode())
+        return h.hexdigest()
     
     def select_with_ai_reasoning(
         self,
@@ -708,7 +886,8 @@ Be specific about WHY you selected certain images over others."""
                 strategy_used=SelectionStrategy.BALANCED,
                 ai_selection_explanation=json.dumps(ai_selection, indent=2),
                 selection_model="anthropic/claude-sonnet-4",
-                raw_model_responses=[cd['raw_vision_responses'] for cd in candidates_data]
+                raw_model_responses=[cd['raw_vision_responses'] for cd in candidates_data],
+                score_breakdowns=base_result.score_breakdowns
             )
             
             logger.info(f"AI-powered selection completed using Claude Sonnet 4")
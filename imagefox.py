@@ -8,18 +8,22 @@ comprehensive image search, analysis, and selection capabilities.
 
 import os
 import asyncio
+import random
 import time
 import logging
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from collections import OrderedDict
+from dataclasses import dataclass
 import tempfile
 import shutil
 from pathlib import Path
+from urllib.parse import urlsplit, parse_qsl, urlencode
 
 import sentry_sdk
 from sentry_sdk import capture_exception
 from dotenv import load_dotenv
+import orjson
 
 from apify_client import ApifyClient
 from openrouter_client import OpenRouterClient
@@ -32,7 +36,57 @@ from imagebb_uploader import ImageBBUploader
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+def _json_dumps(obj) -> str:
+    """Serialize obj to a JSON string, stringifying unsupported types."""
+    return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Query parameters that only resize/re-encode an image, per CDN host (and its
+# subdomains). Elsewhere the same names often identify the image itself
+# (e.g. ?v=<id>), so they are only ignored on these hosts
+_CDN_VARIANT_PARAMS = {
+    'images.unsplash.com': frozenset({'w', 'h', 'fit', 'crop', 'q', 'auto', 'fm', 'dpr'}),
+    'imgix.net': frozenset({'w', 'h', 'fit', 'crop', 'q', 'auto', 'fm', 'dpr'}),
+    'images.pexels.com': frozenset({'w', 'h', 'fit', 'crop', 'auto', 'cs', 'dpr'}),
+    'cdn.shopify.com': frozenset({'width', 'height', 'crop', 'v'}),
+    'i0.wp.com': frozenset({'w', 'h', 'resize', 'fit', 'quality', 'ssl', 'strip'}),
+    'i1.wp.com': frozenset({'w', 'h', 'resize', 'fit', 'quality', 'ssl', 'strip'}),
+    'i2.wp.com': frozenset({'w', 'h', 'resize', 'fit', 'quality', 'ssl', 'strip'}),
+}
+
+
+def _variant_params(host: str) -> frozenset:
+    """Return the resize/re-encode query parameters of a known CDN host."""
+    for cdn_host, params in _CDN_VARIANT_PARAMS.items():
+        if host == cdn_host or host.endswith('.' + cdn_host):
+            return params
+    return frozenset()
+
+
+def _image_dedupe_key(url: str) -> str:
+    """
+    Reduce an image URL to what identifies the image itself.
+    
+    Scheme, host case and a leading "www." are ignored everywhere; resize and
+    format parameters only on known CDN hosts, so their differently sized
+    variants share a key.
+    """
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    
+    query = ''
+    if parts.query:
+        ignored = _variant_params(host)
+        query = urlencode(sorted(
+            (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if key.lower() not in ignored
+        ))
+    return f"{host}{parts.path}?{query}"
+
+
+@dataclass(slots=True)
 class SearchRequest:
     """Search request configuration."""
     query: str
@@ -44,9 +98,10 @@ class SearchRequest:
     enable_processing: bool = True
     enable_upload: bool = True
     enable_storage: bool = True
+    include_stats: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class ImageResult:
     """Complete image result with all metadata."""
     url: str
@@ -62,7 +117,7 @@ class ImageResult:
     ai_selection_explanation: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class WorkflowResult:
     """Complete workflow execution result."""
     search_query: str
@@ -85,6 +140,12 @@ class ImageFox:
     of images through a unified workflow.
     """
     
+    # Airtable accepts at most this many records per create request
+    AIRTABLE_BATCH_SIZE = 10
+    
+    # Maximum length of the serialized analysis stored per Airtable record
+    AIRTABLE_ANALYSIS_LIMIT = 50000
+    
     def __init__(self, config_path: Optional[str] = None):
         """
         Initialize ImageFox orchestrator.
@@ -101,9 +162,30 @@ class ImageFox:
         # Configuration
         self.temp_dir = Path(os.getenv('IMAGEFOX_TEMP_DIR', tempfile.gettempdir())) / 'imagefox'
         self.enable_cleanup = os.getenv('ENABLE_CLEANUP', 'true').lower() == 'true'
+        self._batches_in_progress = 0
         self.max_concurrent = int(os.getenv('MAX_CONCURRENT_OPERATIONS', '5'))
         self.enable_caching = os.getenv('ENABLE_CACHING', 'true').lower() == 'true'
         
+        # LRU cache of vision analyses keyed by (image URL, search query), so
+        # images that reappear across searches skip download and analysis
+        self._analysis_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._analysis_cache_max = (
+            int(os.getenv('ANALYSIS_CACHE_SIZE', '1000')) if self.enable_caching else 0
+        )
+        
+        # Stop analyzing once this many times max_results candidates pass the
+        # selector's quality gate (0 analyzes every search result)
+        self.early_stop_factor = int(os.getenv('ANALYSIS_EARLY_STOP_FACTOR', '3'))
+        
+        # Upper bound of the random delay before each uncached analysis, so
+        # the first wave of tasks doesn't hit OpenRouter as one burst (0 disables)
+        self.analysis_jitter = float(os.getenv('ANALYSIS_JITTER_SECONDS', '0'))
+        
+        # Upper bounds (seconds) on one batch workflow and on one image's
+        # download + analysis, so a hung call can't hold a worker slot; 0 disables
+        self.workflow_timeout = float(os.getenv('WORKFLOW_TIMEOUT', '300'))
+        self.image_analysis_timeout = float(os.getenv('IMAGE_ANALYSIS_TIMEOUT', '120'))
+        
         # Create temp directory
         self.temp_dir.mkdir(parents=True, exist_ok=True)
         
@@ -117,7 +199,9 @@ class ImageFox:
             'images_selected': 0,
             'total_processing_time': 0.0,
             'total_cost': 0.0,
-            'errors_count': 0
+            'errors_count': 0,
+            'analysis_cache_hits': 0,
+            'analysis_cache_misses': 0
         }
         
         logger.info("ImageFox orchestrator initialized")
@@ -125,8 +209,7 @@ class ImageFox:
     async def __aenter__(self):
         """Enter async context manager."""
         # Initialize aiohttp session for image processor
-        if hasattr(self.image_processor, '__aenter__'):
-            await self.image_processor.__aenter__()
+        await self._open_processor_session()
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
@@ -137,6 +220,21 @@ class ImageFox:
         # Perform cleanup
         await self.cleanup()
     
+    async def _open_processor_session(self):
+        """
+        Open the image processor's HTTP session if it is not already open.
+        
+        The session lives until cleanup(), so every workflow (and every
+        concurrent workflow in process_batch) reuses its pooled connections
+        instead of opening and closing its own.
+        """
+        if not hasattr(self.image_processor, '__aenter__'):
+            return
+        
+        session = getattr(self.image_processor, 'session', None)
+        if session is None or session.closed:
+            await self.image_processor.__aenter__()
+    
     def _initialize_components(self):
         """Initialize all ImageFox components."""
         try:
@@ -160,38 +258,49 @@ class ImageFox:
             capture_exception(e)
             raise
     
-    def validate_configuration(self) -> Dict[str, bool]:
+    async def _call_client(self, func, *args, **kwargs):
+        """
+        Run a blocking client call in a worker thread.
+        
+        Rate limits and retries are left to the clients: each one enforces its
+        *_RATE_LIMIT per HTTP request and its session retries 429s, 5xx
+        responses and connection errors (RETRY_ATTEMPTS). Limiting or retrying
+        here again would count the same requests twice.
+        """
+        return await asyncio.to_thread(func, *args, **kwargs)
+    
+    async def validate_configuration(self) -> Dict[str, bool]:
         """
         Validate configuration and component connectivity.
         
+        The network probes run concurrently, so validation takes as long as
+        the slowest one rather than the sum of all of them.
+        
         Returns:
             Dictionary with validation results for each component
         """
-        results = {}
-        
-        try:
-            # Test Apify connection
-            results['apify'] = self.apify_client.validate_api_key()
-        except Exception as e:
-            logger.error(f"Apify validation failed: {e}")
-            results['apify'] = False
+        probes = {
+            'apify': self.apify_client.validate_api_key,
+            'openrouter': self.openrouter_client.validate_api_key,
+        }
+        outcomes = await asyncio.gather(
+            *(asyncio.to_thread(probe) for probe in probes.values()),
+            return_exceptions=True
+        )
         
-        try:
-            # Test OpenRouter connection
-            results['openrouter'] = self.openrouter_client.validate_api_key()
-        except Exception as e:
-            logger.error(f"OpenRouter validation failed: {e}")
-            results['openrouter'] = False
+        results = {}
+        for (component, _), outcome in zip(probes.items(), outcomes):
+            if isinstance(outcome, Exception):
+                logger.error(f"{component.capitalize()} validation failed: {outcome}")
+                results[component] = False
+            else:
+                results[component] = bool(outcome)
         
         # Skip Airtable validation - not using centralized Images table
         results['airtable'] = True  # Always pass since we use project-specific tables
         
-        try:
-            # Test ImageBB connection (create simple validation)
-            results['imagebb'] = True  # ImageBB doesn't have validation endpoint
-        except Exception as e:
-            logger.error(f"ImageBB validation failed: {e}")
-            results['imagebb'] = False
+        # ImageBB doesn't have a validation endpoint
+        results['imagebb'] = True
         
         # Check temp directory
         results['temp_directory'] = self.temp_dir.exists() and os.access(self.temp_dir, os.W_OK)
@@ -230,17 +339,27 @@ class ImageFox:
             if not selected_images:
                 return self._create_empty_result(request, start_time, errors)
             
-            # Step 4: Process images (optional)
+            # Step 4: Process and upload images (optional). Each image is
+            # uploaded as soon as its own processing finishes.
             if request.enable_processing:
-                selected_images = await self._process_images(selected_images, errors)
-            
-            # Step 5: Upload and store (optional)
-            if request.enable_upload:
+                selected_images = await self._process_images(
+                    selected_images, errors, upload=request.enable_upload
+                )
+            elif request.enable_upload:
                 selected_images = await self._upload_images(selected_images, errors)
             
+            # Step 5: Store metadata (optional)
+            
             if request.enable_storage:
                 selected_images = await self._store_metadata(selected_images, request, errors)
             
+            # Component statistics are opt-in: collecting them costs an Apify
+            # usage API round trip, so run it off the event loop when wanted
+            statistics = (
+                await asyncio.to_thread(self._generate_statistics)
+                if request.include_stats else {}
+            )
+            
             # Create result
             processing_time = time.time() - start_time
             result = WorkflowResult(
@@ -252,7 +371,7 @@ class ImageFox:
                 processing_time=processing_time,
                 total_cost=self._calculate_total_cost(),
                 errors=errors,
-                statistics=self._generate_statistics(),
+                statistics=statistics,
                 created_at=datetime.now().isoformat()
             )
             
@@ -273,8 +392,8 @@ class ImageFox:
             return self._create_empty_result(request, start_time, errors)
         
         finally:
-            # Cleanup if enabled
-            if self.enable_cleanup:
+            # Cleanup if enabled (a running batch cleans up once at its end)
+            if self.enable_cleanup and not self._batches_in_progress:
                 await self._cleanup_temp_files()
     
     async def _search_images(self, request: SearchRequest, errors: List[str]) -> List[Dict[str, Any]]:
@@ -284,7 +403,8 @@ class ImageFox:
             actual_limit = (request.limit or 6) * 3
             logger.info(f"Searching for images: '{request.query}' (limit: {actual_limit}, requested: {request.limit})")
             
-            results = self.apify_client.search_images(
+            results = await self._call_client(
+                self.apify_client.search_images,
                 query=request.query,
                 limit=actual_limit,  # Get more images for fallback
                 safe_search=request.safe_search,
@@ -292,6 +412,7 @@ class ImageFox:
                 min_height=request.min_height
             )
             
+            results = self._dedupe_search_results(results)
             logger.info(f"Found {len(results)} images (extra for fallback on download failures)")
             return results
             
@@ -301,6 +422,28 @@ class ImageFox:
             errors.append(error_msg)
             return []
     
+    def _dedupe_search_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Collapse search results that point at the same image.
+        
+        The highest-resolution variant of each image is kept, in the position
+        of its first occurrence.
+        """
+        best: Dict[str, Dict[str, Any]] = {}
+        for result in results:
+            key = _image_dedupe_key(result.get('image_url', ''))
+            kept = best.get(key)
+            if kept is None:
+                best[key] = result
+            elif (result.get('width') or 0) * (result.get('height') or 0) > \
+                    (kept.get('width') or 0) * (kept.get('height') or 0):
+                # Replacing the value keeps the first occurrence's position
+                best[key] = result
+        
+        if len(best) < len(results):
+            logger.info(f"Dropped {len(results) - len(best)} duplicate search results")
+        return list(best.values())
+    
     async def _analyze_images(self, search_results: List[Dict[str, Any]], request: SearchRequest, errors: List[str]) -> List[ImageCandidate]:
         """Analyze images using vision models."""
         try:
@@ -309,71 +452,124 @@ class ImageFox:
             candidates = []
             semaphore = asyncio.Semaphore(self.max_concurrent)
             
-            async def analyze_single_image(image_data):
-                async with semaphore:
-                    try:
+            async def analyze_image_data(image_data):
+                file_path = None
+                try:
+                    image_url = image_data.get('image_url', '')
+                    
+                    # Create metadata - map from Apify response format
+                    metadata = ImageMetadata(
+                        url=image_url,
+                        title=image_data.get('title', ''),
+                        source_url=image_data.get('source_url', ''),
+                        width=image_data.get('width'),
+                        height=image_data.get('height')
+                    )
+                    
+                    analysis = self._get_cached_analysis(image_url, request.query)
+                    if analysis is None:
                         # Download image first
-                        image_url = image_data.get('image_url', '')
                         success, file_path, error = await self.image_processor.download_image(image_url)
                         
                         if not success:
                             logger.warning(f"Failed to download image {image_url}: {error}")
                             return None
                         
-                        # Create metadata - map from Apify response format
-                        metadata = ImageMetadata(
-                            url=image_url,
-                            title=image_data.get('title', ''),
-                            source_url=image_data.get('source_url', ''),
-                            width=image_data.get('width'),
-                            height=image_data.get('height')
-                        )
-                        
                         # Analyze image using downloaded file path
-                        analysis = self.vision_analyzer.analyze_image(
+                        analysis = await self._call_client(
+                            self.vision_analyzer.analyze_image,
                             file_path,
                             search_query=request.query
                         )
-                        
-                        # Create candidate
-                        candidate = ImageCandidate(
-                            image_url=metadata.url,
-                            source_url=metadata.source_url,
-                            title=metadata.title,
-                            analysis=analysis,
-                            metadata={'width': metadata.width or 0, 'height': metadata.height or 0},
-                            search_query=request.query
+                        self._cache_analysis(image_url, request.query, analysis)
+                    
+                    # Create candidate
+                    candidate = ImageCandidate(
+                        image_url=metadata.url,
+                        source_url=metadata.source_url,
+                        title=metadata.title,
+                        analysis=analysis,
+                        metadata={'width': metadata.width or 0, 'height': metadata.height or 0},
+                        search_query=request.query
+                    )
+                    
+                    return candidate
+                
+                except Exception as e:
+                    logger.warning(f"Failed to analyze image {image_data.get('url', 'unknown')}: {e}")
+                    return None
+                
+                finally:
+                    # Clean up downloaded file, including when cancelled
+                    try:
+                        if file_path and os.path.exists(file_path):
+                            os.unlink(file_path)
+                    except Exception as cleanup_error:
+                        logger.warning(f"Failed to cleanup temporary file {file_path}: {cleanup_error}")
+            
+            async def analyze_single_image(image_data):
+                # Jitter cache misses before they queue for a slot, so the
+                # delay spreads out the first wave without idling a worker
+                cache_key = (image_data.get('image_url', ''), request.query)
+                if self.analysis_jitter > 0 and cache_key not in self._analysis_cache:
+                    await asyncio.sleep(random.uniform(0, self.analysis_jitter))
+                
+                async with semaphore:
+                    try:
+                        return await asyncio.wait_for(
+                            analyze_image_data(image_data),
+                            timeout=self.image_analysis_timeout or None
+                        )
+                    except asyncio.TimeoutError:
+                        logger.warning(
+                            f"Analysis of image {image_data.get('image_url', 'unknown')} timed out "
+                            f"after {self.image_analysis_timeout}s"
                         )
-                        
-                        # Clean up downloaded file
-                        try:
-                            if file_path and os.path.exists(file_path):
-                                os.unlink(file_path)
-                        except Exception as cleanup_error:
-                            logger.warning(f"Failed to cleanup temporary file {file_path}: {cleanup_error}")
-                        
-                        return candidate
-                        
-                    except Exception as e:
-                        logger.warning(f"Failed to analyze image {image_data.get('url', 'unknown')}: {e}")
-                        # Clean up downloaded file even in case of error
-                        try:
-                            if 'file_path' in locals() and file_path and os.path.exists(file_path):
-                                os.unlink(file_path)
-                        except Exception:
-                            pass
                         return None
             
-            # Analyze images concurrently
-            tasks = [analyze_single_image(image) for image in search_results]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+            async def analyze_indexed(index, image_data):
+                return index, await analyze_single_image(image_data)
+            
+            # Analyze images concurrently, stopping early once enough
+            # candidates that pass the selector's quality gate are in
+            tasks = [
+                asyncio.create_task(analyze_indexed(i, image))
+                for i, image in enumerate(search_results)
+            ]
+            sufficient = self.early_stop_factor * request.max_results
+            results: Dict[int, ImageCandidate] = {}
+            passing = 0
+            attempted = 0
             
-            # Filter successful results (exclude None and exceptions)
-            candidates = [r for r in results if r is not None and isinstance(r, ImageCandidate)]
+            try:
+                for next_done in asyncio.as_completed(tasks):
+                    index, candidate = await next_done
+                    attempted += 1
+                    if candidate is None:
+                        continue
+                    
+                    results[index] = candidate
+                    if sufficient and self._passes_quality_gate(candidate):
+                        passing += 1
+                        if passing >= sufficient:
+                            logger.info(
+                                f"{passing} candidates pass the quality gate; skipping "
+                                f"{len(search_results) - attempted} remaining analyses"
+                            )
+                            break
+            finally:
+                pending = [task for task in tasks if not task.done()]
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+            
+            # Keep search order so selection doesn't depend on completion order
+            candidates = [results[i] for i in sorted(results)]
             
             # Log download success rate
-            success_rate = (len(candidates) / len(search_results) * 100) if search_results else 0
-            logger.info(f"Successfully analyzed {len(candidates)}/{len(search_results)} images ({success_rate:.1f}% success rate)")
+            success_rate = (len(candidates) / attempted * 100) if attempted else 0
+            logger.info(f"Successfully analyzed {len(candidates)}/{attempted} images ({success_rate:.1f}% success rate)")
             
             # Ensure we have at least the minimum required images
             min_required = request.limit or 2
@@ -388,13 +584,48 @@ class ImageFox:
             errors.append(error_msg)
             return []
     
+    def _passes_quality_gate(self, candidate: ImageCandidate) -> bool:
+        """Return True if a candidate clears the selector's minimum scores."""
+        criteria = self.image_selector.criteria
+        analysis = candidate.analysis
+        return (
+            analysis.quality_metrics.overall_score >= criteria.min_quality_score
+            and analysis.relevance_score >= criteria.min_relevance_score
+        )
+    
+    def _get_cached_analysis(self, image_url: str, query: str):
+        """Return a cached analysis for this image and query, or None."""
+        if not self._analysis_cache_max:
+            return None
+        
+        key = (image_url, query)
+        analysis = self._analysis_cache.get(key)
+        if analysis is None:
+            self.stats['analysis_cache_misses'] += 1
+            return None
+        
+        self._analysis_cache.move_to_end(key)
+        self.stats['analysis_cache_hits'] += 1
+        return analysis
+    
+    def _cache_analysis(self, image_url: str, query: str, analysis):
+        """Store an analysis, evicting the least recently used entry when full."""
+        if not self._analysis_cache_max:
+            return
+        
+        self._analysis_cache[(image_url, query)] = analysis
+        if len(self._analysis_cache) > self._analysis_cache_max:
+            self._analysis_cache.popitem(last=False)
+    
     async def _select_images(self, candidates: List[ImageCandidate], request: SearchRequest, errors: List[str]) -> List[ImageResult]:
         """Select best images using selection algorithm."""
         try:
             logger.info(f"Selecting best {request.max_results} images from {len(candidates)} candidates")
             
-            # Run AI-powered selection with Claude 3.5 Sonnet
-            selection_result = self.image_selector.select_with_ai_reasoning(
+            # Run AI-powered selection with Claude 3.5 Sonnet; it makes a
+            # blocking OpenRouter request, so keep it off the event loop
+            selection_result = await self._call_client(
+                self.image_selector.select_with_ai_reasoning,
                 candidates=candidates,
                 count=request.max_results,
                 search_query=request.query,
@@ -410,20 +641,31 @@ class ImageFox:
                 dimensions = f"{width}x{height}" if width and height else "unknown"
                 
                 # Create analysis dict with raw responses
+                analysis = selected.analysis
+                metrics = analysis.quality_metrics
                 analysis_dict = {
-                    'description': selected.analysis.description,
-                    'objects': selected.analysis.objects,
-                    'scene_type': selected.analysis.scene_type,
-                    'colors': selected.analysis.colors,
-                    'composition': selected.analysis.composition,
-                    'quality_score': selected.analysis.quality_metrics.overall_score,
-                    'relevance_score': selected.analysis.relevance_score,
-                    'confidence_score': selected.analysis.confidence_score,
-                    'models_used': selected.analysis.models_used,
-                    'processing_time': selected.analysis.processing_time,
-                    'cost_estimate': selected.analysis.cost_estimate,
-                    'technical_details': selected.analysis.quality_metrics.__dict__,
-                    'raw_model_responses': getattr(selected.analysis, 'raw_model_responses', [])
+                    'description': analysis.description,
+                    'objects': analysis.objects,
+                    'scene_type': analysis.scene_type,
+                    'colors': analysis.colors,
+                    'composition': analysis.composition,
+                    'quality_score': metrics.overall_score,
+                    'relevance_score': analysis.relevance_score,
+                    'confidence_score': analysis.confidence_score,
+                    'models_used': analysis.models_used,
+                    'processing_time': analysis.processing_time,
+                    'cost_estimate': analysis.cost_estimate,
+                    # A fresh dict, so the (possibly cached) metrics aren't
+                    # aliased into the result
+                    'technical_details': {
+                        'overall_score': metrics.overall_score,
+                        'composition_score': metrics.composition_score,
+                        'clarity_score': metrics.clarity_score,
+                        'color_score': metrics.color_score,
+                        'content_relevance': metrics.content_relevance,
+                        'technical_quality': metrics.technical_quality
+                    },
+                    'raw_model_responses': analysis.raw_model_responses
                 }
                 
                 image_result = ImageResult(
@@ -446,29 +688,31 @@ class ImageFox:
             errors.append(error_msg)
             return []
     
-    async def _process_images(self, images: List[ImageResult], errors: List[str]) -> List[ImageResult]:
-        """Process images (download, optimize, generate thumbnails)."""
+    async def _process_images(
+        self,
+        images: List[ImageResult],
+        errors: List[str],
+        upload: bool = False
+    ) -> List[ImageResult]:
+        """
+        Process images (download, optimize, generate thumbnails).
+        
+        Images are processed concurrently. With upload=True each image is
+        uploaded to ImageBB straight after its own processing, so uploads
+        overlap with the processing of the remaining images.
+        """
         try:
             logger.info(f"Processing {len(images)} selected images")
             
-            async with self.image_processor as processor:
-                for image in images:
-                    try:
-                        # Process image
-                        result = await processor.process_image(
-                            image.url,
-                            optimize=True,
-                            generate_thumb=True
-                        )
-                        
-                        if result.success:
-                            image.processed_path = result.file_path
-                            image.thumbnail_path = result.thumbnail_path
-                        else:
-                            logger.warning(f"Failed to process image {image.url}: {result.error_message}")
-                            
-                    except Exception as e:
-                        logger.warning(f"Error processing image {image.url}: {e}")
+            await self._open_processor_session()
+            processor = self.image_processor
+            
+            async def process_single_image(image):
+                await self._process_one(processor, image)
+                if upload:
+                    await self._upload_one(image)
+            
+            await asyncio.gather(*(process_single_image(image) for image in images))
             
             logger.info("Image processing completed")
             return images
@@ -479,21 +723,31 @@ class ImageFox:
             errors.append(error_msg)
             return images
     
+    async def _process_one(self, processor, image: ImageResult):
+        """Process a single selected image."""
+        try:
+            result = await processor.process_image(
+                image.url,
+                optimize=True,
+                generate_thumb=True
+            )
+            
+            if result.success:
+                image.processed_path = result.file_path
+                image.thumbnail_path = result.thumbnail_path
+            else:
+                logger.warning(f"Failed to process image {image.url}: {result.error_message}")
+                
+        except Exception as e:
+            logger.warning(f"Error processing image {image.url}: {e}")
+    
     async def _upload_images(self, images: List[ImageResult], errors: List[str]) -> List[ImageResult]:
         """Upload processed images to ImageBB."""
         try:
             logger.info(f"Uploading {len(images)} images to ImageBB")
             
-            for image in images:
-                if image.processed_path and Path(image.processed_path).exists():
-                    try:
-                        upload_result = self.imagebb_uploader.upload_file(image.processed_path)
-                        if upload_result:
-                            image.imagebb_url = upload_result.get('url')
-                            logger.debug(f"Uploaded {image.url} -> {image.imagebb_url}")
-                        
-                    except Exception as e:
-                        logger.warning(f"Failed to upload image {image.url}: {e}")
+            # Uploads are independent, so run them concurrently
+            await asyncio.gather(*(self._upload_one(image) for image in images))
             
             logger.info("Image upload completed")
             return images
@@ -504,11 +758,27 @@ class ImageFox:
             errors.append(error_msg)
             return images
     
+    async def _upload_one(self, image: ImageResult):
+        """Upload a single processed image to ImageBB."""
+        if not (image.processed_path and Path(image.processed_path).exists()):
+            return
+        
+        try:
+            upload_result = await self._call_client(
+                self.imagebb_uploader.upload_file, image.processed_path
+            )
+            image.imagebb_url = upload_result.url
+            logger.debug(f"Uploaded {image.url} -> {image.imagebb_url}")
+            
+        except Exception as e:
+            logger.warning(f"Failed to upload image {image.url}: {e}")
+    
     async def _store_metadata(self, images: List[ImageResult], request: SearchRequest, errors: List[str]) -> List[ImageResult]:
         """Store image metadata in Airtable."""
         try:
             logger.info(f"Storing metadata for {len(images)} images in Airtable")
             
+            upload_date = datetime.now().isoformat()
             records = []
             for image in images:
                 record_data = {
@@ -518,22 +788,43 @@ class ImageFox:
                     'Search Query': request.query,
                     'Dimensions': image.dimensions,
                     'Selection Score': image.selection_score,
-                    'Analysis Results': str(image.analysis)[:50000],  # Airtable limit
+                    'Analysis Results': self._serialize_analysis(image.analysis),
                     'ImageBB URL': image.imagebb_url or '',
                     'Processing Status': 'Completed',
-                    'Upload Date': datetime.now().isoformat()
+                    'Upload Date': upload_date
                 }
                 records.append(record_data)
             
-            # Batch create records
-            created_records = self.airtable_uploader.batch_create(records)
+            # Batch create records in API-sized chunks, sent concurrently (the
+            # Airtable client's rate limit still paces the requests)
+            size = self.AIRTABLE_BATCH_SIZE
+            starts = range(0, len(records), size)
+            chunk_results = await asyncio.gather(
+                *(
+                    self._call_client(
+                        self.airtable_uploader.batch_create,
+                        records[start:start + size]
+                    )
+                    for start in starts
+                ),
+                return_exceptions=True
+            )
             
-            # Update image objects with Airtable IDs
-            for i, record in enumerate(created_records):
-                if i < len(images):
-                    images[i].airtable_id = record.get('id')
+            # Update image objects with Airtable IDs; a failed chunk doesn't
+            # discard the IDs of the chunks that were stored
+            stored = 0
+            for start, created_records in zip(starts, chunk_results):
+                if isinstance(created_records, Exception):
+                    error_msg = f"Metadata storage failed: {created_records}"
+                    logger.error(error_msg)
+                    errors.append(error_msg)
+                    continue
+                
+                for image, record in zip(images[start:start + size], created_records):
+                    image.airtable_id = record.get('id')
+                stored += len(created_records)
             
-            logger.info(f"Stored {len(created_records)} records in Airtable")
+            logger.info(f"Stored {stored} records in Airtable")
             return images
             
         except Exception as e:
@@ -542,6 +833,27 @@ class ImageFox:
             errors.append(error_msg)
             return images
     
+    def _serialize_analysis(self, analysis: Dict[str, Any]) -> str:
+        """
+        Serialize an analysis dict as JSON within the Airtable length limit.
+        
+        The raw model responses are the only unbounded part, so they are
+        dropped first to keep the stored value valid JSON; only if that is
+        still too long is the text cut.
+        """
+        limit = self.AIRTABLE_ANALYSIS_LIMIT
+        serialized = _json_dumps(analysis)
+        if len(serialized) <= limit:
+            return serialized
+        
+        if analysis.get('raw_model_responses'):
+            serialized = _json_dumps({**analysis, 'raw_model_responses': None})
+            if len(serialized) <= limit:
+                return serialized
+        
+        logger.warning(f"Analysis JSON is {len(serialized)} chars; truncating to {limit}")
+        return serialized[:limit]
+    
     def _calculate_total_cost(self) -> float:
         """Calculate total cost of workflow execution."""
         total_cost = 0.0
@@ -573,6 +885,12 @@ class ImageFox:
         if hasattr(self.image_selector, 'get_selection_stats'):
             stats['image_selector'] = self.image_selector.get_selection_stats()
         
+        stats['analysis_cache'] = {
+            'hits': self.stats['analysis_cache_hits'],
+            'misses': self.stats['analysis_cache_misses'],
+            'size': len(self._analysis_cache)
+        }
+        
         return stats
     
     def _update_stats(self, result: WorkflowResult):
@@ -603,21 +921,24 @@ class ImageFox:
         """Clean up temporary files."""
         try:
             if self.temp_dir.exists():
-                # Clean up old temp files
-                for file_path in self.temp_dir.iterdir():
-                    try:
-                        if file_path.is_file():
-                            # Remove files older than 1 hour
-                            if time.time() - file_path.stat().st_mtime > 3600:
-                                file_path.unlink()
-                        elif file_path.is_dir():
-                            # Remove empty directories
-                            try:
-                                file_path.rmdir()
-                            except OSError:
-                                pass  # Directory not empty
-                    except Exception as e:
-                        logger.warning(f"Failed to clean up {file_path}: {e}")
+                # Clean up old temp files; scandir yields the entry type
+                # without a stat call, so only regular files are stat'ed
+                now = time.time()
+                with os.scandir(self.temp_dir) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_file():
+                                # Remove files older than 1 hour
+                                if now - entry.stat().st_mtime > 3600:
+                                    os.unlink(entry.path)
+                            elif entry.is_dir():
+                                # Remove empty directories
+                                try:
+                                    os.rmdir(entry.path)
+                                except OSError:
+                                    pass  # Directory not empty
+                        except Exception as e:
+                            logger.warning(f"Failed to clean up {entry.path}: {e}")
             
         except Exception as e:
             logger.warning(f"Cleanup failed: {e}")
@@ -630,7 +951,8 @@ class ImageFox:
             requests: List of search requests
             
         Returns:
-            List of workflow results
+            One workflow result per request, in request order; failed or
+            timed-out workflows are returned as empty results with errors
         """
         logger.info(f"Processing batch of {len(requests)} search requests")
         
@@ -639,17 +961,37 @@ class ImageFox:
         
         async def process_single_request(request):
             async with semaphore:
-                return await self.search_and_select(request)
-        
-        # Execute all requests
-        tasks = [process_single_request(request) for request in requests]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+                start_time = time.time()
+                try:
+                    return await asyncio.wait_for(
+                        self.search_and_select(request),
+                        timeout=self.workflow_timeout or None
+                    )
+                except asyncio.TimeoutError:
+                    error_msg = f"Workflow timed out after {self.workflow_timeout}s"
+                    logger.error(f"{error_msg} for query: '{request.query}'")
+                    return self._create_empty_result(request, start_time, [error_msg])
         
-        # Filter successful results
-        successful_results = [r for r in results if isinstance(r, WorkflowResult)]
+        # Execute all requests; if one fails unexpectedly the remaining
+        # workflows are cancelled. Temp files are cleaned up once afterwards
+        # instead of after every workflow
+        self._batches_in_progress += 1
+        tasks = [asyncio.create_task(process_single_request(request)) for request in requests]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            self._batches_in_progress -= 1
+            if self.enable_cleanup and not self._batches_in_progress:
+                await self._cleanup_temp_files()
         
-        logger.info(f"Batch processing completed: {len(successful_results)}/{len(requests)} successful")
-        return successful_results
+        successful = sum(1 for result in results if result.selected_count)
+        logger.info(f"Batch processing completed: {successful}/{len(requests)} successful")
+        return results
     
     def get_stats(self) -> Dict[str, Any]:
         """Get orchestrator statistics."""
@@ -667,6 +1009,8 @@ class ImageFox:
             if hasattr(self.image_selector, 'clear_cache'):
                 self.image_selector.clear_cache()
             
+            self._analysis_cache.clear()
+            
             logger.info("All caches cleared")
             
         except Exception as e:
@@ -719,7 +1063,7 @@ async def main():
         # Validate configuration if requested
         if args.validate:
             print("Validating ImageFox configuration...")
-            validation = imagefox.validate_configuration()
+            validation = await imagefox.validate_configuration()
             for component, status in validation.items():
                 status_str = "✅ OK" if status else "❌ FAILED"
                 print(f"  {component}: {status_str}")
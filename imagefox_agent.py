@@ -553,7 +553,7 @@ async def main():
         logger.info("Initializing ImageFox...")
         async with ImageFox() as imagefox:
             # Validate ImageFox configuration
-            validation_results = imagefox.validate_configuration()
+            validation_results = await imagefox.validate_configuration()
             failed_components = [comp for comp, status in validation_results.items() if not status]
             
             if failed_components:
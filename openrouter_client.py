@@ -10,11 +10,13 @@ import os
 import json
 import base64
 import time
+import asyncio
 import logging
 from typing import Dict, List, Optional, Any, Union
 from datetime import datetime
 from dataclasses import dataclass, asdict
 from enum import Enum
+import httpx
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
@@ -24,6 +26,10 @@ from sentry_sdk import capture_exception
 logger = logging.getLogger(__name__)
 
 
+class RateLimitError(Exception):
+    """Raised when OpenRouter rejects a request with HTTP 429."""
+
+
 class ModelCapability(Enum):
     """Model capability flags."""
     VISION = "vision"
@@ -219,17 +225,40 @@ class OpenRouterClient:
         session.mount("https://", adapter)
         
         # Set default headers
-        session.headers.update({
+        session.headers.update(self._default_headers())
+        
+        return session
+    
+    def _default_headers(self) -> Dict[str, str]:
+        """Headers sent with every OpenRouter request."""
+        return {
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json',
             'HTTP-Referer': 'https://imagefox.cccrafts.ai',
             'X-Title': 'ImageFox'
-        })
-        
-        return session
+        }
     
     def _enforce_rate_limit(self):
         """Enforce rate limiting to prevent API throttling."""
+        sleep_time = self._reserve_rate_limit_slot()
+        if sleep_time > 0:
+            logger.info(f"Rate limit reached, sleeping for {sleep_time:.2f} seconds")
+            time.sleep(sleep_time)
+    
+    async def _enforce_rate_limit_async(self):
+        """Enforce rate limiting without blocking the event loop."""
+        sleep_time = self._reserve_rate_limit_slot()
+        if sleep_time > 0:
+            logger.info(f"Rate limit reached, sleeping for {sleep_time:.2f} seconds")
+            await asyncio.sleep(sleep_time)
+    
+    def _reserve_rate_limit_slot(self) -> float:
+        """
+        Record a request against the per-minute window.
+        
+        Returns:
+            Seconds the caller must wait before sending (0 if under the limit)
+        """
         current_time = time.time()
         minute_ago = current_time - 60
         
@@ -240,16 +269,15 @@ class OpenRouterClient:
         ]
         
         # Check if we've hit the rate limit
+        sleep_time = 0.0
         if len(self.requests_per_minute) >= self.rate_limit:
             # Calculate sleep time
             oldest_request = min(self.requests_per_minute)
-            sleep_time = 60 - (current_time - oldest_request) + 0.1
-            if sleep_time > 0:
-                logger.info(f"Rate limit reached, sleeping for {sleep_time:.2f} seconds")
-                time.sleep(sleep_time)
+            sleep_time = max(0.0, 60 - (current_time - oldest_request) + 0.1)
         
         # Record this request
         self.requests_per_minute.append(current_time)
+        return sleep_time
     
     def select_model(self, quality_priority: bool = True, cost_priority: bool = False) -> str:
         """
@@ -287,6 +315,20 @@ class OpenRouterClient:
         # Fallback to default
         return self.default_model
     
+    def encode_image_bytes(self, image_data: bytes, mime_type: str = 'image/jpeg') -> str:
+        """
+        Encode in-memory image bytes to a base64 data URI.
+        
+        Args:
+            image_data: Raw image bytes
+            mime_type: MIME type of the image
+        
+        Returns:
+            Base64 encoded image with data URI prefix
+        """
+        base64_data = base64.b64encode(image_data).decode('utf-8')
+        return f"data:{mime_type};base64,{base64_data}"
+    
     def encode_image_base64(self, image_path: str) -> str:
         """
         Encode image file to base64.
@@ -320,6 +362,59 @@ class OpenRouterClient:
             capture_exception(e)
             raise
     
+    def _prepare_image_url(self, image_input: str) -> str:
+        """
+        Resolve an image input to a URL the API accepts.
+        
+        Args:
+            image_input: Image file path, URL, or base64 data URI
+        
+        Returns:
+            HTTP(S) URL or base64 data URI
+        """
+        if image_input.startswith('http'):
+            # URL - pass directly
+            return image_input
+        elif image_input.startswith('data:'):
+            # Already base64 encoded
+            return image_input
+        else:
+            # File path - encode to base64
+            return self.encode_image_base64(image_input)
+    
+    def _build_payload(
+        self,
+        image_url: str,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: float
+    ) -> Dict[str, Any]:
+        """Build a chat completion payload for a single image and prompt."""
+        return {
+            "model": model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": prompt
+                        },
+                        {
+                            "type": "image_url",
+                            "image_url": {
+                                "url": image_url
+                            }
+                        }
+                    ]
+                }
+            ],
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "response_format": {"type": "json_object"}
+        }
+    
     def analyze_image(
         self,
         image_input: Union[str, bytes],
@@ -351,15 +446,7 @@ class OpenRouterClient:
             model = self.select_model()
         
         # Prepare image data
-        if image_input.startswith('http'):
-            # URL - pass directly
-            image_url = image_input
-        elif image_input.startswith('data:'):
-            # Already base64 encoded
-            image_url = image_input
-        else:
-            # File path - encode to base64
-            image_url = self.encode_image_base64(image_input)
+        image_url = self._prepare_image_url(image_input)
         
         # Default analysis prompt
         if not prompt:
@@ -385,29 +472,7 @@ Format your response as JSON with these fields:
         self._enforce_rate_limit()
         
         # Prepare request
-        payload = {
-            "model": model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": image_url
-                            }
-                        }
-                    ]
-                }
-            ],
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "response_format": {"type": "json_object"}
-        }
+        payload = self._build_payload(image_url, prompt, model, max_tokens, temperature)
         
         try:
             # Make API request
@@ -435,7 +500,7 @@ Format your response as JSON with these fields:
             elif response.status_code == 402:
                 raise Exception("Insufficient OpenRouter credits")
             elif response.status_code == 429:
-                raise Exception("Rate limit exceeded")
+                raise RateLimitError("Rate limit exceeded")
             else:
                 response.raise_for_status()
                 
@@ -452,6 +517,82 @@ Format your response as JSON with these fields:
             else:
                 raise
     
+    async def analyze_image_with_prompt_async(
+        self,
+        http_client: httpx.AsyncClient,
+        image_input: str,
+        prompt: str,
+        model: Optional[str] = None,
+        max_tokens: int = 1000,
+        temperature: float = 0.3
+    ) -> str:
+        """
+        Analyze an image with a caller-defined prompt and response schema.
+        
+        Unlike analyze_image, the response is not mapped onto AnalysisResult,
+        so callers can request their own JSON structure. The request goes
+        through a caller-owned httpx.AsyncClient so many concurrent analyses
+        share one connection pool.
+        
+        Args:
+            http_client: Shared async HTTP client
+            image_input: Image file path, URL, or base64 data URI
+            prompt: Analysis prompt
+            model: Model to use (if not specified, auto-selects)
+            max_tokens: Maximum response tokens
+            temperature: Response randomness (0-1)
+        
+        Returns:
+            Raw message content returned by the model
+        
+        Raises:
+            Exception: If the request fails or the response is empty
+        """
+        if not model:
+            model = self.select_model()
+        
+        image_url = self._prepare_image_url(image_input)
+        
+        await self._enforce_rate_limit_async()
+        
+        payload = self._build_payload(image_url, prompt, model, max_tokens, temperature)
+        
+        try:
+            response = await http_client.post(
+                f"{self.API_BASE_URL}/chat/completions",
+                json=payload,
+                headers=self._default_headers(),
+                timeout=int(os.getenv('REQUEST_TIMEOUT', '60'))
+            )
+            
+            if response.status_code == 402:
+                raise Exception("Insufficient OpenRouter credits")
+            elif response.status_code == 429:
+                raise RateLimitError("Rate limit exceeded")
+            response.raise_for_status()
+            
+            return self._extract_prompt_content(response.json(), model)
+            
+        except Exception as e:
+            logger.error(f"Error analyzing image with custom prompt: {e}")
+            capture_exception(e)
+            raise
+    
+    def _extract_prompt_content(self, response_data: Dict, model: str) -> str:
+        """
+        Track usage and return the message content of a custom-prompt response.
+        
+        Raises:
+            ValueError: If the response content is empty
+        """
+        self._track_usage(response_data, model)
+        
+        content = response_data['choices'][0]['message']['content']
+        if not content or content.strip() == '':
+            raise ValueError("Empty response content from API")
+        
+        return content
+    
     def _parse_analysis_response(
         self, 
         response_data: Dict, 
@@ -489,7 +630,7 @@ Format your response as JSON with these fields:
             total_tokens = usage.get('total_tokens', 0)
             model_info = self.MODEL_REGISTRY.get(model)
             
-            if model_info and hasattr(model_info, 'input_cost_per_million') and hasattr(model_info, 'output_cost_per_million'):
+            if model_info and model_info.input_cost_per_million is not None and model_info.output_cost_per_million is not None:
                 input_cost = (prompt_tokens / 1_000_000) * model_info.input_cost_per_million
                 output_cost = (completion_tokens / 1_000_000) * model_info.output_cost_per_million
                 cost_estimate = input_cost + output_cost
@@ -545,7 +686,7 @@ Format your response as JSON with these fields:
         model_info = self.MODEL_REGISTRY.get(model)
         
         # Calculate cost using separate input/output pricing
-        if model_info and hasattr(model_info, 'input_cost_per_million') and hasattr(model_info, 'output_cost_per_million'):
+        if model_info and model_info.input_cost_per_million is not None and model_info.output_cost_per_million is not None:
             input_cost = (prompt_tokens / 1_000_000) * model_info.input_cost_per_million
             output_cost = (completion_tokens / 1_000_000) * model_info.output_cost_per_million
             cost = input_cost + output_cost
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Rate limiting for ImageFox API clients.
+
+A single token bucket implementation shared by the uploaders and the
+experiment scripts, usable from both threads and coroutines.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Token-bucket request-rate limiter.
+    
+    Holds up to ``rate`` tokens refilled continuously over ``period`` seconds,
+    so idle quota can be spent in bursts. A caller that finds the bucket empty
+    reserves the next token anyway (going into debt) and waits until it has
+    accrued, so concurrent callers are spaced out in arrival order. Use
+    ``wait`` from synchronous code and ``acquire`` from coroutines.
+    """
+    
+    def __init__(self, rate: float, period: float = 60.0):
+        self.rate = max(1, rate)
+        self._tokens = float(self.rate)
+        self._refill_per_sec = self.rate / period
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        """
+        Take a token, going into debt if the bucket is empty.
+        
+        Returns:
+            Seconds the caller must wait before sending (0 if a token was free)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.rate),
+                self._tokens + (now - self._last_refill) * self._refill_per_sec
+            )
+            self._last_refill = now
+            self._tokens -= 1
+            
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self._refill_per_sec
+    
+    def wait(self):
+        """Block the calling thread until the next request may be sent."""
+        sleep_time = self.reserve()
+        if sleep_time > 0:
+            logger.info(f"Rate limit reached, sleeping for {sleep_time:.2f} seconds")
+            time.sleep(sleep_time)
+    
+    async def acquire(self):
+        """Wait, without blocking the event loop, until the next request may be sent."""
+        sleep_time = self.reserve()
+        if sleep_time > 0:
+            logger.info(f"Rate limit reached, sleeping for {sleep_time:.2f} seconds")
+            await asyncio.sleep(sleep_time)
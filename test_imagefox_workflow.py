@@ -51,7 +51,7 @@ async def test_imagefox_workflow():
         imagefox = ImageFox()
         
         # Validate configuration (skip airtable)
-        validation_results = imagefox.validate_configuration()
+        validation_results = await imagefox.validate_configuration()
         failed_components = [comp for comp, status in validation_results.items() if not status and comp != 'airtable']
         
         if failed_components:
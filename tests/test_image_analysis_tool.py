@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the experiment image analysis tool.
+"""
+
+import os
+import sys
+import asyncio
+import tempfile
+import unittest
+from unittest.mock import AsyncMock, patch
+
+# Add parent and experiments directories to path
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, 'experiments'))
+
+from image_analysis_tool import AnalysisCache, ImageAnalyzer, ImageRating, MODEL_PRECISE
+
+
+def make_rating(name: str, score: float, image_url: str = None) -> ImageRating:
+    """Create a rating whose parameters all equal score."""
+    params = dict.fromkeys((
+        'relevance_to_article', 'visual_quality', 'professional_appeal', 'concept_clarity',
+        'brand_appropriateness', 'emotional_impact', 'informational_value', 'uniqueness',
+        'scalability', 'contextual_fit'
+    ), score)
+    rating = ImageRating(
+        image_url=f"https://example.com/{name}.jpg" if image_url is None else image_url,
+        experiment_name=name,
+        search_query="query",
+        title=name,
+        **params
+    )
+    rating.calculate_total_score()
+    return rating
+
+
+class TestTwoPassRanking(unittest.TestCase):
+    """Test cases for fast first-pass scoring followed by precise re-scoring."""
+    
+    def setUp(self):
+        """Set up an analyzer whose precise model scores differently."""
+        # Skip __init__: it opens API clients the ranking logic doesn't need
+        self.analyzer = ImageAnalyzer.__new__(ImageAnalyzer)
+        
+        # First pass (fast model) and systematically lower, reordered precise scores
+        self.fast = {'A': 9, 'B': 8, 'C': 7, 'D': 6, 'E': 5, 'F': 4}
+        precise = {'A': 6, 'B': 5, 'C': 6.5, 'D': 3, 'E': 7}
+        
+        async def analyze(image_url, experiment_name, search_query, title, model):
+            return make_rating(experiment_name, precise[experiment_name])
+        
+        self.analyzer.analyze_image_comprehensive = AsyncMock(side_effect=analyze)
+        self.ratings = [make_rating(name, score) for name, score in self.fast.items()]
+        self.ratings.append(make_rating('no-image', 10, image_url=""))
+    
+    def test_rescores_top_k_plus_margin_with_precise_model(self):
+        """Test that only first-pass finalists with images are re-scored."""
+        finalists = asyncio.run(self.analyzer.rescore_top_ratings(self.ratings, top_k=3, margin=2))
+        
+        self.assertEqual(sorted(r.experiment_name for r in finalists), ['A', 'B', 'C', 'D', 'E'])
+        for call in self.analyzer.analyze_image_comprehensive.await_args_list:
+            self.assertEqual(call.kwargs['model'], MODEL_PRECISE)
+    
+    def test_ranking_uses_only_precise_scores(self):
+        """Test that lower precise scores can't lose to first-pass scores."""
+        finalists = asyncio.run(self.analyzer.rescore_top_ratings(self.ratings, top_k=3, margin=2))
+        leader, contenders = self.analyzer.rank_images(finalists)
+        
+        # F's first-pass score beats D's precise score but must not be ranked
+        self.assertEqual(leader.experiment_name, 'E')
+        self.assertEqual([r.experiment_name for r in contenders], ['C', 'A'])
+
+
+class TestAnalysisCache(unittest.TestCase):
+    """Test cases for the on-disk analysis cache."""
+    
+    def setUp(self):
+        """Set up a cache in a temporary directory."""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = AnalysisCache(self.temp_dir.name, max_entries=10)
+    
+    def tearDown(self):
+        """Remove the temporary cache directory."""
+        self.temp_dir.cleanup()
+    
+    def _fill(self, count):
+        """Store count entries with increasing modification times."""
+        for i in range(count):
+            self.cache.set(f"key{i}", {'score': i})
+            os.utime(os.path.join(self.temp_dir.name, f"key{i}.json"), (i, i))
+    
+    def test_no_eviction_scan_below_limit(self):
+        """Test that inserts and overwrites within the limit don't scan the directory."""
+        with patch.object(self.cache, '_evict') as mock_evict:
+            self._fill(10)
+            self.cache.set("key0", {'score': 0})
+        
+        mock_evict.assert_not_called()
+        self.assertEqual(self.cache.get("key9"), {'score': 9})
+    
+    def test_evicts_least_recently_used_past_limit(self):
+        """Test that crossing the limit evicts the oldest entries with headroom."""
+        self._fill(11)
+        
+        self.assertEqual(len(os.listdir(self.temp_dir.name)), 9)
+        self.assertIsNone(self.cache.get("key0"))
+        self.assertIsNone(self.cache.get("key1"))
+        self.assertEqual(self.cache.get("key10"), {'score': 10})
+        
+        # A reopened cache picks up the existing entry count
+        self.assertEqual(AnalysisCache(self.temp_dir.name, max_entries=10)._entry_count, 9)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,6 +8,7 @@ import sys
 import unittest
 import asyncio
 import tempfile
+import time
 import shutil
 from unittest.mock import patch, MagicMock, AsyncMock
 from pathlib import Path
@@ -175,6 +176,21 @@ class TestImageProcessor(unittest.TestCase):
         self.assertFalse(is_valid)
         self.assertIn("Image too small", error)
     
+    def test_validate_image_strict_detects_corruption(self):
+        """Test strict validation catches a truncated PNG that the header check accepts."""
+        truncated_path = os.path.join(self.temp_dir, "truncated.png")
+        with open(self.png_image_path, 'rb') as f:
+            data = f.read()
+        with open(truncated_path, 'wb') as f:
+            f.write(data[:len(data) // 2])
+        processor = ImageProcessor()
+        
+        self.assertTrue(processor.validate_image(truncated_path)[0])
+        is_valid, error = processor.validate_image(truncated_path, strict_validation=True)
+        
+        self.assertFalse(is_valid)
+        self.assertIn("Invalid image file", error)
+    
     def test_validate_image_nonexistent(self):
         """Test image validation with non-existent file."""
         processor = ImageProcessor()
@@ -202,6 +218,44 @@ class TestImageProcessor(unittest.TestCase):
         self.assertIsNotNone(metadata.file_hash)
         self.assertGreater(metadata.processing_time, 0)
     
+    def test_extract_metadata_from_bytes_matches_file(self):
+        """Test metadata extracted from pre-read bytes matches reading the file."""
+        processor = ImageProcessor()
+        url = "https://example.com/test.jpg"
+        data = Path(self.test_image_path).read_bytes()
+        
+        from_file = processor.extract_metadata(self.test_image_path, url)
+        from_bytes = processor.extract_metadata(self.test_image_path, url, data=data)
+        
+        self.assertEqual(from_bytes.file_hash, from_file.file_hash)
+        self.assertEqual(from_bytes.file_size, from_file.file_size)
+        self.assertEqual((from_bytes.width, from_bytes.height), (from_file.width, from_file.height))
+    
+    def test_extract_metadata_uses_download_hash(self):
+        """Test the SHA-256 streamed during download is reused instead of re-hashing."""
+        processor = ImageProcessor()
+        processor._hash_cache[self.test_image_path] = "streamed-digest"
+        
+        with patch('image_processor._sha256_file') as mock_hash:
+            metadata = processor.extract_metadata(self.test_image_path, "https://example.com/test.jpg")
+        
+        self.assertEqual(metadata.file_hash, "streamed-digest")
+        mock_hash.assert_not_called()
+    
+    def test_extract_metadata_exif_creation_time(self):
+        """Test creation time is read from DateTimeOriginal in the Exif sub-IFD."""
+        exif_image_path = os.path.join(self.temp_dir, "exif_image.jpg")
+        exif = Image.Exif()
+        exif[0x0110] = "Test Camera"  # Model
+        exif.get_ifd(0x8769)[0x9003] = "2019:05:06 07:08:09"  # DateTimeOriginal
+        Image.new('RGB', (800, 600), color='red').save(exif_image_path, exif=exif)
+        processor = ImageProcessor()
+        
+        metadata = processor.extract_metadata(exif_image_path, "https://example.com/exif.jpg")
+        
+        self.assertEqual(metadata.exif_data['Model'], "Test Camera")
+        self.assertEqual(metadata.creation_time, datetime(2019, 5, 6, 7, 8, 9))
+    
     def test_extract_metadata_png_with_transparency(self):
         """Test metadata extraction from PNG with transparency."""
         processor = ImageProcessor()
@@ -233,6 +287,34 @@ class TestImageProcessor(unittest.TestCase):
             # Should be resized to max dimension
             self.assertLessEqual(max(img.size), 2048)
     
+    def test_optimize_image_jpeg_draft_keeps_max_dimension(self):
+        """Test JPEG shrink-on-load still yields a full 2048px optimized image."""
+        huge_image_path = os.path.join(self.temp_dir, "huge_image.jpg")
+        self.create_test_image(huge_image_path, (5000, 3500))
+        processor = ImageProcessor(use_vips=False)
+        
+        optimized_path = processor.optimize_image(huge_image_path)
+        
+        self.assertIsNotNone(optimized_path)
+        with Image.open(optimized_path) as img:
+            self.assertEqual(max(img.size), 2048)
+    
+    @patch('image_processor.subprocess.run')
+    @patch('image_processor.shutil.which', return_value='/usr/bin/jpegoptim')
+    def test_optimize_image_postprocess_jpegoptim(self, mock_which, mock_run):
+        """Test optimized JPEGs are passed to jpegoptim when enabled."""
+        mock_run.return_value = MagicMock(returncode=0)
+        processor = ImageProcessor()
+        
+        with patch.object(ImageProcessor, 'POSTPROCESS_JPEG', True):
+            optimized_path = processor.optimize_image(self.large_image_path, quality=75)
+        
+        self.assertIsNotNone(optimized_path)
+        args = mock_run.call_args[0][0]
+        self.assertEqual(args[0], '/usr/bin/jpegoptim')
+        self.assertIn('--strip-all', args)
+        self.assertEqual(args[-1], optimized_path)
+    
     def test_optimize_image_png_conversion(self):
         """Test PNG optimization (should convert to JPEG)."""
         processor = ImageProcessor()
@@ -282,6 +364,38 @@ class TestImageProcessor(unittest.TestCase):
             # Should be within thumbnail size limits
             self.assertLessEqual(max(thumb.size), max(processor.THUMBNAIL_SIZE))
     
+    def test_decode_and_derive_produces_both_outputs(self):
+        """Test the fused path writes the optimized image and thumbnail from one decode."""
+        processor = ImageProcessor(use_vips=False)
+        
+        optimized, thumbnail = processor._decode_and_derive(self.large_image_path, quality=75)
+        
+        self.assertIsNotNone(optimized)
+        self.assertIsNotNone(thumbnail)
+        with Image.open(optimized[0]) as img:
+            self.assertEqual(img.size, (optimized[1], optimized[2]))
+            self.assertLessEqual(max(img.size), processor.MAX_DIMENSION)
+        with Image.open(thumbnail[0]) as thumb:
+            self.assertEqual(thumb.size, (thumbnail[1], thumbnail[2]))
+            self.assertLessEqual(max(thumb.size), max(processor.THUMBNAIL_SIZE))
+        self.assertEqual(processor.stats['images_optimized'], 1)
+        self.assertEqual(processor.stats['thumbnails_generated'], 1)
+    
+    def test_local_metadata_matches_extracted(self):
+        """Test metadata built for our own outputs matches a full extraction."""
+        processor = ImageProcessor()
+        url = "https://example.com/test.jpg"
+        thumb_path, width, height, mode = processor._generate_thumbnail(self.test_image_path)
+        
+        local = processor._local_metadata(thumb_path, url, width, height, mode)
+        extracted = processor.extract_metadata(thumb_path, url)
+        
+        self.assertEqual((local.width, local.height), (extracted.width, extracted.height))
+        self.assertEqual(local.color_mode, extracted.color_mode)
+        self.assertEqual(local.file_size, extracted.file_size)
+        self.assertEqual(local.file_hash, extracted.file_hash)
+        self.assertEqual(local.exif_data, {})
+    
     def test_generate_thumbnail_custom_size(self):
         """Test thumbnail generation with custom size."""
         processor = ImageProcessor()
@@ -501,6 +615,63 @@ class TestImageProcessor(unittest.TestCase):
             self.assertTrue(results[1].success)
             self.assertFalse(results[2].success)
     
+    def test_process_image_reuses_result_for_identical_content(self):
+        """Test a second URL with the same bytes reuses the first result."""
+        processor = ImageProcessor(temp_dir=self.temp_dir)
+        downloads = []
+        
+        async def fake_download(url):
+            path = os.path.join(self.temp_dir, f"download_{len(downloads)}.jpg")
+            shutil.copy(self.large_image_path, path)
+            downloads.append(path)
+            processor.temp_files.append(path)
+            return True, path, None
+        
+        with patch.object(processor, 'download_image', side_effect=fake_download):
+            first = asyncio.run(processor.process_image("https://example.com/a.jpg"))
+            second = asyncio.run(processor.process_image("https://mirror.example.com/a.jpg"))
+            again = asyncio.run(processor.process_image("https://mirror.example.com/a.jpg"))
+        
+        self.assertTrue(second.success)
+        self.assertEqual(len(downloads), 2)  # Repeated URL skips the download
+        self.assertEqual(processor.stats['images_processed'], 1)
+        self.assertEqual(second.original_metadata.url, "https://mirror.example.com/a.jpg")
+        self.assertEqual(second.original_metadata.file_hash, first.original_metadata.file_hash)
+        self.assertEqual(again.optimized_metadata.file_path, first.optimized_metadata.file_path)
+        self.assertFalse(os.path.exists(downloads[1]))
+    
+    def _mock_head_session(self, status, headers):
+        """Build a session mock whose head() yields a response with status/headers."""
+        response = MagicMock(status=status, headers=headers)
+        context = MagicMock()
+        context.__aenter__ = AsyncMock(return_value=response)
+        context.__aexit__ = AsyncMock(return_value=False)
+        session = MagicMock()
+        session.head.return_value = context
+        return session
+    
+    def test_head_precheck_rejects_non_image(self):
+        """Test HEAD precheck rejects non-image content types and oversize bodies."""
+        processor = ImageProcessor()
+        
+        processor.session = self._mock_head_session(200, {'Content-Type': 'text/html; charset=utf-8'})
+        error = asyncio.run(processor._head_precheck("https://example.com/page", 1024))
+        self.assertIn("Not an image", error)
+        
+        processor.session = self._mock_head_session(200, {'Content-Type': 'image/jpeg', 'Content-Length': '4096'})
+        error = asyncio.run(processor._head_precheck("https://example.com/big.jpg", 1024))
+        self.assertIn("File too large", error)
+    
+    def test_head_precheck_falls_through(self):
+        """Test HEAD precheck defers to GET when HEAD is unsupported or inconclusive."""
+        processor = ImageProcessor()
+        
+        processor.session = self._mock_head_session(405, {'Content-Type': 'text/html'})
+        self.assertIsNone(asyncio.run(processor._head_precheck("https://example.com/a.jpg", 1024)))
+        
+        processor.session = self._mock_head_session(200, {'Content-Type': 'image/png', 'Content-Length': '512'})
+        self.assertIsNone(asyncio.run(processor._head_precheck("https://example.com/a.png", 1024)))
+    
     def test_cleanup_temp(self):
         """Test temporary file cleanup."""
         processor = ImageProcessor()
@@ -558,6 +729,60 @@ class TestImageProcessor(unittest.TestCase):
         self.assertEqual(len(processor.temp_files), 0)
         self.assertFalse(os.path.exists(temp_file))
     
+    def test_session_recreated_after_context_exit(self):
+        """Test that re-entering the processor opens a fresh session."""
+        processor = ImageProcessor(temp_dir=self.temp_dir)
+        
+        async def enter_twice():
+            async with processor:
+                first_session = processor.session
+            async with processor:
+                self.assertIsNot(processor.session, first_session)
+                self.assertFalse(processor.session.closed)
+            return first_session
+        
+        first_session = asyncio.run(enter_twice())
+        
+        self.assertTrue(first_session.closed)
+        self.assertTrue(processor.session.closed)
+    
+    def test_context_exit_does_not_block_event_loop(self):
+        """Test that shutting down the CPU pool leaves the event loop running."""
+        processor = ImageProcessor(temp_dir=self.temp_dir)
+        
+        async def exit_with_busy_pool():
+            job = asyncio.ensure_future(processor._run_cpu(time.sleep, 0.3))
+            await asyncio.sleep(0.05)
+            ticks = 0
+            
+            async def tick():
+                nonlocal ticks
+                while not job.done():
+                    ticks += 1
+                    await asyncio.sleep(0.01)
+            
+            await asyncio.gather(processor.__aexit__(None, None, None), tick())
+            return ticks
+        
+        ticks = asyncio.run(exit_with_busy_pool())
+        
+        self.assertGreater(ticks, 5)
+        self.assertIsNone(processor._cpu_pool)
+    
+    def test_worker_counters_are_consistent(self):
+        """Test that counters bumped from worker threads don't lose updates."""
+        processor = ImageProcessor(temp_dir=self.temp_dir)
+        
+        async def bump_concurrently():
+            await asyncio.gather(*(
+                processor._run_cpu(processor._count, 'thumbnails_generated')
+                for _ in range(200)
+            ))
+        
+        asyncio.run(bump_concurrently())
+        
+        self.assertEqual(processor.stats['thumbnails_generated'], 200)
+    
     def test_configuration_constants(self):
         """Test configuration constants."""
         # Test default values
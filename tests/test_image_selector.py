@@ -341,6 +341,21 @@ class TestImageSelector(unittest.TestCase):
         # Indoor scene should be excluded
         self.assertNotIn(self.candidate_low, filtered)
     
+    def test_apply_filters_disabled_keeps_all(self):
+        """Test disabled thresholds skip filtering entirely."""
+        criteria = SelectionCriteria(
+            min_quality_score=0.0,
+            min_relevance_score=0.0,
+            max_cost_per_image=float('inf')
+        )
+        selector = ImageSelector(criteria)
+        candidates = [self.candidate_high, self.candidate_low]
+
+        filtered = selector._apply_filters(candidates, None)
+
+        self.assertEqual(filtered, candidates)
+        self.assertIsNot(filtered, candidates)
+
     def test_calculate_scores(self):
         """Test score calculation for candidates."""
         selector = ImageSelector()
@@ -352,7 +367,23 @@ class TestImageSelector(unittest.TestCase):
         # Should be sorted by score (highest first)
         self.assertGreater(scored[0][1], scored[1][1])
         self.assertEqual(scored[0][0], self.candidate_high)
-    
+
+    def test_calculate_scores_top_k(self):
+        """Test top_k keeps only the highest scored candidates, in order."""
+        selector = ImageSelector()
+        candidates = [self.candidate_medium, self.candidate_high, self.candidate_low]
+
+        full = selector._calculate_scores(candidates, SelectionStrategy.BALANCED, "mountain")
+        top_two = selector._calculate_scores(
+            candidates, SelectionStrategy.BALANCED, "mountain", top_k=2
+        )
+        top_one = selector._calculate_scores(
+            candidates, SelectionStrategy.BALANCED, "mountain", top_k=1
+        )
+
+        self.assertEqual(top_two, full[:2])
+        self.assertEqual(top_one, full[:1])
+
     def test_calculate_candidate_score(self):
         """Test individual candidate score calculation."""
         selector = ImageSelector()
@@ -445,6 +476,33 @@ class TestImageSelector(unittest.TestCase):
             self.candidate_medium in selected or similar_candidate in selected
         )
     
+    def test_select_best_considers_whole_pool_for_diversity(self):
+        """Test that a diverse candidate ranked below count + 5 can be selected."""
+        duplicates = [
+            ImageCandidate(
+                image_url=f"https://example.com/mountain{i}.jpg",
+                source_url="https://example.com/page",
+                title="Mountain",
+                analysis=self.analysis_high,
+                metadata={},
+                search_query="mountain"
+            )
+            for i in range(8)
+        ]
+        scores = [
+            (candidate, 0.90 - i * 0.01) for i, candidate in enumerate(duplicates)
+        ] + [(self.candidate_medium, 0.75)]  # Ranked 9th, beyond count + 5
+        pool = [candidate for candidate, _ in scores]
+        
+        selector = ImageSelector()
+        with patch.object(selector, '_apply_filters', return_value=pool), \
+                patch.object(selector, '_score_candidates', return_value=scores):
+            result = selector.select_best(pool, count=2)
+        
+        # Duplicates of the leader are penalized below the diverse candidate
+        self.assertEqual(result.selected_images, [duplicates[0], self.candidate_medium])
+        self.assertEqual(result.alternatives, duplicates[1:6])
+    
     def test_calculate_diversity_penalty(self):
         """Test diversity penalty calculation."""
         selector = ImageSelector()
@@ -513,6 +571,27 @@ class TestImageSelector(unittest.TestCase):
         self.assertIn('quality', explanation.score_breakdown)
         self.assertGreater(len(explanation.selection_reasons), 0)
     
+    def test_explain_selection_uses_recorded_breakdowns(self):
+        """Test explanations reuse score components recorded by select_best."""
+        selector = ImageSelector()
+        result = selector.select_best(
+            [self.candidate_high, self.candidate_medium], count=1, search_query="mountain"
+        )
+
+        self.assertIn(self.candidate_high.image_url, result.score_breakdowns)
+
+        with patch.object(selector, '_calculate_quality_score') as mock_quality:
+            explanation = selector.explain_selection(result)[0]
+        mock_quality.assert_not_called()
+
+        analysis = self.candidate_high.analysis
+        self.assertAlmostEqual(
+            explanation.score_breakdown['quality'],
+            selector._calculate_quality_score(analysis.quality_metrics)
+        )
+        self.assertEqual(explanation.score_breakdown['relevance'], analysis.relevance_score)
+        self.assertEqual(explanation.score_breakdown['confidence'], analysis.confidence_score)
+
     def test_selection_strategies(self):
         """Test different selection strategies."""
         selector = ImageSelector()
@@ -548,6 +627,36 @@ class TestImageSelector(unittest.TestCase):
         self.assertEqual(cache_size_after_first, cache_size_after_second)
         self.assertEqual(result1.selected_images[0], result2.selected_images[0])
     
+    @patch.dict(os.environ, {'SELECTION_CACHE_MAX': '2'})
+    def test_cache_evicts_least_recently_used(self):
+        """Test selection cache is bounded and evicts the LRU entry."""
+        selector = ImageSelector()
+        candidates = [self.candidate_high, self.candidate_medium]
+
+        selector.select_best(candidates, count=1, search_query="a")
+        selector.select_best(candidates, count=1, search_query="b")
+        # Touch "a" so "b" becomes least recently used
+        selector.select_best(candidates, count=1, search_query="a")
+        selector.select_best(candidates, count=1, search_query="c")
+
+        key_a = selector._get_cache_key(candidates, 1, SelectionStrategy.BALANCED, "a")
+        key_b = selector._get_cache_key(candidates, 1, SelectionStrategy.BALANCED, "b")
+        self.assertEqual(len(selector.selection_cache), 2)
+        self.assertIn(key_a, selector.selection_cache)
+        self.assertNotIn(key_b, selector.selection_cache)
+
+    @patch.dict(os.environ, {'SELECTION_CACHE_MAX': '0'})
+    def test_cache_disabled_skips_cache_key(self):
+        """Test no cache key is computed when caching is disabled."""
+        selector = ImageSelector()
+
+        with patch.object(selector, '_get_cache_key') as mock_key:
+            selector.select_best([self.candidate_high], count=1)
+            selector.select_best([self.candidate_high], count=1)
+
+        mock_key.assert_not_called()
+        self.assertEqual(len(selector.selection_cache), 0)
+
     def test_get_cache_key_consistency(self):
         """Test cache key generation consistency."""
         selector = ImageSelector()
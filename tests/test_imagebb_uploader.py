@@ -205,7 +205,36 @@ class TestImageBBUploader(unittest.TestCase):
         with self.assertRaises(ValueError) as context:
             uploader.validate_base64_image(large_data)
         self.assertIn('too large', str(context.exception))
+        self.assertNotIn('Invalid base64', str(context.exception))
     
+    def test_validate_base64_image_data_uri_without_payload(self):
+        """Test validation fails for a data URI with no comma-separated payload."""
+        uploader = ImageBBUploader()
+        
+        with self.assertRaises(ValueError) as context:
+            uploader.validate_base64_image("data:image/png;base64")
+        self.assertIn('empty', str(context.exception))
+    
+    def test_base64_decoded_size_without_decoding(self):
+        """Test decoded size is computed arithmetically from the encoded length."""
+        uploader = ImageBBUploader()
+
+        for length in range(0, 10):
+            encoded = base64.b64encode(b'x' * length).decode('ascii')
+            self.assertEqual(uploader._base64_decoded_size(encoded), length)
+
+        # Line breaks in wrapped data are not counted
+        wrapped = base64.encodebytes(b'y' * 100).decode('ascii')
+        self.assertEqual(uploader._base64_decoded_size(wrapped), 100)
+
+    def test_base64_decoded_size_rejects_bad_charset(self):
+        """Test characters outside the base64 alphabet are rejected."""
+        uploader = ImageBBUploader()
+
+        for bad in ("abc$", "ab cd===", "ab\u00e9c"):
+            with self.assertRaises(ValueError):
+                uploader._base64_decoded_size(bad)
+
     @patch('imagebb_uploader.requests.Session')
     def test_upload_base64_success(self, mock_session_class):
         """Test successful base64 upload."""
@@ -214,7 +243,7 @@ class TestImageBBUploader(unittest.TestCase):
         mock_session_class.return_value = mock_session
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = self.mock_upload_response
+        mock_response.content = json.dumps(self.mock_upload_response).encode()
         mock_session.post.return_value = mock_response
         
         # Test
@@ -247,7 +276,7 @@ class TestImageBBUploader(unittest.TestCase):
         mock_session_class.return_value = mock_session
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = self.mock_upload_response
+        mock_response.content = json.dumps(self.mock_upload_response).encode()
         mock_session.post.return_value = mock_response
         
         # Test
@@ -282,14 +311,14 @@ class TestImageBBUploader(unittest.TestCase):
         mock_session_class.return_value = mock_session
         mock_response = MagicMock()
         mock_response.status_code = 400
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "status_code": 400,
             "error": {
                 "message": "Invalid API key",
                 "code": 100
             },
             "status_txt": "Bad Request"
-        }
+        }).encode()
         mock_session.post.return_value = mock_response
         
         # Test
@@ -306,12 +335,12 @@ class TestImageBBUploader(unittest.TestCase):
         mock_session_class.return_value = mock_session
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = {
+        mock_response.content = json.dumps({
             "success": False,
             "error": {
                 "message": "File too large"
             }
-        }
+        }).encode()
         mock_session.post.return_value = mock_response
         
         # Test
@@ -320,18 +349,37 @@ class TestImageBBUploader(unittest.TestCase):
             uploader.upload_base64(self.sample_base64)
         self.assertIn('File too large', str(context.exception))
     
+    @patch('imagebb_uploader.requests.Session')
+    def test_upload_base64_malformed_success_response(self, mock_session_class):
+        """Test that a success response missing required fields fails the upload."""
+        mock_session = MagicMock()
+        mock_session_class.return_value = mock_session
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        response = json.loads(json.dumps(self.mock_upload_response))
+        response['data']['width'] = None
+        mock_response.content = json.dumps(response).encode()
+        mock_session.post.return_value = mock_response
+        
+        # Test
+        uploader = ImageBBUploader()
+        with self.assertRaises(Exception) as context:
+            uploader.upload_base64(self.sample_base64)
+        self.assertIn('malformed response', str(context.exception))
+        self.assertEqual(uploader.upload_stats['failed_uploads'], 1)
+        self.assertEqual(uploader.upload_stats['successful_uploads'], 0)
+    
     @patch('imagebb_uploader.open', mock_open(read_data=b'test_image_data'))
-    @patch('imagebb_uploader.os.path.exists', return_value=True)
-    @patch('imagebb_uploader.os.path.getsize', return_value=1000)
+    @patch('imagebb_uploader.os.stat', return_value=os.stat_result((0,) * 6 + (1000,) + (0,) * 3))
     @patch('imagebb_uploader.requests.Session')
-    def test_upload_file_success(self, mock_session_class, mock_getsize, mock_exists):
+    def test_upload_file_success(self, mock_session_class, mock_stat):
         """Test successful file upload."""
         # Setup mock
         mock_session = MagicMock()
         mock_session_class.return_value = mock_session
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = self.mock_upload_response
+        mock_response.content = json.dumps(self.mock_upload_response).encode()
         mock_session.post.return_value = mock_response
         
         # Test
@@ -343,6 +391,49 @@ class TestImageBBUploader(unittest.TestCase):
         self.assertEqual(result.id, "2ndCYJK")
         mock_session.post.assert_called_once()
     
+    @patch('imagebb_uploader.requests.Session')
+    def test_upload_file_sends_multipart_binary(self, mock_session_class):
+        """Test file uploads send the raw bytes as multipart, not base64."""
+        mock_session = MagicMock()
+        mock_session_class.return_value = mock_session
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.content = json.dumps(self.mock_upload_response).encode()
+        mock_session.post.return_value = mock_response
+
+        with tempfile.NamedTemporaryFile(suffix='.png', delete=False) as temp_file:
+            temp_file.write(self.sample_image_data)
+            temp_path = temp_file.name
+
+        try:
+            uploader = ImageBBUploader()
+            with patch.object(uploader, 'validate_base64_image') as mock_validate:
+                uploader.upload_file(temp_path)
+            mock_validate.assert_not_called()
+        finally:
+            os.unlink(temp_path)
+
+        call_kwargs = mock_session.post.call_args[1]
+        self.assertNotIn('image', call_kwargs['data'])
+        self.assertEqual(call_kwargs['data']['name'], os.path.splitext(os.path.basename(temp_path))[0])
+        filename, raw, mime_type = call_kwargs['files']['image']
+        self.assertEqual(filename, os.path.basename(temp_path))
+        self.assertEqual(raw, self.sample_image_data)
+        self.assertEqual(mime_type, 'image/png')
+
+    def test_upload_bytes_validation(self):
+        """Test upload_bytes rejects empty and oversized data."""
+        uploader = ImageBBUploader()
+
+        with self.assertRaises(ValueError) as context:
+            uploader.upload_bytes(b'')
+        self.assertIn('empty', str(context.exception))
+
+        with patch.object(ImageBBUploader, 'MAX_FILE_SIZE', 10):
+            with self.assertRaises(ValueError) as context:
+                uploader.upload_bytes(b'0' * 11)
+        self.assertIn('too large', str(context.exception))
+
     @patch('imagebb_uploader.requests.Session')
     def test_upload_url_success(self, mock_session_class):
         """Test successful URL upload."""
@@ -351,7 +442,7 @@ class TestImageBBUploader(unittest.TestCase):
         mock_session_class.return_value = mock_session
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.json.return_value = self.mock_upload_response
+        mock_response.content = json.dumps(self.mock_upload_response).encode()
         mock_session.post.return_value = mock_response
         
         # Test
@@ -368,6 +459,24 @@ class TestImageBBUploader(unittest.TestCase):
         self.assertEqual(posted_data['image'], "https://example.com/image.jpg")
         self.assertEqual(posted_data['name'], "test_url")
     
+    @patch('imagebb_uploader.requests.Session')
+    def test_upload_url_api_error(self, mock_session_class):
+        """Test URL upload reports API errors like base64 upload and tracks them."""
+        mock_session = MagicMock()
+        mock_session_class.return_value = mock_session
+        mock_response = MagicMock()
+        mock_response.status_code = 400
+        mock_response.content = json.dumps({"error": {"message": "Invalid URL"}}).encode()
+        mock_session.post.return_value = mock_response
+
+        uploader = ImageBBUploader()
+        with self.assertRaises(Exception) as context:
+            uploader.upload_url("https://example.com/missing.jpg")
+
+        self.assertIn('Invalid URL', str(context.exception))
+        self.assertEqual(uploader.get_upload_stats()['failed_uploads'], 1)
+        mock_response.json.assert_not_called()
+
     @patch('imagebb_uploader.requests.Session')
     def test_delete_image_success(self, mock_session_class):
         """Test successful image deletion."""
@@ -376,7 +485,7 @@ class TestImageBBUploader(unittest.TestCase):
         mock_session_class.return_value = mock_session
         mock_response = MagicMock()
         mock_response.status_code = 200
-        mock_response.text = "Image has been deleted successfully"
+        mock_response.raw.read.return_value = b"Image has been Deleted successfully"
         mock_session.get.return_value = mock_response
         
         # Test
@@ -385,7 +494,11 @@ class TestImageBBUploader(unittest.TestCase):
         
         # Assertions
         self.assertTrue(result)
-        mock_session.get.assert_called_once_with("https://ibb.co/delete/test-key", timeout=30)
+        mock_session.get.assert_called_once_with(
+            "https://ibb.co/delete/test-key", timeout=30, stream=True
+        )
+        mock_response.raw.read.assert_called_once_with(8192, decode_content=True)
+        mock_response.close.assert_called_once()
     
     @patch('imagebb_uploader.requests.Session')
     def test_delete_image_failure(self, mock_session_class):
@@ -473,6 +586,20 @@ class TestImageBBUploader(unittest.TestCase):
         self.assertTrue(result.success)
         self.assertEqual(result.mime_type, "image/jpeg")
     
+    def test_parse_upload_response_missing_required_field(self):
+        """Test that a response without a required field is not silently defaulted."""
+        uploader = ImageBBUploader()
+        response = json.loads(json.dumps(self.mock_upload_response))
+        del response['data']['width']
+        del response['data']['thumb']
+        
+        with self.assertRaises(KeyError):
+            uploader._parse_upload_response(response, 1.5)
+        
+        response['data']['width'] = "1280"
+        result = uploader._parse_upload_response(response, 1.5)
+        self.assertEqual(result.thumbnail_url, "")
+    
     def test_upload_statistics_tracking(self):
         """Test upload statistics tracking."""
         uploader = ImageBBUploader()
@@ -504,22 +631,39 @@ class TestImageBBUploader(unittest.TestCase):
         self.assertEqual(stats['average_upload_time'], 2.0)
         self.assertEqual(stats['average_file_size'], 1000)
     
-    @patch('imagebb_uploader.time.sleep')
+    @patch('rate_limiter.time.sleep')
     def test_rate_limiting(self, mock_sleep):
         """Test rate limiting enforcement."""
-        uploader = ImageBBUploader()
-        uploader.rate_limit = 2  # Set low limit for testing
-        
-        # Add requests to simulate hitting rate limit
         current_time = 1000.0
-        with patch('imagebb_uploader.time.time', return_value=current_time):
-            uploader.requests_per_minute = [current_time - 30, current_time - 20]
-            uploader._enforce_rate_limit()
-            
+        with patch.dict(os.environ, {'IMAGEBB_RATE_LIMIT': '2'}), \
+             patch('rate_limiter.time.monotonic', return_value=current_time):
+            uploader = ImageBBUploader()
+
+            # The bucket starts full: two requests pass without waiting
+            uploader._rate_limiter.wait()
+            uploader._rate_limiter.wait()
+            mock_sleep.assert_not_called()
+
             # Should sleep since we're at the limit
+            uploader._rate_limiter.wait()
             mock_sleep.assert_called_once()
             sleep_time = mock_sleep.call_args[0][0]
-            self.assertGreater(sleep_time, 0)
+            self.assertAlmostEqual(sleep_time, 30.0)
+
+    @patch('rate_limiter.time.sleep')
+    def test_rate_limiting_refills_over_time(self, mock_sleep):
+        """Test tokens refill at rate_limit per minute."""
+        with patch.dict(os.environ, {'IMAGEBB_RATE_LIMIT': '2'}), \
+             patch('rate_limiter.time.monotonic') as mock_monotonic:
+            mock_monotonic.return_value = 1000.0
+            uploader = ImageBBUploader()
+            uploader._rate_limiter.wait()
+            uploader._rate_limiter.wait()
+
+            # 30 seconds later one token has accrued
+            mock_monotonic.return_value = 1030.0
+            uploader._rate_limiter.wait()
+            mock_sleep.assert_not_called()
     
     def test_supported_formats(self):
         """Test that all expected formats are supported."""
@@ -7,20 +7,25 @@ import os
 import sys
 import unittest
 import asyncio
+import json
 from unittest.mock import patch, MagicMock, AsyncMock, call
 from dataclasses import asdict
 from datetime import datetime
 from pathlib import Path
 import tempfile
+import shutil
+import time
+import threading
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from imagefox import (
-    ImageFox, SearchRequest, ImageResult, WorkflowResult
+    ImageFox, SearchRequest, ImageResult, WorkflowResult, _image_dedupe_key
 )
 from vision_analyzer import ImageMetadata, ComprehensiveAnalysis
-from image_selector import ImageCandidate, SelectionResult
+from imagebb_uploader import UploadResult
+from image_selector import ImageCandidate, SelectionResult, SelectionCriteria
 
 
 class TestSearchRequest(unittest.TestCase):
@@ -37,6 +42,7 @@ class TestSearchRequest(unittest.TestCase):
         self.assertTrue(request.enable_processing)
         self.assertTrue(request.enable_upload)
         self.assertTrue(request.enable_storage)
+        self.assertFalse(request.include_stats)
     
     def test_search_request_custom_values(self):
         """Test SearchRequest with custom values."""
@@ -122,6 +128,567 @@ class TestWorkflowResult(unittest.TestCase):
         self.assertEqual(result.total_cost, 0.05)
 
 
+class _PatchedImageFoxTestCase(unittest.TestCase):
+    """Base class for tests that need an ImageFox with all components mocked."""
+    
+    # Environment variables set while the test runs, before ImageFox is created
+    ENV = {}
+    
+    def setUp(self):
+        """Set up an ImageFox with mocked components."""
+        self.original_env = os.environ.copy()
+        os.environ.update(self.env_overrides())
+        self.patches = [
+            patch(f'imagefox.{name}') for name in (
+                'ApifyClient', 'OpenRouterClient', 'VisionAnalyzer', 'ImageSelector',
+                'ProxyImageProcessor', 'AirtableUploader', 'ImageBBUploader'
+            )
+        ]
+        for p in self.patches:
+            p.start()
+        self.imagefox = ImageFox()
+    
+    def tearDown(self):
+        """Stop all patches and restore the environment."""
+        for p in self.patches:
+            p.stop()
+        os.environ.clear()
+        os.environ.update(self.original_env)
+    
+    def env_overrides(self):
+        """Return the environment variables to set for this test."""
+        return self.ENV
+
+
+class TestCallClient(_PatchedImageFoxTestCase):
+    """Test cases for client calls run off the event loop."""
+    
+    def test_runs_call_in_worker_thread(self):
+        """Test that the call runs once, outside the event loop thread."""
+        loop_thread = []
+        
+        def func(*args, **kwargs):
+            return threading.get_ident()
+        
+        async def run():
+            loop_thread.append(threading.get_ident())
+            return await self.imagefox._call_client(func, 1, key="v")
+        
+        worker_thread = asyncio.run(run())
+        
+        self.assertNotEqual(worker_thread, loop_thread[0])
+    
+    def test_failure_not_retried(self):
+        """Test that failures propagate; retries belong to the clients' HTTP sessions."""
+        func = MagicMock(side_effect=Exception("Rate limit exceeded"))
+        
+        with self.assertRaises(Exception):
+            asyncio.run(self.imagefox._call_client(func))
+        self.assertEqual(func.call_count, 1)
+
+
+class TestAnalysisCache(_PatchedImageFoxTestCase):
+    """Test cases for the vision analysis cache."""
+    
+    ENV = {
+        'ANALYSIS_CACHE_SIZE': '2',
+        'ANALYSIS_EARLY_STOP_FACTOR': '0',
+        'ANALYSIS_JITTER_SECONDS': '0'
+    }
+    
+    def setUp(self):
+        """Set up an ImageFox with mocked components."""
+        super().setUp()
+        self.imagefox.image_processor.download_image = AsyncMock(
+            return_value=(True, None, None)
+        )
+        self.imagefox.vision_analyzer.analyze_image.side_effect = (
+            lambda path, search_query=None: MagicMock(name='analysis')
+        )
+    
+    def _analyze(self, urls, query="test"):
+        search_results = [{'image_url': url, 'title': url} for url in urls]
+        return asyncio.run(
+            self.imagefox._analyze_images(search_results, SearchRequest(query=query), [])
+        )
+    
+    def test_repeat_image_skips_download_and_analysis(self):
+        """Test that a cached image is neither downloaded nor re-analyzed."""
+        first = self._analyze(["https://example.com/a.jpg"])
+        second = self._analyze(["https://example.com/a.jpg"])
+        
+        self.assertIs(first[0].analysis, second[0].analysis)
+        self.assertEqual(self.imagefox.image_processor.download_image.call_count, 1)
+        self.assertEqual(self.imagefox.vision_analyzer.analyze_image.call_count, 1)
+        self.assertEqual(self.imagefox.stats['analysis_cache_hits'], 1)
+        self.assertEqual(self.imagefox.stats['analysis_cache_misses'], 1)
+    
+    def test_cache_is_per_query_and_bounded(self):
+        """Test that the key includes the query and old entries are evicted."""
+        self._analyze(["https://example.com/a.jpg"], query="one")
+        self._analyze(["https://example.com/a.jpg"], query="two")
+        self._analyze(["https://example.com/b.jpg"], query="one")
+        
+        self.assertEqual(self.imagefox.vision_analyzer.analyze_image.call_count, 3)
+        self.assertEqual(len(self.imagefox._analysis_cache), 2)
+        self.assertNotIn(("https://example.com/a.jpg", "one"), self.imagefox._analysis_cache)
+    
+    @patch('imagefox.random.uniform', return_value=0.0)
+    def test_jitter_only_before_uncached_analysis(self, mock_uniform):
+        """Test that the start jitter is applied to cache misses only."""
+        self.imagefox.analysis_jitter = 0.2
+        self._analyze(["https://example.com/a.jpg", "https://example.com/b.jpg"])
+        self._analyze(["https://example.com/a.jpg"])
+        
+        self.assertEqual(mock_uniform.call_count, 2)
+        mock_uniform.assert_called_with(0, self.imagefox.analysis_jitter)
+    
+    def test_jitter_disabled_by_default(self):
+        """Test that no start jitter is applied unless configured."""
+        os.environ.pop('ANALYSIS_JITTER_SECONDS')
+        
+        self.assertEqual(ImageFox().analysis_jitter, 0)
+    
+    def test_disabled_caching(self):
+        """Test that ENABLE_CACHING=false turns the cache off."""
+        os.environ['ENABLE_CACHING'] = 'false'
+        imagefox = ImageFox()
+        
+        self.assertEqual(imagefox._analysis_cache_max, 0)
+        self.assertIsNone(imagefox._get_cached_analysis("https://example.com/a.jpg", "test"))
+        self.assertEqual(imagefox.stats['analysis_cache_misses'], 0)
+
+
+class TestAnalysisEarlyStop(_PatchedImageFoxTestCase):
+    """Test cases for stopping analysis once enough candidates pass."""
+    
+    ENV = {
+        'ANALYSIS_EARLY_STOP_FACTOR': '2',
+        'ENABLE_CACHING': 'false',
+        'ANALYSIS_JITTER_SECONDS': '0'
+    }
+    
+    def setUp(self):
+        """Set up an ImageFox whose later downloads never finish."""
+        super().setUp()
+        self.imagefox.max_concurrent = 10
+        self.imagefox.image_selector.criteria = SelectionCriteria()
+        
+        self.cancelled = []
+        
+        async def download(url):
+            index = int(url.rsplit('/', 1)[1])
+            if index >= 4:
+                try:
+                    await asyncio.sleep(60)
+                except asyncio.CancelledError:
+                    self.cancelled.append(index)
+                    raise
+            return True, None, None
+        
+        def analyze(path, search_query=None):
+            return MagicMock(
+                quality_metrics=MagicMock(overall_score=0.9),
+                relevance_score=0.9
+            )
+        
+        self.imagefox.image_processor.download_image = AsyncMock(side_effect=download)
+        self.imagefox.vision_analyzer.analyze_image.side_effect = analyze
+    
+    def test_stops_and_cancels_outstanding(self):
+        """Test that outstanding analyses are cancelled once enough pass."""
+        search_results = [{'image_url': f"https://example.com/{i}"} for i in range(8)]
+        request = SearchRequest(query="test", max_results=2)
+        
+        candidates = asyncio.run(
+            asyncio.wait_for(self.imagefox._analyze_images(search_results, request, []), 5)
+        )
+        
+        self.assertEqual(len(candidates), 4)
+        self.assertEqual(
+            [c.image_url for c in candidates],
+            [f"https://example.com/{i}" for i in range(4)]
+        )
+        self.assertEqual(sorted(self.cancelled), [4, 5, 6, 7])
+
+
+class TestStoreMetadata(_PatchedImageFoxTestCase):
+    """Test cases for chunked Airtable storage."""
+    
+    def setUp(self):
+        """Set up an ImageFox with mocked components."""
+        super().setUp()
+        self.images = [
+            ImageResult(url=f"https://example.com/{i}.jpg", source_url="", title="",
+                        dimensions="", analysis={}, selection_score=0.0)
+            for i in range(23)
+        ]
+    
+    def _store(self, errors):
+        return asyncio.run(
+            self.imagefox._store_metadata(self.images, SearchRequest(query="test"), errors)
+        )
+    
+    def test_records_sent_in_chunks_of_ten(self):
+        """Test that more than ten records are split across requests."""
+        self.imagefox.airtable_uploader.batch_create.side_effect = (
+            lambda records: [{'id': f"rec-{r['Image URL']}"} for r in records]
+        )
+        errors = []
+        
+        self._store(errors)
+        
+        sizes = [len(c.args[0]) for c in self.imagefox.airtable_uploader.batch_create.call_args_list]
+        self.assertEqual(sorted(sizes), [3, 10, 10])
+        self.assertEqual(errors, [])
+        for image in self.images:
+            self.assertEqual(image.airtable_id, f"rec-{image.url}")
+    
+    def test_analysis_stored_as_json(self):
+        """Test that analyses are stored as JSON, shedding raw responses when too long."""
+        self.imagefox.airtable_uploader.batch_create.side_effect = (
+            lambda records: [{'id': 'rec'} for _ in records]
+        )
+        self.images = self.images[:2]
+        self.images[0].analysis = {'quality_score': 0.9, 'objects': ['cat']}
+        self.images[1].analysis = {
+            'quality_score': 0.8,
+            'raw_model_responses': [{'content': 'x' * ImageFox.AIRTABLE_ANALYSIS_LIMIT}]
+        }
+        
+        self._store([])
+        
+        records = self.imagefox.airtable_uploader.batch_create.call_args.args[0]
+        self.assertEqual(
+            json.loads(records[0]['Analysis Results']),
+            {'quality_score': 0.9, 'objects': ['cat']}
+        )
+        self.assertEqual(
+            json.loads(records[1]['Analysis Results']),
+            {'quality_score': 0.8, 'raw_model_responses': None}
+        )
+    
+    def test_failed_chunk_keeps_other_ids(self):
+        """Test that one failed chunk is reported without losing the others."""
+        def batch_create(records):
+            if records[0]['Image URL'] == self.images[10].url:
+                raise ValueError("Field Title must be set")
+            return [{'id': 'rec'} for _ in records]
+        
+        self.imagefox.airtable_uploader.batch_create.side_effect = batch_create
+        errors = []
+        
+        self._store(errors)
+        
+        self.assertEqual(len(errors), 1)
+        self.assertEqual([i.airtable_id for i in self.images[:10]], ['rec'] * 10)
+        self.assertTrue(all(i.airtable_id is None for i in self.images[10:20]))
+        self.assertEqual([i.airtable_id for i in self.images[20:]], ['rec'] * 3)
+
+
+class TestUploadImages(_PatchedImageFoxTestCase):
+    """Test cases for ImageBB uploads of processed images."""
+    
+    def test_upload_sets_cdn_url_from_upload_result(self):
+        """Test that the UploadResult URL is recorded on the image."""
+        upload_result = UploadResult(
+            id="abc", title="test", url_viewer="https://ibb.co/abc",
+            url="https://i.ibb.co/abc/test.jpg", display_url="https://i.ibb.co/abc/test.jpg",
+            width=1, height=1, size=10, time="0", expiration="0",
+            filename="test.jpg", mime_type="image/jpeg",
+            delete_url="https://ibb.co/abc/delete", thumbnail_url="", medium_url="",
+            success=True, upload_time=0.1
+        )
+        self.imagefox.imagebb_uploader.upload_file.return_value = upload_result
+        
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as temp_file:
+            image = ImageResult(
+                url="https://example.com/test.jpg", source_url="", title="",
+                dimensions="", analysis={}, selection_score=0.0,
+                processed_path=temp_file.name
+            )
+            errors = []
+            asyncio.run(self.imagefox._upload_images([image], errors))
+        
+        self.assertEqual(image.imagebb_url, "https://i.ibb.co/abc/test.jpg")
+        self.assertEqual(errors, [])
+        self.imagefox.imagebb_uploader.upload_file.assert_called_once_with(temp_file.name)
+
+
+class TestSelectImages(_PatchedImageFoxTestCase):
+    """Test cases for AI-assisted image selection."""
+    
+    def test_selection_runs_off_event_loop(self):
+        """Test that the blocking selector call runs in a worker thread."""
+        threads = []
+        
+        def select(**kwargs):
+            threads.append(threading.get_ident())
+            return MagicMock(selected_images=[])
+        
+        self.imagefox.image_selector.select_with_ai_reasoning.side_effect = select
+        
+        async def run():
+            threads.append(threading.get_ident())
+            return await self.imagefox._select_images([], SearchRequest(query="test"), [])
+        
+        selected = asyncio.run(run())
+        
+        self.assertEqual(selected, [])
+        self.assertEqual(len(threads), 2)
+        self.assertNotEqual(threads[0], threads[1])
+
+
+class TestTempCleanup(_PatchedImageFoxTestCase):
+    """Test cases for temp file cleanup."""
+    
+    def setUp(self):
+        """Set up an ImageFox with mocked components and its own temp dir."""
+        self.temp_root = tempfile.mkdtemp()
+        super().setUp()
+    
+    def tearDown(self):
+        """Stop all patches and remove the temp dir."""
+        super().tearDown()
+        shutil.rmtree(self.temp_root, ignore_errors=True)
+    
+    def env_overrides(self):
+        """Point ImageFox at this test's temp dir."""
+        return {'IMAGEFOX_TEMP_DIR': self.temp_root, 'ENABLE_CLEANUP': 'true'}
+    
+    def test_removes_old_files_and_empty_dirs(self):
+        """Test that stale files and empty directories are removed."""
+        temp_dir = self.imagefox.temp_dir
+        old_file = temp_dir / 'old.jpg'
+        new_file = temp_dir / 'new.jpg'
+        old_file.write_bytes(b'x')
+        new_file.write_bytes(b'x')
+        two_hours_ago = time.time() - 7200
+        os.utime(old_file, (two_hours_ago, two_hours_ago))
+        (temp_dir / 'empty').mkdir()
+        (temp_dir / 'full').mkdir()
+        (temp_dir / 'full' / 'keep.jpg').write_bytes(b'x')
+        
+        asyncio.run(self.imagefox._cleanup_temp_files())
+        
+        self.assertFalse(old_file.exists())
+        self.assertTrue(new_file.exists())
+        self.assertFalse((temp_dir / 'empty').exists())
+        self.assertTrue((temp_dir / 'full').exists())
+    
+    def test_batch_cleans_up_once(self):
+        """Test that a batch skips per-workflow cleanup and cleans up at the end."""
+        requests = [SearchRequest(query=f"q{i}") for i in range(4)]
+        with patch.object(self.imagefox, '_search_images', AsyncMock(return_value=[])), \
+                patch.object(self.imagefox, '_cleanup_temp_files', AsyncMock()) as mock_cleanup:
+            results = asyncio.run(self.imagefox.process_batch(requests))
+            self.assertEqual(len(results), 4)
+            mock_cleanup.assert_awaited_once()
+            
+            # Outside a batch every workflow cleans up
+            asyncio.run(self.imagefox.search_and_select(requests[0]))
+            self.assertEqual(mock_cleanup.await_count, 2)
+
+
+class TestTimeouts(_PatchedImageFoxTestCase):
+    """Test cases for workflow and image analysis timeouts."""
+    
+    ENV = {'ENABLE_CLEANUP': 'false', 'ANALYSIS_JITTER_SECONDS': '0'}
+    
+    def test_batch_workflow_timeout_returns_empty_result(self):
+        """Test that a hung workflow doesn't hold up the rest of the batch."""
+        self.imagefox.workflow_timeout = 0.05
+        
+        async def search(request, errors):
+            if request.query == "hung":
+                await asyncio.sleep(10)
+            return []
+        
+        requests = [SearchRequest(query="hung"), SearchRequest(query="ok")]
+        with patch.object(self.imagefox, '_search_images', side_effect=search):
+            start = time.monotonic()
+            results = asyncio.run(self.imagefox.process_batch(requests))
+        
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual([r.search_query for r in results], ["hung", "ok"])
+        self.assertEqual(results[0].errors, ["Workflow timed out after 0.05s"])
+        self.assertEqual(results[1].errors, [])
+    
+    def test_batch_failure_cancels_remaining_workflows(self):
+        """Test that an unexpected workflow failure cancels its siblings."""
+        cancelled = []
+        
+        async def search_and_select(request):
+            if request.query == "broken":
+                raise RuntimeError("boom")
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(request.query)
+                raise
+        
+        requests = [SearchRequest(query="slow"), SearchRequest(query="broken")]
+        with patch.object(self.imagefox, 'search_and_select', side_effect=search_and_select):
+            with self.assertRaises(RuntimeError):
+                asyncio.run(self.imagefox.process_batch(requests))
+        
+        self.assertEqual(cancelled, ["slow"])
+    
+    def test_image_analysis_timeout_skips_image(self):
+        """Test that an image whose download hangs is dropped from the candidates."""
+        self.imagefox.image_analysis_timeout = 0.05
+        self.imagefox.early_stop_factor = 0
+        
+        async def download(url):
+            if url == "https://example.com/hung.jpg":
+                await asyncio.sleep(10)
+            return True, None, None
+        
+        self.imagefox.image_processor.download_image = AsyncMock(side_effect=download)
+        search_results = [
+            {'image_url': "https://example.com/hung.jpg"},
+            {'image_url': "https://example.com/ok.jpg"},
+        ]
+        errors = []
+        
+        candidates = asyncio.run(self.imagefox._analyze_images(
+            search_results, SearchRequest(query="test"), errors
+        ))
+        
+        self.assertEqual([c.image_url for c in candidates], ["https://example.com/ok.jpg"])
+        self.assertEqual(errors, [])
+
+
+class TestWorkflowStatistics(_PatchedImageFoxTestCase):
+    """Test cases for opt-in workflow statistics."""
+    
+    ENV = {'ENABLE_CLEANUP': 'false'}
+    
+    def setUp(self):
+        """Set up an ImageFox with stubbed search, analysis and selection."""
+        super().setUp()
+        self.imagefox._search_images = AsyncMock(return_value=[{'image_url': 'u'}])
+        self.imagefox._analyze_images = AsyncMock(return_value=[MagicMock()])
+        self.imagefox._select_images = AsyncMock(return_value=[MagicMock()])
+        self.imagefox.apify_client.get_usage_stats.return_value = {'requests': 1}
+    
+    def _run(self, **kwargs):
+        request = SearchRequest(
+            query="test", enable_processing=False, enable_upload=False,
+            enable_storage=False, **kwargs
+        )
+        return asyncio.run(self.imagefox.search_and_select(request))
+    
+    def test_statistics_skipped_by_default(self):
+        """Test that component statistics are not collected unless requested."""
+        result = self._run()
+        
+        self.assertEqual(result.statistics, {})
+        self.imagefox.apify_client.get_usage_stats.assert_not_called()
+    
+    def test_statistics_included_on_request(self):
+        """Test that include_stats collects component statistics."""
+        result = self._run(include_stats=True)
+        
+        self.assertEqual(result.statistics['apify'], {'requests': 1})
+        self.assertIn('analysis_cache', result.statistics)
+
+
+class TestSearchDedupe(_PatchedImageFoxTestCase):
+    """Test cases for search result de-duplication."""
+    
+    def test_dedupe_key_ignores_variants(self):
+        """Test that scheme, www and resize parameters don't change the key."""
+        base = _image_dedupe_key("https://cdn.example.com/img/cat.jpg")
+        
+        self.assertEqual(base, _image_dedupe_key("http://CDN.example.com/img/cat.jpg"))
+        self.assertEqual(base, _image_dedupe_key("https://www.cdn.example.com/img/cat.jpg"))
+        self.assertNotEqual(base, _image_dedupe_key("https://cdn.example.com/img/dog.jpg"))
+        self.assertEqual(
+            _image_dedupe_key("https://images.unsplash.com/photo-1?w=300&q=80"),
+            _image_dedupe_key("https://images.unsplash.com/photo-1?w=1200&fm=webp")
+        )
+        self.assertEqual(
+            _image_dedupe_key("https://shop.imgix.net/cat.jpg?w=300"),
+            _image_dedupe_key("https://shop.imgix.net/cat.jpg")
+        )
+    
+    def test_dedupe_key_keeps_identifying_params(self):
+        """Test that query parameters are kept on hosts that aren't known CDNs."""
+        for param in ('id', 'v', 'q', 'size', 'format'):
+            self.assertNotEqual(
+                _image_dedupe_key(f"https://example.com/image?{param}=1"),
+                _image_dedupe_key(f"https://example.com/image?{param}=2")
+            )
+    
+    def test_keeps_highest_resolution_in_first_position(self):
+        """Test that duplicates collapse to their largest variant."""
+        results = [
+            {'image_url': "https://images.unsplash.com/a.jpg?w=200", 'width': 200, 'height': 100},
+            {'image_url': "https://example.com/b.jpg", 'width': 800, 'height': 600},
+            {'image_url': "http://images.unsplash.com/a.jpg", 'width': 2000, 'height': 1000},
+            {'image_url': "https://images.unsplash.com/a.jpg?w=50", 'width': 50, 'height': 25},
+        ]
+        
+        deduped = self.imagefox._dedupe_search_results(results)
+        
+        self.assertEqual(
+            [r['image_url'] for r in deduped],
+            ["http://images.unsplash.com/a.jpg", "https://example.com/b.jpg"]
+        )
+
+
+class TestProcessorSession(_PatchedImageFoxTestCase):
+    """Test cases for the shared image processor session."""
+    
+    def setUp(self):
+        """Set up an ImageFox whose processor session is tracked."""
+        super().setUp()
+        
+        processor = self.imagefox.image_processor
+        processor.session = None
+        
+        async def open_session():
+            processor.session = MagicMock(closed=False)
+            return processor
+        
+        processor.__aenter__ = AsyncMock(side_effect=open_session)
+        processor.__aexit__ = AsyncMock()
+        processor.process_image = AsyncMock(
+            return_value=MagicMock(success=True, file_path=None, thumbnail_path=None)
+        )
+    
+    def test_session_reused_across_workflows(self):
+        """Test that repeated and concurrent processing share one session."""
+        images = [
+            ImageResult(url=f"https://example.com/{i}.jpg", source_url="", title="",
+                        dimensions="", analysis={}, selection_score=0.0)
+            for i in range(3)
+        ]
+        
+        async def run():
+            await asyncio.gather(
+                self.imagefox._process_images(images[:2], []),
+                self.imagefox._process_images(images[2:], [])
+            )
+            await self.imagefox._process_images(images, [])
+        
+        asyncio.run(run())
+        
+        processor = self.imagefox.image_processor
+        processor.__aenter__.assert_awaited_once()
+        processor.__aexit__.assert_not_awaited()
+        self.assertEqual(processor.process_image.await_count, 6)
+    
+    def test_session_reopened_after_close(self):
+        """Test that a closed session is replaced on next use."""
+        asyncio.run(self.imagefox._open_processor_session())
+        self.imagefox.image_processor.session.closed = True
+        asyncio.run(self.imagefox._open_processor_session())
+        
+        self.assertEqual(self.imagefox.image_processor.__aenter__.await_count, 2)
+
+
 class TestImageFox(unittest.TestCase):
     """Test cases for ImageFox orchestration class."""
     
@@ -247,7 +814,7 @@ class TestImageFox(unittest.TestCase):
         self.airtable_instance.validate_connection.return_value = True
         
         imagefox = ImageFox()
-        results = imagefox.validate_configuration()
+        results = asyncio.run(imagefox.validate_configuration())
         
         self.assertIn('apify', results)
         self.assertIn('openrouter', results)
@@ -269,7 +836,7 @@ class TestImageFox(unittest.TestCase):
         self.airtable_instance.validate_connection.return_value = False
         
         imagefox = ImageFox()
-        results = imagefox.validate_configuration()
+        results = asyncio.run(imagefox.validate_configuration())
         
         self.assertFalse(results['apify'])
         self.assertFalse(results['openrouter'])
@@ -411,18 +978,14 @@ class TestImageFox(unittest.TestCase):
     
     async def test_process_images_success(self):
         """Test successful image processing."""
-        # Mock processor context manager
-        processor_context = AsyncMock()
-        self.processor_instance.__aenter__.return_value = processor_context
-        self.processor_instance.__aexit__.return_value = None
-        
-        # Mock processing result
+        # Mock processing result (the processor's session is kept open
+        # across workflows, so it is used directly rather than as a context)
         mock_result = MagicMock()
         mock_result.success = True
         mock_result.file_path = "/tmp/processed.jpg"
         mock_result.thumbnail_path = "/tmp/thumb.jpg"
         
-        processor_context.process_image.return_value = mock_result
+        self.processor_instance.process_image = AsyncMock(return_value=mock_result)
         
         images = [ImageResult(
             url='https://example.com/image1.jpg',
@@ -446,9 +1009,9 @@ class TestImageFox(unittest.TestCase):
     async def test_upload_images_success(self):
         """Test successful image upload."""
         # Mock successful upload
-        self.imagebb_instance.upload_file.return_value = {
-            'url': 'https://i.ibb.co/test.jpg'
-        }
+        self.imagebb_instance.upload_file.return_value = MagicMock(
+            url='https://i.ibb.co/test.jpg'
+        )
         
         # Create test file
         with tempfile.NamedTemporaryFile(delete=False) as temp_file:
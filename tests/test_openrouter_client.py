@@ -5,8 +5,9 @@ Unit tests for OpenRouter client module.
 
 import os
 import sys
+import asyncio
 import unittest
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock, AsyncMock, mock_open
 import json
 import tempfile
 import requests
@@ -15,7 +16,7 @@ import requests
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from openrouter_client import (
-    OpenRouterClient, ModelCapability, ModelInfo, AnalysisResult
+    OpenRouterClient, ModelCapability, ModelInfo, AnalysisResult, RateLimitError
 )
 from dataclasses import asdict
 
@@ -409,6 +410,70 @@ class TestOpenRouterClient(unittest.TestCase):
         self.assertIsInstance(result, AnalysisResult)
         self.assertEqual(mock_session.post.call_count, 2)
     
+    def test_analyze_image_with_prompt_async_uses_shared_client(self):
+        """Test async custom-prompt analysis posts through the given client."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = self.mock_analysis_response
+        http_client = MagicMock()
+        http_client.post = AsyncMock(return_value=mock_response)
+
+        # Test
+        client = OpenRouterClient()
+        data_url = client.encode_image_bytes(self.sample_image_data, 'image/png')
+        content = asyncio.run(client.analyze_image_with_prompt_async(
+            http_client,
+            data_url,
+            "Rate this image",
+            model="google/gemini-2.0-flash-lite-001"
+        ))
+
+        # Assertions
+        self.assertEqual(
+            content,
+            self.mock_analysis_response['choices'][0]['message']['content']
+        )
+        http_client.post.assert_awaited_once()
+        call_kwargs = http_client.post.call_args[1]
+        self.assertEqual(call_kwargs['headers']['Authorization'], 'Bearer test_api_key')
+        image_url = call_kwargs['json']['messages'][0]['content'][1]['image_url']['url']
+        self.assertTrue(image_url.startswith('data:image/png;base64,'))
+
+    def test_analyze_image_with_prompt_async_rate_limit_error(self):
+        """Test async analysis raises RateLimitError on HTTP 429."""
+        mock_response = MagicMock()
+        mock_response.status_code = 429
+        http_client = MagicMock()
+        http_client.post = AsyncMock(return_value=mock_response)
+
+        # Test
+        client = OpenRouterClient()
+        with self.assertRaises(RateLimitError):
+            asyncio.run(client.analyze_image_with_prompt_async(
+                http_client,
+                "https://example.com/image.jpg",
+                "Rate this image"
+            ))
+
+    def test_analyze_image_with_prompt_async_empty_content(self):
+        """Test async custom-prompt analysis fails explicitly on empty content."""
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = {
+            "choices": [{"message": {"content": "  "}}]
+        }
+        http_client = MagicMock()
+        http_client.post = AsyncMock(return_value=mock_response)
+        
+        # Test
+        client = OpenRouterClient()
+        with self.assertRaises(ValueError):
+            asyncio.run(client.analyze_image_with_prompt_async(
+                http_client,
+                "https://example.com/image.jpg",
+                "Rate this image"
+            ))
+    
     def test_parse_analysis_response_valid_json(self):
         """Test parsing of valid JSON response."""
         client = OpenRouterClient()
@@ -501,6 +566,23 @@ class TestOpenRouterClient(unittest.TestCase):
             sleep_time = mock_sleep.call_args[0][0]
             self.assertGreater(sleep_time, 0)
     
+    @patch('openrouter_client.time.sleep')
+    @patch('openrouter_client.asyncio.sleep', new_callable=AsyncMock)
+    def test_rate_limiting_async_does_not_block(self, mock_async_sleep, mock_sleep):
+        """Test async rate limiting awaits asyncio.sleep instead of time.sleep."""
+        client = OpenRouterClient()
+        client.rate_limit = 2  # Set low limit for testing
+        
+        current_time = 1000.0
+        with patch('openrouter_client.time.time', return_value=current_time):
+            client.requests_per_minute = [current_time - 30, current_time - 20]
+            asyncio.run(client._enforce_rate_limit_async())
+        
+        mock_sleep.assert_not_called()
+        mock_async_sleep.assert_awaited_once()
+        self.assertGreater(mock_async_sleep.call_args[0][0], 0)
+        self.assertEqual(len(client.requests_per_minute), 3)
+    
     def test_model_info_dataclass(self):
         """Test ModelInfo dataclass functionality."""
         model = ModelInfo(
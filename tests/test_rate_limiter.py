@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the rate limiter module.
+"""
+
+import os
+import sys
+import unittest
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch, AsyncMock
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for TokenBucket."""
+    
+    @patch('rate_limiter.asyncio.sleep', new_callable=AsyncMock)
+    @patch('rate_limiter.time.monotonic', return_value=1000.0)
+    def test_burst_then_throttle(self, mock_monotonic, mock_sleep):
+        """Test that a full bucket allows a burst and then spaces requests."""
+        limiter = TokenBucket(2, period=60.0)
+        
+        async def run():
+            for _ in range(4):
+                await limiter.acquire()
+        
+        asyncio.run(run())
+        
+        # Two free tokens, then the 3rd and 4th wait 30s and 60s
+        sleeps = [c.args[0] for c in mock_sleep.call_args_list]
+        self.assertEqual(len(sleeps), 2)
+        self.assertAlmostEqual(sleeps[0], 30.0)
+        self.assertAlmostEqual(sleeps[1], 60.0)
+    
+    @patch('rate_limiter.asyncio.sleep', new_callable=AsyncMock)
+    @patch('rate_limiter.time.monotonic')
+    def test_refills_over_time(self, mock_monotonic, mock_sleep):
+        """Test that tokens refill at rate / period."""
+        mock_monotonic.return_value = 1000.0
+        limiter = TokenBucket(2, period=60.0)
+        
+        asyncio.run(limiter.acquire())
+        asyncio.run(limiter.acquire())
+        
+        # 30s later one token is back
+        mock_monotonic.return_value = 1030.0
+        asyncio.run(limiter.acquire())
+        mock_sleep.assert_not_called()
+    
+    @patch('rate_limiter.time.sleep')
+    @patch('rate_limiter.time.monotonic', return_value=1000.0)
+    def test_wait_blocks_thread(self, mock_monotonic, mock_sleep):
+        """Test that synchronous callers sleep for the same reservation."""
+        limiter = TokenBucket(2, period=60.0)
+        
+        for _ in range(3):
+            limiter.wait()
+        
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args.args[0], 30.0)
+    
+    @patch('rate_limiter.time.monotonic', return_value=1000.0)
+    def test_concurrent_reservations_are_spaced(self, mock_monotonic):
+        """Test that reservations from many threads each get their own slot."""
+        limiter = TokenBucket(1, period=1.0)
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            waits = sorted(pool.map(lambda _: limiter.reserve(), range(50)))
+        
+        self.assertEqual(waits, [float(i) for i in range(50)])
+
+
+if __name__ == '__main__':
+    unittest.main()